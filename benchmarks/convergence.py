@@ -0,0 +1,201 @@
+"""
+Benchmark đầu-cuối: GA cần bao lâu để đạt 90%, 95%, 99%, 100% luồng cực đại.
+
+Chạy GASolver.run trên một tập đồ thị và seed cố định, lấy luồng cực đại chính xác từ
+FordFulkersonSolver, ghi lại thời gian và số thế hệ lần đầu đạt mỗi mục tiêu, rồi in bảng
+tổng hợp và (tùy chọn) lưu đường cong chất lượng theo thời gian.
+
+Chạy từ thư mục gốc của repo:
+    python benchmarks/convergence.py -o convergence.json --plot convergence.png
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic.ga_solver import GASolver
+from logic.ford_fulkerson import FordFulkersonSolver
+from logic.generators import layered_graph, grid_graph, random_geometric_graph, rmat_graph
+from logic.memory_profile import format_bytes
+
+TARGETS = (0.90, 0.95, 0.99, 1.00)
+
+# Tập đồ thị cố định: (tên, hàm sinh, tham số). Seed của đồ thị luôn là 0.
+CORPUS = [
+    ("layered-3x8", layered_graph, dict(num_layers=3, nodes_per_layer=8, edge_prob=0.4)),
+    ("layered-5x15", layered_graph, dict(num_layers=5, nodes_per_layer=15, edge_prob=0.2)),
+    ("grid-6x8", grid_graph, dict(rows=6, cols=8)),
+    ("geometric-150", random_geometric_graph, dict(n=150, radius=0.15)),
+    ("rmat-7", rmat_graph, dict(scale=7, edge_factor=4, terminals=8)),
+]
+
+DEFAULT_PARAMS = {
+    "pop_size": 30,
+    "generations": 200,
+    "mutation_rate": 0.03,
+    "crossover_rate": 0.8,
+    "top_k": 3,
+    "max_paths_crossover": 2,
+    "tournament_size": 3,
+    "adaptive_mutation": True,
+}
+
+
+def run_to_targets(graph_edges, source, sink, optimum, params, seed):
+    """
+    Chạy GA một lần và ghi lại đường cong (thời gian, thế hệ, tỷ lệ so với tối ưu)
+
+    Returns:
+        Dict gồm đường cong và, cho mỗi mục tiêu, thời gian/thế hệ lần đầu đạt (None nếu không đạt)
+    """
+    solver = GASolver(graph_edges, source, sink, dict(params, seed=seed))
+    curve = []
+    start_time = time.perf_counter()
+
+    def on_generation(record):
+        ratio = record["best"] / optimum if optimum > 0 else 1.0
+        curve.append((time.perf_counter() - start_time, record["generation"], ratio))
+
+    solver.run(progress_callback=on_generation)
+    total_time = time.perf_counter() - start_time
+
+    reached = {}
+    for target in TARGETS:
+        hit = next(((t, gen) for t, gen, ratio in curve if ratio >= target), None)
+        reached[f"{target:.2f}"] = {"time": hit[0], "generations": hit[1] + 1} if hit else None
+
+    final_ratio = curve[-1][2] if curve else 0.0
+    return {"seed": seed, "total_time": total_time, "final_ratio": final_ratio, "curve": curve, "reached": reached,
+            "metrics": solver.metrics}
+
+
+def profile_memory(graph_edges, source, sink, params):
+    """
+    Một lần chạy riêng (seed 0) có đo bộ nhớ, tách khỏi các lần đo thời gian vì tracemalloc
+    làm GA chậm đi nhiều lần
+
+    Returns:
+        metrics["memory"] của GASolver, bỏ danh sách mẫu theo từng thế hệ
+    """
+    solver = GASolver(graph_edges, source, sink, dict(params, seed=0, memory_profile=True,
+                                                      memory_profile_every=max(1, params["generations"] // 20)))
+    solver.run()
+    memory = dict(solver.metrics["memory"])
+    memory.pop("samples")
+    return memory
+
+
+def print_memory_table(report):
+    names = sorted({name for entry in report.values() for name in entry["memory"]["structures_peak"]})
+    print(f"\n{'đồ thị':<16} {'RSS đỉnh':>11} {'tracemalloc':>11} " + " ".join(f"{name:>16}" for name in names))
+    for name, entry in report.items():
+        memory = entry["memory"]
+        sizes = memory["structures_peak"]
+        print(f"{name:<16} {format_bytes(memory['peak_rss']):>11} {format_bytes(memory['traced_peak']):>11} "
+              + " ".join(f"{format_bytes(sizes.get(key)):>16}" for key in names))
+
+
+def summarize(runs):
+    """Tỷ lệ thành công và trung vị thời gian/số thế hệ của các lần chạy đạt mỗi mục tiêu"""
+    summary = {"median_final_ratio": statistics.median(run["final_ratio"] for run in runs) if runs else 0.0}
+    for target in TARGETS:
+        key = f"{target:.2f}"
+        hits = [run["reached"][key] for run in runs if run["reached"][key] is not None]
+        summary[key] = {
+            "success_rate": len(hits) / len(runs) if runs else 0.0,
+            "median_time": statistics.median(hit["time"] for hit in hits) if hits else None,
+            "median_generations": statistics.median(hit["generations"] for hit in hits) if hits else None,
+        }
+    return summary
+
+
+def print_table(report):
+    header = f"{'đồ thị':<16} {'cạnh':>6} {'tối ưu':>7} {'cuối':>6} " + " ".join(
+        f"{f'{t:.0%}':>22}" for t in TARGETS)
+    print(header)
+    print(" " * 38 + " ".join(f"{'thành công  t(s)  thế hệ':>22}" for _ in TARGETS))
+    for name, entry in report.items():
+        cells = []
+        for target in TARGETS:
+            stats = entry["summary"][f"{target:.2f}"]
+            if stats["median_time"] is None:
+                cells.append(f"{stats['success_rate']:>9.0%} {'-':>6} {'-':>5}")
+            else:
+                cells.append(f"{stats['success_rate']:>9.0%} {stats['median_time']:>6.2f} "
+                             f"{stats['median_generations']:>5.0f}")
+        print(f"{name:<16} {entry['n_edges']:>6} {entry['optimum']:>7} "
+              f"{entry['summary']['median_final_ratio']:>6.0%} " + " ".join(f"{c:>22}" for c in cells))
+
+
+def plot_curves(report, path):
+    """Vẽ đường cong chất lượng theo thời gian của mọi lần chạy, mỗi đồ thị một ô"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(len(report), 1, figsize=(7, 2.5 * len(report)), squeeze=False)
+    for ax, (name, entry) in zip(axes[:, 0], report.items()):
+        for run in entry["runs"]:
+            ax.step([p[0] for p in run["curve"]], [p[2] for p in run["curve"]], where="post", alpha=0.7)
+        for target in TARGETS:
+            ax.axhline(target, color="#7f8c8d", linestyle=":", linewidth=0.8)
+        ax.set_title(name)
+        ax.set_xlabel("Thời gian (giây)")
+        ax.set_ylabel("Tỷ lệ tối ưu")
+        ax.set_ylim(min(0.5, ax.get_ylim()[0]), 1.02)
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark thời gian đạt mục tiêu của GA")
+    parser.add_argument("--seeds", type=int, default=5, help="Số seed cho mỗi đồ thị")
+    parser.add_argument("--generations", type=int, default=DEFAULT_PARAMS["generations"])
+    parser.add_argument("--pop-size", type=int, default=DEFAULT_PARAMS["pop_size"])
+    parser.add_argument("--local-search", action="store_true", help="Bật tìm kiếm cục bộ (memetic) trên cá thể ưu tú")
+    parser.add_argument("--steady-state", action="store_true", help="Chạy GA ở chế độ steady-state")
+    parser.add_argument("--deduplicate", action="store_true", help="Thay cá thể trùng bằng cá thể mới mỗi thế hệ")
+    parser.add_argument("--memory", action="store_true",
+                        help="Thêm một lần chạy đo bộ nhớ cho mỗi đồ thị (RSS đỉnh, kích thước quần thể, ...)")
+    parser.add_argument("--filter", help="Chỉ chạy các đồ thị có tên chứa chuỗi này")
+    parser.add_argument("-o", "--output", help="Ghi báo cáo (kèm đường cong) ra file JSON")
+    parser.add_argument("--plot", help="Lưu biểu đồ chất lượng theo thời gian ra file ảnh")
+    args = parser.parse_args()
+
+    params = dict(DEFAULT_PARAMS, generations=args.generations, pop_size=args.pop_size,
+                  local_search=args.local_search, steady_state=args.steady_state,
+                  deduplicate=args.deduplicate)
+
+    report = {}
+    for name, generator, kwargs in CORPUS:
+        if args.filter and args.filter not in name:
+            continue
+        graph_edges, source, sink = generator(seed=0, **kwargs)
+        _, optimum = FordFulkersonSolver(graph_edges, source, sink).solve()
+        runs = [run_to_targets(graph_edges, source, sink, optimum, params, seed) for seed in range(args.seeds)]
+        report[name] = {
+            "n_edges": len(graph_edges),
+            "optimum": optimum,
+            "summary": summarize(runs),
+            "runs": runs,
+        }
+        if args.memory:
+            report[name]["memory"] = profile_memory(graph_edges, source, sink, params)
+
+    print_table(report)
+    if args.memory:
+        print_memory_table(report)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"params": params, "targets": TARGETS, "graphs": report}, f, indent=2)
+    if args.plot:
+        plot_curves(report, args.plot)
+
+
+if __name__ == "__main__":
+    main()
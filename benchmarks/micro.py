@@ -0,0 +1,180 @@
+"""
+Microbenchmark cho các toán tử GA và solver chính xác.
+
+Chạy từ thư mục gốc của repo:
+    python benchmarks/micro.py -o results.json                         # đo và lưu kết quả
+    python benchmarks/micro.py --baseline results.json --threshold 0.2  # so sánh với baseline
+
+Mỗi phép đo báo cáo thời gian mỗi lần gọi, số lần gọi/giây, số cạnh xử lý/giây và bộ nhớ
+cấp phát đỉnh (tracemalloc) của một lần gọi. Với --baseline, chương trình trả mã lỗi 1 nếu
+có phép đo chậm hơn baseline quá ngưỡng.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from logic.ga_solver import GASolver
+from logic.ford_fulkerson import FordFulkersonSolver
+from logic.generators import layered_graph
+
+# Các đồ thị dùng để đo: (tên, tham số cho layered_graph)
+GRAPH_CASES = [
+    ("small-dense", dict(num_layers=3, nodes_per_layer=10, edge_prob=0.5)),
+    ("medium-sparse", dict(num_layers=6, nodes_per_layer=40, edge_prob=0.1)),
+    ("medium-dense", dict(num_layers=6, nodes_per_layer=40, edge_prob=0.4)),
+    ("large-sparse", dict(num_layers=10, nodes_per_layer=150, edge_prob=0.03)),
+]
+
+GA_PARAMS = {"pop_size": 30, "tournament_size": 3, "max_paths_crossover": 2, "seed": 0}
+
+
+def time_call(fn, min_time=0.2, repeat=3):
+    """Thời gian tốt nhất (giây) của một lần gọi fn, lặp đủ lâu để giảm nhiễu"""
+    start = time.perf_counter()
+    fn()
+    single = time.perf_counter() - start
+    number = max(1, int(min_time / max(single, 1e-9)))
+
+    best = single
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def peak_memory(fn):
+    """Bộ nhớ cấp phát đỉnh (byte) trong một lần gọi fn"""
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def build_operators(graph_edges, source, sink):
+    """Chuẩn bị dữ liệu đầu vào và trả về {tên toán tử: hàm không đối số}"""
+    solver = GASolver(graph_edges, source, sink, GA_PARAMS)
+    population = solver.initialize_population()
+    fitness_scores = [solver.compute_fitness(ind) for ind in population]
+    parent1, parent2 = population[0], population[1]
+    unbalanced = {(u, v): cap for u, v, cap in graph_edges}
+    unbalanced_batch = np.tile(solver.capacity_array, (solver.pop_size, 1))
+    # Con copy-on-write của một con copy-on-write: trường hợp thường gặp từ thế hệ thứ hai,
+    # cha là delta trên base dùng chung nên con cũng chỉ lưu các cạnh thay đổi
+    delta_parent = solver.mutate(solver._as_individuals([parent1])[0])
+    copy_solver = GASolver(graph_edges, source, sink, {**GA_PARAMS, "copy_on_write": False})
+
+    return {
+        "initialize_population": solver.initialize_population,
+        "balance_flow": lambda: solver.balance_flow(unbalanced),
+        "balance_flow_batch": lambda: solver.balance_flow_batch(unbalanced_batch),
+        "find_augmenting_paths": lambda: solver.find_augmenting_paths(parent1, solver.max_paths_crossover),
+        "crossover_path_based": lambda: solver.crossover_path_based(parent1, parent2),
+        "mutate": lambda: solver.mutate(parent1),
+        "mutate_delta": lambda: solver.mutate(delta_parent),
+        "mutate_copy": lambda: copy_solver.mutate(parent1),
+        "compute_fitness": lambda: solver.compute_fitness(parent1),
+        "compute_fitness_batch": lambda: solver.compute_fitness_batch(unbalanced_batch),
+        "tournament_selection": lambda: solver.tournament_selection(
+            population, fitness_scores, solver.tournament_size),
+        # Chọn cha mẹ cho cả một thế hệ theo lô
+        "select_parents": lambda: solver.select_parents(fitness_scores, solver.pop_size),
+        "ford_fulkerson_solve": lambda: FordFulkersonSolver(graph_edges, source, sink).solve(),
+    }
+
+
+def run_benchmarks(cases=GRAPH_CASES, operator_filter=None, min_time=0.2):
+    results = {}
+    for case_name, graph_kwargs in cases:
+        graph_edges, source, sink = layered_graph(seed=0, **graph_kwargs)
+        n_edges = len(graph_edges)
+        for op_name, fn in build_operators(graph_edges, source, sink).items():
+            key = f"{case_name}/{op_name}"
+            if operator_filter and operator_filter not in key:
+                continue
+            try:
+                seconds = time_call(fn, min_time=min_time)
+            except (RecursionError, MemoryError) as e:
+                # Ghi nhận toán tử không chạy được ở kích thước này thay vì dừng cả bộ đo
+                results[key] = {"n_edges": n_edges, "error": type(e).__name__}
+                print(f"{key:<45} {n_edges:7d} cạnh  LỖI: {type(e).__name__}")
+                continue
+            results[key] = {
+                "n_edges": n_edges,
+                "seconds_per_op": seconds,
+                "ops_per_sec": 1 / seconds if seconds > 0 else float("inf"),
+                "edges_per_sec": n_edges / seconds if seconds > 0 else float("inf"),
+                "peak_bytes": peak_memory(fn),
+            }
+            print(f"{key:<45} {n_edges:7d} cạnh  {seconds * 1e3:10.3f} ms/op  "
+                  f"{n_edges / seconds:14.0f} cạnh/s  {results[key]['peak_bytes'] / 1024:10.1f} KiB")
+    return results
+
+
+def compare_with_baseline(results, baseline, threshold):
+    """Trả về danh sách (khóa, tỷ lệ chậm đi) của các phép đo vượt ngưỡng"""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None or "seconds_per_op" not in previous:
+            continue
+        if "seconds_per_op" not in current:
+            # Trước chạy được, nay lỗi
+            regressions.append((key, float("inf")))
+            continue
+        ratio = current["seconds_per_op"] / previous["seconds_per_op"]
+        if ratio > 1 + threshold:
+            regressions.append((key, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark cho toán tử GA và solver chính xác")
+    parser.add_argument("-o", "--output", help="Ghi kết quả ra file JSON")
+    parser.add_argument("--baseline", help="File JSON kết quả trước đó để so sánh")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Ngưỡng chậm đi cho phép so với baseline (0.2 = 20%%)")
+    parser.add_argument("--filter", help="Chỉ chạy các phép đo có tên chứa chuỗi này")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Thời gian tối thiểu mỗi lần đo (giây)")
+    args = parser.parse_args()
+
+    results = run_benchmarks(operator_filter=args.filter, min_time=args.min_time)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": platform.python_version(),
+                    "numpy": np.__version__,
+                    "machine": platform.machine(),
+                    "processor": platform.processor(),
+                },
+                "results": results,
+            }, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_with_baseline(results, baseline, args.threshold)
+        for key, ratio in regressions:
+            print(f"CHẬM ĐI: {key} x{ratio:.2f} so với baseline")
+        if regressions:
+            sys.exit(1)
+        print(f"Không có phép đo nào chậm hơn baseline quá {args.threshold:.0%}")
+
+
+if __name__ == "__main__":
+    main()
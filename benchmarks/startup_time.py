@@ -0,0 +1,108 @@
+"""
+Đo thời gian khởi động ứng dụng và thời gian import của từng module.
+
+Chạy từ thư mục gốc của repo:
+    python benchmarks/startup_time.py                # báo cáo
+    python benchmarks/startup_time.py --check        # trả mã lỗi 1 nếu vượt ngân sách
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Ngân sách mặc định cho thời gian từ lúc khởi động interpreter đến khi MainWindow hiển thị
+DEFAULT_BUDGET_MS = 1500
+
+# Các module nặng không được nạp trước khi người dùng thực sự cần tới
+DEFERRED_MODULES = ["matplotlib", "numpy", "logic.ga_solver", "logic.ford_fulkerson", "networkx"]
+
+# Script chạy trong tiến trình con: dựng MainWindow rồi in thời gian và các module đã nạp
+STARTUP_PROBE = """
+import json, os, sys, time
+start = time.perf_counter()
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtWidgets import QApplication
+app = QApplication(sys.argv)
+from ui.main_window import MainWindow
+window = MainWindow()
+window.show()
+app.processEvents()
+elapsed = time.perf_counter() - start
+print(json.dumps({"window_ms": elapsed * 1000, "modules": sorted(sys.modules)}))
+"""
+
+
+def run_python(args):
+    return subprocess.run([sys.executable] + args, cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+
+
+def measure_import_times(module="ui.main_window"):
+    """
+    Dùng `python -X importtime` để lấy thời gian import của từng module
+
+    Returns:
+        Danh sách (tên module, thời gian riêng ms, thời gian tích lũy ms) theo thời gian tích lũy giảm dần
+    """
+    result = run_python(["-X", "importtime", "-c", f"import {module}"])
+    times = []
+    for line in result.stderr.splitlines():
+        parts = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        times.append((parts[2].strip(), int(parts[0]) / 1000, int(parts[1]) / 1000))
+    return sorted(times, key=lambda item: item[2], reverse=True)
+
+
+def measure_startup():
+    """Đo thời gian dựng MainWindow và danh sách module đã nạp trong một tiến trình mới"""
+    result = run_python(["-c", STARTUP_PROBE])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Đo thời gian khởi động ứng dụng")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="Ngân sách thời gian khởi động (ms)")
+    parser.add_argument("--repeat", type=int, default=3, help="Số lần đo, lấy giá trị nhỏ nhất")
+    parser.add_argument("--top", type=int, default=15, help="Số module hiển thị")
+    parser.add_argument("--check", action="store_true", help="Trả mã lỗi 1 nếu vượt ngân sách")
+    parser.add_argument("--json", action="store_true", help="In kết quả dạng JSON")
+    args = parser.parse_args()
+
+    samples = [measure_startup() for _ in range(max(1, args.repeat))]
+    window_ms = min(sample["window_ms"] for sample in samples)
+    loaded = set(samples[0]["modules"])
+    eager = [name for name in DEFERRED_MODULES if name in loaded]
+    import_times = measure_import_times()[:args.top]
+
+    failures = []
+    if window_ms > args.budget_ms:
+        failures.append(f"khởi động mất {window_ms:.0f} ms > ngân sách {args.budget_ms:.0f} ms")
+    if eager:
+        failures.append(f"các module nặng bị nạp khi khởi động: {', '.join(eager)}")
+
+    if args.json:
+        print(json.dumps({
+            "window_ms": window_ms,
+            "budget_ms": args.budget_ms,
+            "eager_modules": eager,
+            "import_times_ms": {name: {"self": own, "cumulative": total} for name, own, total in import_times},
+            "failures": failures,
+        }, indent=2))
+    else:
+        print(f"Thời gian dựng MainWindow: {window_ms:.1f} ms (ngân sách {args.budget_ms:.0f} ms)")
+        print(f"  {'module':<40} {'riêng (ms)':>12} {'tích lũy (ms)':>14}")
+        for name, own, total in import_times:
+            print(f"  {name:<40} {own:12.1f} {total:14.1f}")
+        for failure in failures:
+            print(f"LỖI: {failure}")
+
+    if args.check and failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Hủy hợp tác (cooperative cancellation) cho các solver chạy lâu.
+
+Bên gọi giữ một CancellationToken và gọi cancel(); solver gọi token.check() trong các vòng
+lặp bên trong (mỗi đỉnh khi cân bằng luồng, mỗi bước DFS/BFS tìm đường tăng luồng, ...).
+Cứ stride lần gọi check() thì token được kiểm tra một lần, nên độ trễ từ lúc cancel() đến lúc
+solver dừng bị chặn bởi thời gian của stride bước, và được đo bằng latency().
+
+    token = CancellationToken()
+    threading.Thread(target=lambda: solver.run(cancel_token=token)).start()
+    token.cancel()
+"""
+import threading
+import time
+from typing import Callable, Optional
+
+# Số lần gọi check() giữa hai lần thực sự kiểm tra token
+DEFAULT_STRIDE = 64
+
+
+class OperationCancelled(Exception):
+    """Ném ra bởi CancellationToken.check() khi đã có yêu cầu hủy"""
+
+
+class CancellationToken:
+    def __init__(self, poll: Callable[[], bool] = None, stride: int = DEFAULT_STRIDE):
+        """
+        Args:
+            poll: Hàm trả về True khi cần hủy (vd. should_stop cũ hoặc Event của tiến trình khác);
+                được gọi tối đa một lần mỗi stride lần check()
+            stride: Số lần gọi check() giữa hai lần kiểm tra
+        """
+        self._event = threading.Event()
+        self._poll = poll
+        self.stride = max(1, stride)
+        self._ticks = 0
+        # time.perf_counter() lúc có yêu cầu hủy (lúc cancel() hoặc lúc poll trả về True)
+        self.requested_at = None
+
+    @classmethod
+    def from_should_stop(cls, should_stop: Optional[Callable[[], bool]]) -> "CancellationToken":
+        """Token bọc một hàm should_stop (None = không bao giờ hủy)"""
+        return cls(poll=should_stop)
+
+    def cancel(self):
+        if not self._event.is_set():
+            self.requested_at = time.perf_counter()
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        if self._poll is not None and self._poll():
+            self.cancel()
+            return True
+        return False
+
+    def check(self):
+        """Ném OperationCancelled nếu đã có yêu cầu hủy (chỉ kiểm tra mỗi stride lần gọi)"""
+        self._ticks += 1
+        if self._ticks >= self.stride:
+            self._ticks = 0
+            self.raise_if_cancelled()
+
+    def raise_if_cancelled(self):
+        """Như check() nhưng kiểm tra ngay, cho các điểm gọi thưa (mỗi khối cạnh, mỗi thế hệ)"""
+        if self.cancelled:
+            raise OperationCancelled()
+
+    def latency(self) -> Optional[float]:
+        """Số giây từ lúc có yêu cầu hủy đến bây giờ (None nếu chưa bị hủy)"""
+        if self.requested_at is None:
+            return None
+        return time.perf_counter() - self.requested_at
@@ -0,0 +1,177 @@
+"""
+Cá thể copy-on-write cho GASolver: luồng = một dict đầy đủ dùng chung (base) ghi đè bởi
+một delta thưa, cùng các giá trị tổng hợp (FlowState) để tính fitness không cần duyệt cạnh.
+
+Với tỷ lệ đột biến 1-2% và phần lớn cá thể con bỏ qua lai ghép, con chỉ khác cha trên vài
+cạnh, nên bộ nhớ và chi phí tạo mỗi con tỷ lệ với số cạnh thay đổi thay vì số cạnh của đồ thị.
+
+    editor = DeltaEditor(parent, parent_state.copy(), source, sink, intermediate_nodes)
+    editor[edge] = new_value          # state được cập nhật sau mỗi lần ghi
+    child = derive(editor.base, editor.delta, editor.state)
+"""
+from collections.abc import ItemsView, Mapping
+from typing import Dict, Tuple
+
+# Khi delta vượt tỷ lệ này của số cạnh thì gộp thành một dict đầy đủ mới
+COMPACT_FRACTION = 0.25
+
+_MISSING = object()
+
+
+class FlowState:
+    """Các tổng của một luồng, đủ để tính fitness giống hệt GASolver.compute_fitness"""
+    __slots__ = ("source_outflow", "sink_inflow", "imbalance")
+
+    def __init__(self, source_outflow: int, sink_inflow: int, imbalance: Dict[int, int]):
+        self.source_outflow = source_outflow
+        self.sink_inflow = sink_inflow
+        # đỉnh trung gian -> luồng vào - luồng ra, chỉ giữ các đỉnh bị lệch
+        self.imbalance = imbalance
+
+    def copy(self) -> "FlowState":
+        return FlowState(self.source_outflow, self.sink_inflow, dict(self.imbalance))
+
+    @property
+    def fitness(self) -> int:
+        if self.imbalance:
+            return -1
+        return min(self.source_outflow, self.sink_inflow)
+
+
+class _DeltaItems(ItemsView):
+    def __iter__(self):
+        flow = self._mapping
+        if not flow.delta:
+            yield from flow.base.items()
+            return
+        get = flow.delta.get
+        for edge, value in flow.base.items():
+            yield edge, get(edge, value)
+
+
+class DeltaFlow(Mapping):
+    """
+    Luồng chỉ đọc {(u, v): f} gồm base (dict đầy đủ, không bao giờ bị sửa, có thể dùng chung
+    giữa nhiều cá thể) và delta (các cạnh có giá trị khác base). Thứ tự duyệt là thứ tự của base.
+    copy() trả về dict đầy đủ (vật chất hóa) mà bên gọi được phép sửa.
+    """
+    __slots__ = ("base", "delta", "state")
+
+    def __init__(self, base: Dict[Tuple[int, int], int], delta: Dict[Tuple[int, int], int] = None,
+                 state: FlowState = None):
+        self.base = base
+        self.delta = {} if delta is None else delta
+        # FlowState của luồng này (None = chưa tính), do GASolver điền và dùng lại
+        self.state = state
+
+    def __getitem__(self, edge):
+        value = self.delta.get(edge, _MISSING)
+        return self.base[edge] if value is _MISSING else value
+
+    def get(self, edge, default=None):
+        value = self.delta.get(edge, _MISSING)
+        return self.base.get(edge, default) if value is _MISSING else value
+
+    def __contains__(self, edge):
+        return edge in self.base
+
+    def __iter__(self):
+        return iter(self.base)
+
+    def __len__(self):
+        return len(self.base)
+
+    def items(self):
+        return _DeltaItems(self)
+
+    def copy(self) -> Dict[Tuple[int, int], int]:
+        flow = self.base.copy()
+        flow.update(self.delta)
+        return flow
+
+
+def as_dict(flow) -> Dict[Tuple[int, int], int]:
+    """Dict thường cho bên ngoài solver (kết quả trả về, lưu cache, giao diện)"""
+    return flow.copy() if isinstance(flow, DeltaFlow) else flow
+
+
+def derive(base: Dict[Tuple[int, int], int], delta: Dict[Tuple[int, int], int], state: FlowState,
+           compact_fraction: float = COMPACT_FRACTION) -> DeltaFlow:
+    """
+    Cá thể mới = base ghi đè bởi delta (lấy từ DeltaEditor), dùng chung base với cha. Khi delta
+    vượt compact_fraction số cạnh thì gộp thành base mới để việc đọc và sao chép delta không
+    đắt dần qua các thế hệ.
+    """
+    if len(delta) > compact_fraction * len(base):
+        merged = base.copy()
+        merged.update(delta)
+        return DeltaFlow(merged, None, state)
+    return DeltaFlow(base, delta, state)
+
+
+class DeltaEditor:
+    """
+    Bản nháp ghi lên một luồng: đọc từ base và delta của flow, ghi vào delta (bản sao, flow
+    không bị sửa) và cập nhật state (tổng ra từ nguồn, vào đích, độ lệch của từng đỉnh trung
+    gian) sau mỗi lần ghi. Dùng được ở mọi chỗ chỉ cần flow[edge] và flow[edge] = value
+    (vd. các hàm _adjust_* của GASolver).
+    """
+    __slots__ = ("base", "delta", "state", "imbalance", "source", "sink", "intermediate",
+                 "multiplicity", "touched")
+
+    def __init__(self, flow, state: FlowState, source: int, sink: int, intermediate,
+                 multiplicity: Dict[Tuple[int, int], int] = None):
+        """
+        Args:
+            state: FlowState của flow; bị sửa tại chỗ (truyền bản sao nếu cần giữ bản gốc)
+            multiplicity: Số lần xuất hiện của các cạnh lặp trong danh sách cạnh (mặc định 1),
+                vì tổng luồng vào/ra của một đỉnh được tính trên danh sách cạnh kề có lặp
+        """
+        if isinstance(flow, DeltaFlow):
+            self.base, self.delta = flow.base, dict(flow.delta)
+        else:
+            self.base, self.delta = flow, {}
+        self.state = state
+        self.imbalance = state.imbalance
+        self.source = source
+        self.sink = sink
+        self.intermediate = intermediate
+        self.multiplicity = multiplicity or {}
+        # Các đỉnh có độ lệch vừa thay đổi (bên gọi tự xóa khi cần)
+        self.touched = []
+
+    def __getitem__(self, edge):
+        value = self.delta.get(edge, _MISSING)
+        return self.base[edge] if value is _MISSING else value
+
+    def __setitem__(self, edge, value):
+        base_value = self.base[edge]
+        old = self.delta.get(edge, base_value)
+        if value == base_value:
+            self.delta.pop(edge, None)
+        else:
+            self.delta[edge] = value
+        diff = value - old
+        if not diff:
+            return
+        u, v = edge
+        if u == self.source:
+            self.state.source_outflow += diff
+        if v == self.sink:
+            self.state.sink_inflow += diff
+        diff *= self.multiplicity.get(edge, 1)
+        imbalance = self.imbalance
+        if v in self.intermediate:
+            balance = imbalance.get(v, 0) + diff
+            if balance:
+                imbalance[v] = balance
+            else:
+                del imbalance[v]
+            self.touched.append(v)
+        if u in self.intermediate:
+            balance = imbalance.get(u, 0) - diff
+            if balance:
+                imbalance[u] = balance
+            else:
+                del imbalance[u]
+            self.touched.append(u)
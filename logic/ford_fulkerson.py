@@ -1,6 +1,11 @@
 import collections
 from typing import List, Tuple, Dict, Set
 
+from logic.cancellation import CancellationToken, OperationCancelled
+
+# Khi đo bộ nhớ: số đường tăng luồng giữa hai lần lấy mẫu
+MEMORY_SAMPLE_PATHS = 100
+
 
 class FordFulkersonSolver:
     def __init__(self, graph_edges: List[Tuple[int, int, int]], source: int, sink: int):
@@ -15,10 +20,14 @@ class FordFulkersonSolver:
         self.graph_edges = graph_edges
         self.source = source
         self.sink = sink
+        # Thống kê của lần solve() gần nhất (vd. "memory" khi memory_profile=True)
+        self.metrics = {}
         
         # Xây dựng đồ thị dưới dạng adjacency list
         self.graph = collections.defaultdict(list)
-        self.capacities = {}  # (u, v) -> capacity
+        # (u, v) -> capacity, chỉ với cạnh gốc; cạnh ngược không lưu capacity 0 mà được
+        # tính là 0 khi tra cứu (đỡ một mục dict cho mỗi cạnh trên đồ thị lớn)
+        self.capacities = {}
         
         for u, v, capacity in graph_edges:
             self.graph[u].append(v)
@@ -27,13 +36,15 @@ class FordFulkersonSolver:
                 self.graph[v].append(u)
             
             self.capacities[(u, v)] = capacity
-            # Khởi tạo cạnh ngược với capacity 0
-            if (v, u) not in self.capacities:
-                self.capacities[(v, u)] = 0
     
-    def find_augmenting_path(self, flow: Dict[Tuple[int, int], int]) -> Tuple[List[int], int]:
+    def find_augmenting_path(self, flow: Dict[Tuple[int, int], int],
+                             cancel_token: CancellationToken = None) -> Tuple[List[int], int]:
         """
         Tìm đường tăng luồng bằng BFS trong đồ thị phần dư
+
+        Args:
+            cancel_token: Nếu có, được kiểm tra sau mỗi đỉnh lấy ra khỏi hàng đợi
+                (ném OperationCancelled khi bị hủy)
         
         Returns:
             Tuple gồm đường đi (list các đỉnh) và giá trị bottleneck (luồng có thể đẩy thêm)
@@ -42,17 +53,16 @@ class FordFulkersonSolver:
         queue = collections.deque([(self.source, [self.source], float('inf'))])
         
         while queue:
+            if cancel_token is not None:
+                cancel_token.check()
             u, path, bottleneck = queue.popleft()
             
             if u == self.sink:
                 return path, bottleneck
             
             for v in self.graph[u]:
-                # Tính residual capacity
-                if (u, v) in self.capacities:
-                    residual = self.capacities[(u, v)] - flow.get((u, v), 0)
-                else:
-                    residual = 0
+                # Tính residual capacity (cạnh ngược có capacity 0 và luồng âm)
+                residual = self.capacities.get((u, v), 0) - flow.get((u, v), 0)
                 
                 if residual > 0 and v not in visited:
                     visited.add(v)
@@ -62,20 +72,57 @@ class FordFulkersonSolver:
         # Không tìm thấy đường tăng luồng
         return [], 0
     
-    def solve(self) -> Tuple[Dict[Tuple[int, int], int], int]:
+    def solve(self, progress_callback=None, should_stop=None,
+              initial_flow: Dict[Tuple[int, int], int] = None,
+              cancel_token: CancellationToken = None,
+              memory_profile: bool = False) -> Tuple[Dict[Tuple[int, int], int], int]:
         """
         Thuật toán Ford-Fulkerson tìm luồng cực đại
         
+        Args:
+            progress_callback: Hàm nhận (số đường tăng luồng đã dùng, giá trị luồng hiện tại)
+                sau mỗi lần tăng luồng
+            should_stop: Hàm trả về True khi cần dừng sớm; khi đó kết quả chỉ là
+                luồng hợp lệ tìm được đến thời điểm dừng, không phải luồng cực đại
+            initial_flow: Luồng hợp lệ {(u, v): f} (bảo toàn, không vượt capacity) để bắt đầu
+                thay vì luồng 0, vd. luồng tối ưu của một đồ thị gần giống (warm start)
+            cancel_token: CancellationToken được kiểm tra cả bên trong mỗi lần BFS, nên dừng
+                nhanh cả trên đồ thị lớn; khi bị hủy kết quả giống như với should_stop
+            memory_profile: Đo bộ nhớ (RSS, tracemalloc, kích thước luồng/capacity/danh sách kề)
+                mỗi MEMORY_SAMPLE_PATHS đường tăng luồng, kết quả ở self.metrics["memory"]
+        
         Returns:
             Tuple gồm dictionary mô tả luồng trên mỗi cạnh và giá trị luồng cực đại
         """
-        # Khởi tạo luồng với giá trị 0 trên mọi cạnh
+        # Khởi tạo luồng với giá trị 0 trên mọi cạnh gốc (cạnh ngược được thêm khi có luồng)
         flow = {edge: 0 for edge in self.capacities}
         max_flow = 0
+        if initial_flow:
+            for (u, v), f_val in initial_flow.items():
+                flow[(u, v)] += f_val
+                flow[(v, u)] = flow.get((v, u), 0) - f_val
+            # Luồng ròng ra khỏi nguồn của initial_flow; không duyệt self.graph[source] vì đỉnh
+            # kề xuất hiện nhiều lần khi có cạnh song song
+            max_flow = (sum(f_val for (u, _), f_val in initial_flow.items() if u == self.source)
+                        - sum(f_val for (_, v), f_val in initial_flow.items() if v == self.source))
+        num_paths = 0
         
         # Tìm đường tăng luồng cho đến khi không tìm thấy thêm đường nào
+        if cancel_token is None and should_stop is not None:
+            cancel_token = CancellationToken.from_should_stop(should_stop)
+        self.metrics = {}
+        profiler = None
+        if memory_profile:
+            from logic.memory_profile import MemoryProfiler
+            profiler = MemoryProfiler()
+            profiler.start()
         while True:
-            path, bottleneck = self.find_augmenting_path(flow)
+            if cancel_token is not None and cancel_token.cancelled:
+                break
+            try:
+                path, bottleneck = self.find_augmenting_path(flow, cancel_token)
+            except OperationCancelled:
+                break
             if not path:
                 break
             
@@ -86,21 +133,62 @@ class FordFulkersonSolver:
                 flow[(v, u)] = flow.get((v, u), 0) - bottleneck
             
             max_flow += bottleneck
+            num_paths += 1
+            if progress_callback is not None:
+                progress_callback(num_paths, max_flow)
+            if profiler is not None and num_paths % MEMORY_SAMPLE_PATHS == 0:
+                self._sample_memory(profiler, num_paths, flow)
         
         # Lọc bỏ các cạnh ngược và cạnh không có luồng từ kết quả
         result_flow = {}
         for (u, v), f_val in flow.items():
             if (u, v) in self.capacities and f_val > 0 and self.capacities[(u, v)] > 0:
                 result_flow[(u, v)] = f_val
+
+        if profiler is not None:
+            self._sample_memory(profiler, num_paths, flow)
+            self.metrics["memory"] = profiler.stop()
         
         return result_flow, max_flow
 
+    def _sample_memory(self, profiler, num_paths, flow):
+        # Đồ thị phần dư của Ford-Fulkerson là capacity + luồng (kể cả cạnh ngược), không dựng riêng
+        profiler.sample(num_paths, {
+            "flow": flow,
+            "capacities": self.capacities,
+            "adjacency": self.graph,
+        })
+
+    def min_cut(self, flow: Dict[Tuple[int, int], int]) -> Tuple[Set[int], List[Tuple[int, int]]]:
+        """
+        Lát cắt nhỏ nhất ứng với một luồng cực đại (kết quả của solve)
+
+        Returns:
+            Tuple gồm tập đỉnh phía source (đến được từ source trong đồ thị phần dư)
+            và danh sách các cạnh gốc đi từ phía source sang phía sink
+        """
+        source_side = {self.source}
+        queue = collections.deque([self.source])
+        while queue:
+            u = queue.popleft()
+            for v in self.graph[u]:
+                # flow chỉ chứa luồng dương trên cạnh gốc, luồng ngược được tính lại từ cạnh (v, u)
+                residual = self.capacities.get((u, v), 0) - flow.get((u, v), 0) + flow.get((v, u), 0)
+                if residual > 0 and v not in source_side:
+                    source_side.add(v)
+                    queue.append(v)
+
+        cut_edges = [(u, v) for u, v, capacity in self.graph_edges
+                     if capacity > 0 and u in source_side and v not in source_side]
+        return source_side, cut_edges
+
 
 def compare_ga_with_optimal(
     graph_edges: List[Tuple[int, int, int]], 
     source: int, 
     sink: int, 
-    ga_flow: Dict[Tuple[int, int], int]
+    ga_flow: Dict[Tuple[int, int], int],
+    optimal_result: Tuple[Dict[Tuple[int, int], int], int] = None
 ) -> Dict:
     """
     So sánh kết quả GA với thuật toán Ford-Fulkerson
@@ -110,6 +198,8 @@ def compare_ga_with_optimal(
         source: Đỉnh nguồn
         sink: Đỉnh đích
         ga_flow: Dictionary mô tả luồng của GA trên mỗi cạnh
+        optimal_result: Kết quả (luồng, giá trị) của Ford-Fulkerson đã giải trước đó;
+            nếu bỏ trống thì sẽ giải lại
     
     Returns:
         Dict chứa các thông tin so sánh (tỷ lệ, sai lệch, v.v.)
@@ -117,9 +207,11 @@ def compare_ga_with_optimal(
     # Tính luồng từ GA - Tổng luồng ra từ nguồn
     ga_max_flow = sum(flow for (u, v), flow in ga_flow.items() if u == source)
     
-    # Tìm luồng tối ưu bằng Ford-Fulkerson
-    ff_solver = FordFulkersonSolver(graph_edges, source, sink)
-    ff_flow, optimal_max_flow = ff_solver.solve()
+    # Tìm luồng tối ưu bằng Ford-Fulkerson (nếu chưa có kết quả sẵn)
+    if optimal_result is None:
+        ff_solver = FordFulkersonSolver(graph_edges, source, sink)
+        optimal_result = ff_solver.solve()
+    ff_flow, optimal_max_flow = optimal_result
     
     # Tính các số liệu so sánh
     optimality_ratio = (ga_max_flow / optimal_max_flow * 100) if optimal_max_flow > 0 else 0
@@ -1,8 +1,56 @@
+import hashlib
+import heapq
+import itertools
 import numpy as np
 import random
-from collections import defaultdict
+import time
+from collections import Counter, defaultdict
 from typing import List, Tuple, Dict
 
+from logic.cancellation import CancellationToken, OperationCancelled
+from logic.delta_flow import COMPACT_FRACTION, DeltaEditor, DeltaFlow, FlowState, as_dict, derive
+from logic.shared_graph import accumulator_dtype, capacity_dtype
+
+SELECTION_SCHEMES = ("tournament", "sus", "rank")
+# Cách chọn cá thể bị thay thế ở chế độ steady-state
+REPLACEMENT_SCHEMES = ("worst", "tournament")
+# Số bước duyệt giữa hai lần kiểm tra hạn chót trong các vòng lặp dài
+TIME_CHECK_INTERVAL = 256
+# Số cạnh giữa hai lần kiểm tra hủy trong các vòng lặp qua toàn bộ cạnh
+EDGE_CHUNK = 1024
+# Số phần tử tối đa của một khối hàng khi sinh ma trận luồng (giới hạn mảng int64 tạm)
+BATCH_CHUNK_ELEMENTS = 1 << 22
+# Bias của cá thể mới khi tiêm đa dạng hoặc thay cá thể trùng (xem fresh_individuals)
+FRESH_BIAS = 0.7
+# Số cá thể tối đa (cách đều trong quần thể) dùng để ước lượng khoảng cách Hamming trung bình
+DIVERSITY_SAMPLE = 64
+# Áp lực chọn lọc của rank selection tuyến tính (1 = ngẫu nhiên đều, 2 = mạnh nhất)
+RANK_PRESSURE = 1.5
+
+
+def _truncate_to(values: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    """
+    Phần nguyên của các giá trị float64 không âm theo kiểu dtype. Với uint64, float64 làm tròn
+    số gần 2**64 lên đúng 2**64 (không biểu diễn được) nên được kẹp xuống số float nhỏ hơn liền kề
+    """
+    values = np.trunc(values)
+    if dtype == np.uint64:
+        values = np.minimum(values, np.nextafter(2.0 ** 64, 0))
+    return values.astype(dtype)
+
+
+def _repeated_edges(idx: np.ndarray):
+    """
+    None nếu danh sách chỉ số cạnh không lặp, ngược lại (các chỉ số khác nhau theo thứ tự xuất
+    hiện đầu tiên, số lần xuất hiện của từng chỉ số)
+    """
+    unique, first, counts = np.unique(idx, return_index=True, return_counts=True)
+    if len(unique) == len(idx):
+        return None
+    order = np.argsort(first)
+    return unique[order], counts[order]
+
+
 class GASolver:
     def __init__(self, graph_edges: List[Tuple[int, int, int]], source: int, sink: int, params: Dict):
         self.graph_edges = graph_edges
@@ -18,6 +66,61 @@ class GASolver:
         self.adaptive_mutation = params.get("adaptive_mutation", False)
         self.tournament_size = params.get("tournament_size", 3)
         self.crossover_rate = params.get("crossover_rate", 0.8)
+        self.diversity_injection = params.get("diversity_injection", False)
+        # Seed cố định giúp tái lập kết quả (None = ngẫu nhiên)
+        self.seed = params.get("seed")
+        self.rng = random.Random(self.seed)
+        # Bộ sinh NumPy cho các toán tử chạy theo lô (chọn lọc)
+        self.np_rng = np.random.default_rng(self.seed)
+        # Cách chọn cha mẹ: "tournament", "sus" (stochastic universal sampling) hoặc "rank"
+        self.selection = params.get("selection", "tournament")
+        if self.selection not in SELECTION_SCHEMES:
+            raise ValueError(f"selection phải là một trong {SELECTION_SCHEMES}")
+        # File telemetry JSONL theo từng thế hệ (None = không ghi), xem logic/telemetry.py
+        self.telemetry_path = params.get("telemetry_path")
+        # Tìm kiếm cục bộ (memetic): mỗi thế hệ đẩy thêm tối đa local_search_paths đường tăng luồng
+        # vào local_search_elites cá thể tốt nhất, trong giới hạn local_search_budget giây
+        self.local_search = params.get("local_search", False)
+        self.local_search_paths = params.get("local_search_paths", 3)
+        self.local_search_elites = params.get("local_search_elites", self.top_k)
+        self.local_search_budget = params.get("local_search_budget", 0.05)
+        # Chế độ steady-state: mỗi bước tạo offspring_per_step cá thể con thay tại chỗ cá thể
+        # tệ nhất ("worst") hoặc kẻ thua một vòng đấu ("tournament"); pop_size cá thể con
+        # được tính là một thế hệ
+        self.steady_state = params.get("steady_state", False)
+        self.offspring_per_step = max(1, params.get("offspring_per_step", 2))
+        # Cá thể copy-on-write (xem logic/delta_flow.py): con của đột biến giữ tham chiếu tới dict
+        # của cha cộng một delta thưa, chỉ cân bằng lại các đỉnh bị lệch và tính fitness từ các
+        # tổng của cha. Kết quả giống hệt cách sao chép đầy đủ; delta lớn hơn
+        # delta_compact_fraction số cạnh thì được gộp thành dict mới
+        self.copy_on_write = params.get("copy_on_write", True)
+        self.delta_compact_fraction = params.get("delta_compact_fraction", COMPACT_FRACTION)
+        # Mỗi thế hệ băm nội dung các cá thể; cá thể trùng với một cá thể đứng trước được thay
+        # bằng cá thể mới (fresh_individuals) trước khi đánh giá. Các chỉ số đa dạng
+        # (unique_ratio, mean_hamming) luôn có trong bản ghi tiến độ và telemetry (chỉ được
+        # tính khi có một trong ba nơi dùng này)
+        self.deduplicate = params.get("deduplicate", False)
+        self.replacement = params.get("replacement", "worst")
+        if self.replacement not in REPLACEMENT_SCHEMES:
+            raise ValueError(f"replacement phải là một trong {REPLACEMENT_SCHEMES}")
+        # Giới hạn thời gian: time_limit giây kể từ lúc gọi run() và/hoặc deadline là mốc tuyệt đối
+        # (time.time()). Hết giờ thì trả về lời giải tốt nhất đến lúc đó và metrics["budget_exhausted"]
+        # = True; khi thời gian còn lại dưới cheap_operators_fraction của ngân sách thì bỏ qua
+        # lai ghép và tìm kiếm cục bộ, chỉ đột biến (None = không đổi toán tử)
+        self.time_limit = params.get("time_limit")
+        self.deadline = params.get("deadline")
+        self.cheap_operators_fraction = params.get("cheap_operators_fraction", 0.2)
+        self._deadline = None
+        self._cheap_after = None
+        self._cheap = False
+        # Đo bộ nhớ (chậm hơn vì dùng tracemalloc): mỗi memory_profile_every thế hệ ghi RSS và kích
+        # thước quần thể, đồ thị phần dư, lịch sử fitness, top 5 vào metrics["memory"]
+        self.memory_profile = params.get("memory_profile", False)
+        self.memory_profile_every = max(1, params.get("memory_profile_every", 1))
+        # Token hủy của lần chạy hiện tại; các toán tử gọi check() trong vòng lặp bên trong
+        self.cancel_token = CancellationToken()
+        # Thống kê của lần chạy gần nhất, được run() điền vào
+        self.metrics = {}
         
         # Create a list of all nodes for flow balancing
         self.all_nodes = set(u for u, _, _ in graph_edges) | set(v for _, v, _ in graph_edges)
@@ -30,16 +133,46 @@ class GASolver:
             self.outgoing_edges[u].append((u, v))
             self.incoming_edges[v].append((u, v))
             
+        # Dạng mảng của đồ thị cho các toán tử theo lô: thứ tự cạnh theo capacity_map,
+        # và chỉ số cạnh vào/ra của mỗi đỉnh trung gian theo đúng thứ tự duyệt của balance_flow.
+        # Luồng theo lô lưu ở kiểu hẹp nhất chứa được capacity lớn nhất (vd. uint8), còn các tổng
+        # (cân bằng, fitness) cộng dồn theo sum_dtype, đủ rộng cho tổng mọi capacity
+        self.edge_keys = list(self.capacity_map.keys())
+        capacities = [self.capacity_map[edge] for edge in self.edge_keys]
+        self.flow_dtype = capacity_dtype(capacities)
+        self.sum_dtype = accumulator_dtype(sum(abs(cap) for cap in capacities))
+        self.capacity_array = np.array(capacities, dtype=self.flow_dtype)
+        self.edge_index = edge_index = {edge: i for i, edge in enumerate(self.edge_keys)}
+        self.is_terminal_edge = np.array([u == source or v == sink for u, v in self.edge_keys], dtype=bool)
+        self.source_edge_idx = np.array([i for i, (u, _) in enumerate(self.edge_keys) if u == source], dtype=np.int64)
+        self.sink_edge_idx = np.array([i for i, (_, v) in enumerate(self.edge_keys) if v == sink], dtype=np.int64)
+        self.balance_order = [
+            (np.array([edge_index[edge] for edge in self.incoming_edges[node]], dtype=np.int64),
+             np.array([edge_index[edge] for edge in self.outgoing_edges[node]], dtype=np.int64))
+            for node in self.intermediate_nodes
+        ]
+        # Đỉnh có cạnh lặp (None nếu không): balance_flow lấp đầy cạnh lặp ở lần gặp đầu tiên
+        # (các lần sau không còn chỗ) nhưng co luồng theo tỷ lệ một lần cho mỗi lần xuất hiện
+        self.balance_repeats = [(_repeated_edges(in_idx), _repeated_edges(out_idx))
+                                for in_idx, out_idx in self.balance_order]
+        # Thứ tự duyệt đỉnh của balance_flow, để cân bằng gia tăng đi đúng thứ tự đó
+        self.balance_nodes = list(self.intermediate_nodes)
+        self.balance_position = {node: i for i, node in enumerate(self.balance_nodes)}
+        # Cạnh xuất hiện nhiều lần trong graph_edges được cộng nhiều lần vào tổng luồng của đỉnh
+        self.edge_multiplicity = {edge: count for edge, count in Counter(
+            (u, v) for u, v, _ in graph_edges).items() if count > 1}
+
         # For adaptive mutation
         self.best_fitness_history = []
         self.no_improvement_count = 0
         self.current_mutation_rate = self.mutation_rate
+        self.last_improvement_gen = 0
 
     # Represent flow as a dictionary {(u, v): flow_value}
     def initialize_individual(self) -> Dict[Tuple[int, int], int]:
         individual = {}
         for u, v, cap in self.graph_edges:
-            individual[(u, v)] = random.randint(0, cap)
+            individual[(u, v)] = self.rng.randint(0, cap)
         return self.balance_flow(individual)
     
     def initialize_diverse_individual(self, bias_percentage=None) -> Dict[Tuple[int, int], int]:
@@ -49,37 +182,158 @@ class GASolver:
         if bias_percentage is None:
             # Standard random initialization
             for u, v, cap in self.graph_edges:
-                individual[(u, v)] = random.randint(0, cap)
+                individual[(u, v)] = self.rng.randint(0, cap)
         else:
             # Biased initialization to create diverse initial population
             for u, v, cap in self.graph_edges:
                 # Apply different biases based on the layer in the network
                 if u == self.source:
                     # Edges from source: higher flow values
-                    individual[(u, v)] = int(cap * random.uniform(bias_percentage, 1.0))
+                    individual[(u, v)] = int(cap * self.rng.uniform(bias_percentage, 1.0))
                 elif v == self.sink:
                     # Edges to sink: higher flow values
-                    individual[(u, v)] = int(cap * random.uniform(bias_percentage, 1.0))
+                    individual[(u, v)] = int(cap * self.rng.uniform(bias_percentage, 1.0))
                 else:
                     # Intermediate edges: random flow values
-                    individual[(u, v)] = random.randint(0, cap)
+                    individual[(u, v)] = self.rng.randint(0, cap)
         
         return self.balance_flow(individual)
 
     def initialize_population(self) -> List[Dict[Tuple[int, int], int]]:
-        population = []
         # Khởi tạo một nửa số cá thể với khởi tạo ngẫu nhiên
         standard_count = self.pop_size // 2
-        for _ in range(standard_count):
-            population.append(self.initialize_individual())
+        biases = [None] * standard_count
             
         # Tạo các cá thể với bias hướng về đường trực tiếp từ nguồn đến đích
         for i in range(self.pop_size - standard_count):
             # Thay đổi tỷ lệ bias để tạo đa dạng
-            bias = 0.5 + (i / (self.pop_size - standard_count)) * 0.4  # Bias từ 0.5 đến 0.9
-            population.append(self.initialize_diverse_individual(bias))
-            
-        return population
+            biases.append(0.5 + (i / (self.pop_size - standard_count)) * 0.4)  # Bias từ 0.5 đến 0.9
+
+        # Sinh và cân bằng cả quần thể trong một lần dưới dạng ma trận
+        return self.to_individuals(self.balance_flow_batch(self.initialize_batch(biases)))
+
+    def initialize_batch(self, biases) -> np.ndarray:
+        """
+        Sinh ma trận luồng (len(biases) x số cạnh) chưa cân bằng, cùng phân phối với
+        initialize_diverse_individual: hàng có bias None lấy ngẫu nhiên đều trong [0, cap];
+        hàng có bias b lấy cap * U(b, 1) trên cạnh ra từ nguồn/vào đích.
+        Ma trận có kiểu self.flow_dtype; số ngẫu nhiên vẫn sinh dạng int64 (giữ nguyên dãy
+        số với cùng seed) nhưng theo từng khối hàng nên không cần cả ma trận int64 tạm
+        """
+        n_rows = len(biases)
+        caps = self.capacity_array
+        # Capacity từ int64 max trở lên (uint64) không cộng 1 trên int64 được: sinh thẳng kiểu
+        # uint64 với cận trên bao gồm (dãy số khác, nhưng nhánh int64 không dùng được ở đây)
+        huge = caps.dtype == np.uint64 and int(caps.max()) >= np.iinfo(np.int64).max
+        # Cộng 1 trên int64 để capacity 255 của uint8 không bị tràn về 0
+        high = None if huge else caps.astype(np.int64) + 1
+        flows = np.empty((n_rows, len(caps)), dtype=caps.dtype)
+        chunk = max(1, BATCH_CHUNK_ELEMENTS // max(1, len(caps)))
+        for start in range(0, n_rows, chunk):
+            stop = min(start + chunk, n_rows)
+            if huge:
+                flows[start:stop] = self.np_rng.integers(0, caps, size=(stop - start, len(caps)),
+                                                         dtype=np.uint64, endpoint=True)
+            else:
+                flows[start:stop] = self.np_rng.integers(0, high, size=(stop - start, len(caps)))
+
+        biased_rows = np.array([i for i, bias in enumerate(biases) if bias is not None], dtype=np.int64)
+        terminal = np.flatnonzero(self.is_terminal_edge)
+        if len(biased_rows) and len(terminal):
+            low = np.array([biases[i] for i in biased_rows], dtype=np.float64)[:, None]
+            fraction = self.np_rng.uniform(low, 1.0, size=(len(biased_rows), len(terminal)))
+            scaled = caps[terminal] * fraction
+            flows[np.ix_(biased_rows, terminal)] = _truncate_to(scaled, caps.dtype)
+        return flows
+
+    def fresh_individuals(self, count: int) -> list:
+        """
+        count cá thể mới với luồng cao trên các cạnh nguồn/đích (bias FRESH_BIAS), dùng để tiêm
+        đa dạng định kỳ và thay các cá thể trùng
+        """
+        return self._as_individuals(self.to_individuals(
+            self.balance_flow_batch(self.initialize_batch([FRESH_BIAS] * count))))
+
+    def to_individuals(self, flows: np.ndarray) -> List[Dict[Tuple[int, int], int]]:
+        """Chuyển từng hàng của ma trận luồng thành cá thể dạng dict"""
+        keys = self.edge_keys
+        return [dict(zip(keys, row)) for row in flows.tolist()]
+
+    def balance_flow_batch(self, flows: np.ndarray) -> np.ndarray:
+        """
+        Phiên bản theo lô của balance_flow: cân bằng mọi hàng của ma trận luồng cùng lúc.
+        Duyệt các đỉnh theo cùng thứ tự và áp dụng cùng các bước điều chỉnh, nên mỗi hàng
+        cho kết quả giống hệt balance_flow trên cá thể tương ứng khi các tổng luồng dưới 2**53
+        (float64 còn chính xác); lớn hơn thì tỷ lệ co được làm tròn khác đi đôi chút nhưng
+        luồng vẫn nằm trong capacity.
+        """
+        caps = self.capacity_array[:, None]
+        # Làm việc trên ma trận chuyển vị (cạnh x cá thể) để lấy các cạnh của một đỉnh là lấy các hàng liền nhau
+        # Ma trận luồng đưa về kiểu self.flow_dtype (sau khi cắt theo capacity nên không tràn)
+        capped = np.minimum(flows, self.capacity_array.astype(flows.dtype)).astype(self.flow_dtype, copy=False)
+        flows_t = np.ascontiguousarray(capped.T)
+
+        for _ in range(3):
+            for (in_idx, out_idx), (in_repeats, out_repeats) in zip(self.balance_order, self.balance_repeats):
+                self.cancel_token.check()
+                incoming = flows_t[in_idx]
+                outgoing = flows_t[out_idx]
+                # Cộng theo sum_dtype (có dấu): tổng của kiểu hẹp có thể tràn, hiệu không dấu thì quay vòng
+                imbalance = incoming.sum(axis=0, dtype=self.sum_dtype) - outgoing.sum(axis=0, dtype=self.sum_dtype)
+
+                cols = np.flatnonzero(imbalance > 0)
+                if len(cols):
+                    self._adjust_batch(flows_t, cols, imbalance[cols], out_idx, outgoing, in_idx, incoming, caps,
+                                       out_repeats, in_repeats)
+                cols = np.flatnonzero(imbalance < 0)
+                if len(cols):
+                    # Lấy lại các cạnh vì bước trên có thể đã sửa chúng (khi một cạnh vừa vào vừa ra)
+                    self._adjust_batch(flows_t, cols, -imbalance[cols], in_idx, flows_t[in_idx],
+                                       out_idx, flows_t[out_idx], caps, in_repeats, out_repeats)
+        return flows_t.T.copy()
+
+    @staticmethod
+    def _adjust_batch(flows_t, cols, amount, fill_idx, fill_flows, scale_idx, scale_flows, caps,
+                      fill_repeats=None, scale_repeats=None):
+        """
+        Giống _adjust_outgoing_flow/_adjust_incoming_flow cho nhiều cá thể (cột): lần lượt lấp
+        đầy các cạnh fill_idx theo thứ tự, phần còn thiếu thì co các cạnh scale_idx theo tỷ lệ.
+        Tính toán theo kiểu của amount (kiểu cộng dồn có dấu) rồi ghi lại theo kiểu của flows_t.
+        fill_repeats/scale_repeats: _repeated_edges của fill_idx/scale_idx
+        """
+        remaining = amount
+        if fill_repeats is not None:
+            fill_idx = fill_repeats[0]
+            fill_flows = flows_t[fill_idx]
+        if len(fill_idx):
+            current = fill_flows[:, cols].astype(amount.dtype)
+            space = np.maximum(caps[fill_idx].astype(amount.dtype) - current, 0)
+            # Lượng đã lấp vào các cạnh đứng trước mỗi cạnh (tham lam theo thứ tự)
+            before = np.cumsum(space, axis=0) - space
+            added = np.clip(remaining - before, 0, space)
+            flows_t[np.ix_(fill_idx, cols)] = current + added
+            remaining = remaining - added.sum(axis=0)
+
+        short = remaining > 0
+        if len(scale_idx) and short.any():
+            cols, remaining = cols[short], remaining[short]
+            current = flows_t[np.ix_(scale_idx, cols)]
+            total = current.sum(axis=0, dtype=amount.dtype)
+            positive = total > 0
+            if positive.any():
+                # Tổng kiểu object (vượt int64) chia ra số Python: đưa về float64 như balance_flow
+                ratio = ((total[positive] - remaining[positive]) / total[positive]).astype(np.float64, copy=False)
+                if scale_repeats is None:
+                    current = current[:, positive]
+                    flows_t[np.ix_(scale_idx, cols[positive])] = np.minimum(
+                        _truncate_to(current * ratio, flows_t.dtype), current)
+                else:
+                    edges, counts = scale_repeats
+                    values = flows_t[np.ix_(edges, cols[positive])]
+                    for times in range(counts.max()):
+                        rows = counts > times
+                        values[rows] = np.minimum(_truncate_to(values[rows] * ratio, flows_t.dtype), values[rows])
+                    flows_t[np.ix_(edges, cols[positive])] = values
 
     def balance_flow(self, flow: Dict[Tuple[int, int], int]) -> Dict[Tuple[int, int], int]:
         """Cân bằng luồng tại các đỉnh trung gian để đảm bảo tính bảo toàn"""
@@ -89,6 +343,7 @@ class GASolver:
         # Lặp để lan truyền thay đổi qua mạng
         for _ in range(3):
             for node in self.intermediate_nodes:
+                self.cancel_token.check()
                 # Tính luồng vào và ra
                 inflow = sum(balanced_flow.get(edge, 0) for edge in self.incoming_edges[node])
                 outflow = sum(balanced_flow.get(edge, 0) for edge in self.outgoing_edges[node])
@@ -128,7 +383,8 @@ class GASolver:
             if total_inflow > 0:
                 ratio = (total_inflow - remaining) / total_inflow
                 for edge in incoming_edges:
-                    flow[edge] = int(flow[edge] * ratio)
+                    # min: trên 2**53 tích float có thể làm tròn lên quá luồng cũ (và capacity)
+                    flow[edge] = min(int(flow[edge] * ratio), flow[edge])
 
     def _adjust_incoming_flow(self, flow, node, deficit):
         """Tăng luồng vào hoặc giảm luồng ra để bù đắp deficit"""
@@ -153,67 +409,84 @@ class GASolver:
             if total_outflow > 0:
                 ratio = (total_outflow - remaining) / total_outflow
                 for edge in outgoing_edges:
-                    flow[edge] = int(flow[edge] * ratio)
+                    flow[edge] = min(int(flow[edge] * ratio), flow[edge])
 
     def build_residual_graph(self, flow: Dict[Tuple[int, int], int]) -> Dict[int, List[Tuple[int, int]]]:
         residual = defaultdict(list)
-        for (u, v), f_val in flow.items():
-            cap = self.capacity_map[(u,v)]
-            if f_val < cap:
-                residual[u].append((v, cap - f_val))
-            if f_val > 0:
-                residual[v].append((u, f_val))  # backward edge
+        items = iter(flow.items())
+        for _ in range(0, len(flow), EDGE_CHUNK):
+            self.cancel_token.raise_if_cancelled()
+            for (u, v), f_val in itertools.islice(items, EDGE_CHUNK):
+                cap = self.capacity_map[(u,v)]
+                if f_val < cap:
+                    residual[u].append((v, cap - f_val))
+                if f_val > 0:
+                    residual[v].append((u, f_val))  # backward edge
         return residual
 
     def find_augmenting_paths(self, flow: Dict[Tuple[int, int], int], max_paths: int) -> List[Tuple[List[int], int]]:
         """
         Tìm các đường tăng luồng từ source đến sink trên đồ thị phần dư
         Trả về danh sách các đường đi (dưới dạng list các đỉnh) và giá trị bottleneck của mỗi đường
+        (chỉ các đường đã tìm được nếu hết thời gian giữa chừng)
         """
         residual = self.build_residual_graph(flow)
         paths = []
+        steps = 0
 
-        def dfs(u, visited, path_nodes):
-            if u == self.sink:
-                # Tính bottleneck của đường đi hiện tại
-                bottleneck = float('inf')
+        def path_bottleneck(path_nodes):
+            """Tính bottleneck của đường đi, trả về 0 nếu đường không hợp lệ"""
+            bottleneck = float('inf')
+            for i in range(len(path_nodes) - 1):
+                u, v = path_nodes[i], path_nodes[i+1]
                 
-                for i in range(len(path_nodes) - 1):
-                    u, v = path_nodes[i], path_nodes[i+1]
-                    
-                    # Xác định loại cạnh (xuôi/ngược) trong đồ thị phần dư để tính capacity
-                    if (u, v) in self.capacity_map:  # Cạnh xuôi trong đồ thị gốc
-                        res_cap = self.capacity_map[(u, v)] - flow.get((u, v), 0)
-                    else:  # Cạnh ngược trong đồ thị phần dư
-                        res_cap = flow.get((v, u), 0)
-                    
-                    if res_cap <= 0:  # Không hợp lệ
-                        return
-                    
-                    bottleneck = min(bottleneck, res_cap)
+                # Xác định loại cạnh (xuôi/ngược) trong đồ thị phần dư để tính capacity
+                if (u, v) in self.capacity_map:  # Cạnh xuôi trong đồ thị gốc
+                    res_cap = self.capacity_map[(u, v)] - flow.get((u, v), 0)
+                else:  # Cạnh ngược trong đồ thị phần dư
+                    res_cap = flow.get((v, u), 0)
                 
-                if bottleneck > 0 and bottleneck != float('inf'):
-                    paths.append((path_nodes[:], bottleneck))
-                return
-
-            # Nếu đã tìm đủ số đường cần thiết, dừng lại
-            if len(paths) >= max_paths:
-                return
+                if res_cap <= 0:  # Không hợp lệ
+                    return 0
+                
+                bottleneck = min(bottleneck, res_cap)
+            return bottleneck if bottleneck != float('inf') else 0
 
-            # Duyệt các đỉnh kề trong đồ thị phần dư
-            for v, _ in residual.get(u, []):
-                if v not in visited:
+        def dfs():
+            # DFS không đệ quy; một đỉnh đã duyệt thì không duyệt lại trong cùng lượt tìm
+            # (trừ sink), nên mỗi lượt chỉ tốn O(V + E) thay vì liệt kê mọi đường đi đơn
+            nonlocal steps
+            visited = {self.source}
+            path_nodes = [self.source]
+            stack = [iter(residual.get(self.source, []))]
+            while stack:
+                self.cancel_token.check()
+                steps += 1
+                if steps % TIME_CHECK_INTERVAL == 0 and self.time_exhausted():
+                    return
+                for v, _ in stack[-1]:
+                    if v in visited:
+                        continue
+                    if v == self.sink:
+                        bottleneck = path_bottleneck(path_nodes + [v])
+                        if bottleneck > 0:
+                            paths.append((path_nodes + [v], bottleneck))
+                        continue
+                    # Nếu đã tìm đủ số đường cần thiết, dừng lại
+                    if len(paths) >= max_paths:
+                        return
                     visited.add(v)
                     path_nodes.append(v)
-                    dfs(v, visited, path_nodes)
+                    stack.append(iter(residual.get(v, [])))
+                    break
+                else:
+                    stack.pop()
                     path_nodes.pop()
-                    visited.remove(v)
         
         # Cố gắng tìm nhiều đường tăng luồng
         for _ in range(max_paths):
-            visited = {self.source}
-            dfs(self.source, visited, [self.source])
-            if len(paths) >= max_paths:
+            dfs()
+            if len(paths) >= max_paths or self.metrics.get("budget_exhausted"):
                 break
                 
         return paths[:max_paths]
@@ -225,9 +498,9 @@ class GASolver:
         2. Kết hợp các đường này để tạo cá thể con
         3. Giới hạn theo capacity và cân bằng luồng
         """
-        # Có thể bỏ qua crossover với xác suất (1 - crossover_rate)
-        if random.random() > self.crossover_rate:
-            return random.choice([F1, F2]).copy()
+        # Có thể bỏ qua crossover với xác suất (1 - crossover_rate), và luôn bỏ qua khi sắp hết giờ
+        if self.rng.random() > self.crossover_rate or self._cheap:
+            return self.rng.choice([F1, F2])
         
         # Bước 1: Tìm đường tăng luồng từ mỗi cá thể cha mẹ
         # Số đường tăng luồng = max_paths_crossover (thường là 2-3)
@@ -264,12 +537,68 @@ class GASolver:
         # Bước 6: Cân bằng luồng để đảm bảo inflow = outflow tại các đỉnh trung gian
         return self.balance_flow(complete_flow)
 
+    def improve_by_augmenting(self, flow: Dict[Tuple[int, int], int], max_paths: int,
+                              deadline: float = None) -> Tuple[Dict[Tuple[int, int], int], int]:
+        """
+        Tìm kiếm cục bộ: đẩy tối đa max_paths đường tăng luồng ngắn nhất (BFS trên đồ thị phần dư)
+        vào một luồng bảo toàn. Không sửa flow; dừng sớm khi hết đường hoặc quá deadline
+        (time.perf_counter()).
+
+        Returns:
+            Tuple gồm luồng mới (chính flow nếu không đẩy được đường nào) và tổng lượng đã đẩy
+        """
+        improved = None
+        pushed = 0
+        for _ in range(max_paths):
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            current = improved if improved is not None else flow
+            # parent[v] = (đỉnh trước, cạnh gốc, +1 nếu đi xuôi / -1 nếu đi ngược cạnh)
+            parent = {self.source: None}
+            queue = [self.source]
+            for u in queue:
+                self.cancel_token.check()
+                if self.sink in parent:
+                    break
+                for edge in self.outgoing_edges[u]:
+                    v = edge[1]
+                    if v not in parent and current[edge] < self.capacity_map[edge]:
+                        parent[v] = (u, edge, 1)
+                        queue.append(v)
+                for edge in self.incoming_edges[u]:
+                    v = edge[0]
+                    if v not in parent and current[edge] > 0:
+                        parent[v] = (u, edge, -1)
+                        queue.append(v)
+            if self.sink not in parent:
+                break
+
+            path = []
+            node = self.sink
+            while parent[node] is not None:
+                node, edge, direction = parent[node]
+                path.append((edge, direction))
+            bottleneck = min(self.capacity_map[edge] - current[edge] if direction > 0 else current[edge]
+                             for edge, direction in path)
+
+            if improved is None:
+                improved = flow.copy()
+            for edge, direction in path:
+                improved[edge] += direction * bottleneck
+            pushed += bottleneck
+
+        return (improved if improved is not None else flow), pushed
+
     def compute_fitness(self, flow: Dict[Tuple[int, int], int]) -> int:
         """
         Tính độ thích nghi của một cá thể (luồng)
         Độ thích nghi = tổng luồng ra từ nguồn (hoặc vào đích)
         Với điều kiện: luồng phải bảo toàn tại các đỉnh trung gian
         """
+        if isinstance(flow, DeltaFlow):
+            # Cá thể copy-on-write: fitness suy ra từ các tổng đã lưu (tính một lần nếu chưa có)
+            return self.flow_state(flow).fitness
+
         # Tính tổng luồng ra từ nguồn
         source_outflow = sum(f_val for (u, v), f_val in flow.items() if u == self.source)
         
@@ -278,6 +607,7 @@ class GASolver:
         
         # Kiểm tra bảo toàn luồng tại các đỉnh trung gian
         for node in self.intermediate_nodes:
+            self.cancel_token.check()
             inflow = sum(flow.get(edge, 0) for edge in self.incoming_edges[node])
             outflow = sum(flow.get(edge, 0) for edge in self.outgoing_edges[node])
             
@@ -289,12 +619,96 @@ class GASolver:
         # Đảm bảo không tạo luồng "từ hư không"
         return min(source_outflow, sink_inflow)
 
+    def flow_state(self, flow) -> FlowState:
+        """
+        Các tổng của một luồng (ra từ nguồn, vào đích, độ lệch các đỉnh trung gian); được lưu
+        vào DeltaFlow để các cá thể con cập nhật dần thay vì tính lại
+        """
+        if isinstance(flow, DeltaFlow) and flow.state is not None:
+            return flow.state
+        source_outflow = sum(f_val for (u, v), f_val in flow.items() if u == self.source)
+        sink_inflow = sum(f_val for (u, v), f_val in flow.items() if v == self.sink)
+        imbalance = {}
+        for node in self.intermediate_nodes:
+            self.cancel_token.check()
+            diff = (sum(flow.get(edge, 0) for edge in self.incoming_edges[node])
+                    - sum(flow.get(edge, 0) for edge in self.outgoing_edges[node]))
+            if diff:
+                imbalance[node] = diff
+        state = FlowState(source_outflow, sink_inflow, imbalance)
+        if isinstance(flow, DeltaFlow):
+            flow.state = state
+        return state
+
+    def apply_delta(self, flow, changes: Dict[Tuple[int, int], int]) -> DeltaFlow:
+        """
+        Cá thể con copy-on-write: flow ghi đè bởi changes rồi cân bằng. Cho cùng kết quả với
+        balance_flow trên bản sao đầy đủ, nhưng chỉ xử lý các đỉnh bị lệch nên chi phí tỷ lệ
+        với số cạnh thay đổi. flow (dict hoặc DeltaFlow, phải nằm trong capacity) không bị sửa.
+        """
+        editor = DeltaEditor(flow, self.flow_state(flow).copy(), self.source, self.sink,
+                             self.intermediate_nodes, self.edge_multiplicity)
+        for edge, value in changes.items():
+            editor[edge] = min(value, self.capacity_map[edge])
+        self._balance_delta(editor)
+        return derive(editor.base, editor.delta, editor.state, self.delta_compact_fraction)
+
+    def _balance_delta(self, editor: DeltaEditor):
+        """
+        balance_flow trên DeltaEditor: duyệt các đỉnh bị lệch theo đúng thứ tự balance_nodes
+        (đỉnh cân bằng thì balance_flow cũng bỏ qua). Đỉnh bị lệch thêm ở phía sau được xử lý
+        ngay trong lượt, ở phía trước thì ở lượt sau, như khi duyệt toàn bộ.
+        """
+        imbalance = editor.state.imbalance
+        for _ in range(3):
+            if not imbalance:
+                break
+            heap = [self.balance_position[node] for node in imbalance]
+            heapq.heapify(heap)
+            current = -1
+            while heap:
+                position = heapq.heappop(heap)
+                if position <= current:
+                    continue
+                current = position
+                self.cancel_token.check()
+                node = self.balance_nodes[position]
+                excess = imbalance.get(node, 0)
+                if not excess:
+                    continue
+                editor.touched.clear()
+                if excess > 0:
+                    self._adjust_outgoing_flow(editor, node, excess)
+                else:
+                    self._adjust_incoming_flow(editor, node, -excess)
+                for other in editor.touched:
+                    if self.balance_position[other] > position:
+                        heapq.heappush(heap, self.balance_position[other])
+
+    def compute_fitness_batch(self, flows: np.ndarray) -> np.ndarray:
+        """
+        Phiên bản theo lô của compute_fitness cho ma trận luồng (cá thể x cạnh, thứ tự edge_keys).
+        Các tổng được cộng dồn theo sum_dtype nên không tràn dù luồng lưu ở kiểu hẹp.
+
+        Returns:
+            Mảng fitness của từng hàng (-1 với hàng không bảo toàn luồng)
+        """
+        source_outflow = flows[:, self.source_edge_idx].sum(axis=1, dtype=self.sum_dtype)
+        sink_inflow = flows[:, self.sink_edge_idx].sum(axis=1, dtype=self.sum_dtype)
+        fitness = np.minimum(source_outflow, sink_inflow)
+
+        conserved = np.ones(len(flows), dtype=bool)
+        for in_idx, out_idx in self.balance_order:
+            self.cancel_token.check()
+            conserved &= (flows[:, in_idx].sum(axis=1, dtype=self.sum_dtype)
+                          == flows[:, out_idx].sum(axis=1, dtype=self.sum_dtype))
+        fitness[~conserved] = -1
+        return fitness
+
     def mutate(self, flow: Dict[Tuple[int, int], int]) -> Dict[Tuple[int, int], int]:
         """
         Đột biến luồng: thay đổi ngẫu nhiên giá trị luồng trên một số cạnh
         """
-        new_flow = flow.copy()
-        
         # Sử dụng tỷ lệ đột biến thích ứng nếu được kích hoạt
         mutation_rate = self.current_mutation_rate
         
@@ -302,20 +716,27 @@ class GASolver:
         if not self.adaptive_mutation:
             mutation_rate = min(0.02, max(0.01, mutation_rate))
         
-        # Duyệt qua từng cạnh trong đồ thị
-        for u, v, cap in self.graph_edges:
-            # Áp dụng đột biến với xác suất mutation_rate
-            if random.random() < mutation_rate:
-                # Đột biến đơn giản: gán giá trị ngẫu nhiên từ 0 đến capacity
-                new_flow[(u, v)] = random.randint(0, cap)
+        # Duyệt qua từng cạnh trong đồ thị (theo từng khối để kiểm tra hủy giữa các khối)
+        changes = {}
+        for start in range(0, len(self.graph_edges), EDGE_CHUNK):
+            self.cancel_token.raise_if_cancelled()
+            for u, v, cap in self.graph_edges[start:start + EDGE_CHUNK]:
+                # Áp dụng đột biến với xác suất mutation_rate
+                if self.rng.random() < mutation_rate:
+                    # Đột biến đơn giản: gán giá trị ngẫu nhiên từ 0 đến capacity
+                    changes[(u, v)] = self.rng.randint(0, cap)
         
         # Cân bằng luồng sau khi đột biến
+        if self.copy_on_write:
+            return self.apply_delta(flow, changes)
+        new_flow = flow.copy()
+        new_flow.update(changes)
         return self.balance_flow(new_flow)
     
     def tournament_selection(self, population, fitness_scores, tournament_size):
         """Select an individual using tournament selection"""
         # Select tournament_size individuals randomly
-        tournament_indices = random.sample(range(len(population)), min(tournament_size, len(population)))
+        tournament_indices = self.rng.sample(range(len(population)), min(tournament_size, len(population)))
         
         # Find the best individual in the tournament
         best_idx = tournament_indices[0]
@@ -328,6 +749,136 @@ class GASolver:
                 
         return population[best_idx]
     
+    def select_parents(self, fitness_scores, n_pairs) -> np.ndarray:
+        """
+        Chọn cha mẹ cho n_pairs cá thể con trong một lần, theo self.selection
+
+        Returns:
+            Mảng chỉ số (n_pairs, 2) vào quần thể: mỗi hàng là một cặp cha mẹ
+        """
+        fitness = np.asarray(fitness_scores, dtype=np.float64)
+        size = len(fitness)
+        n_parents = 2 * n_pairs
+        if n_pairs <= 0 or size == 0:
+            return np.empty((0, 2), dtype=np.int64)
+
+        if self.selection == "tournament":
+            if self.tournament_size > 0 and size > self.tournament_size:
+                # Mỗi hàng là một vòng đấu (lấy có hoàn lại); người thắng là cá thể có fitness cao nhất
+                contestants = self.np_rng.integers(0, size, size=(n_parents, self.tournament_size))
+                winners = contestants[np.arange(n_parents), np.argmax(fitness[contestants], axis=1)]
+            else:
+                # Quần thể quá nhỏ để đấu: chọn ngẫu nhiên
+                winners = self.np_rng.integers(0, size, size=n_parents)
+        elif self.selection == "sus":
+            # Trọng số không âm (cá thể không khả thi có fitness -1)
+            weights = fitness - fitness.min() + 1e-9
+            cumulative = np.cumsum(weights)
+            step = cumulative[-1] / n_parents
+            pointers = self.np_rng.uniform(0, step) + step * np.arange(n_parents)
+            winners = np.minimum(np.searchsorted(cumulative, pointers, side="right"), size - 1)
+            # Các con trỏ đều nhau cho ra chỉ số đã sắp xếp; xáo trộn để ghép cặp ngẫu nhiên
+            winners = self.np_rng.permutation(winners)
+        else:
+            # Rank tuyến tính: cá thể tệ nhất hạng 0, tốt nhất hạng size - 1
+            ranks = np.empty(size, dtype=np.float64)
+            ranks[np.argsort(fitness, kind="stable")] = np.arange(size)
+            if size > 1:
+                probabilities = ((2 - RANK_PRESSURE) + 2 * (RANK_PRESSURE - 1) * ranks / (size - 1)) / size
+            else:
+                probabilities = np.ones(1)
+            winners = self.np_rng.choice(size, size=n_parents, p=probabilities / probabilities.sum())
+
+        return winners.reshape(n_pairs, 2)
+
+    def local_search_step(self, population, fitness_scores):
+        """
+        Áp dụng improve_by_augmenting cho local_search_elites cá thể khả thi tốt nhất, thay
+        cá thể và fitness tương ứng trong population/fitness_scores. Dừng khi hết
+        local_search_budget giây của thế hệ này.
+        """
+        start = time.perf_counter()
+        if self._cheap:
+            return
+        deadline = start + self.local_search_budget if self.local_search_budget else None
+        if self._deadline is not None:
+            deadline = self._deadline if deadline is None else min(deadline, self._deadline)
+        elites = heapq.nlargest(self.local_search_elites, range(len(fitness_scores)),
+                                key=fitness_scores.__getitem__)
+        for i in elites:
+            if fitness_scores[i] < 0 or (deadline is not None and time.perf_counter() > deadline):
+                break
+            improved, pushed = self.improve_by_augmenting(population[i], self.local_search_paths, deadline)
+            self.metrics["local_search_calls"] += 1
+            if pushed:
+                fitness = self.compute_fitness(improved)
+                if fitness > fitness_scores[i]:
+                    self.metrics["local_search_improved"] += 1
+                    self.metrics["local_search_gain"] += fitness - fitness_scores[i]
+                    population[i] = self._as_individuals([improved])[0]
+                    fitness_scores[i] = fitness
+        self.metrics["local_search_seconds"] += time.perf_counter() - start
+
+    def population_diversity(self, population) -> Tuple[Dict[str, float], List[int]]:
+        """
+        Đa dạng của quần thể, qua băm nội dung từng cá thể (luồng trên mọi cạnh):
+        - unique_ratio: tỷ lệ cá thể khác nhau
+        - mean_hamming: số cạnh khác nhau trung bình giữa hai cá thể, ước lượng trên tối đa
+          DIVERSITY_SAMPLE cá thể cách đều trong quần thể
+
+        Returns:
+            Tuple gồm các chỉ số và danh sách vị trí các cá thể trùng với một cá thể đứng trước
+        """
+        size = len(population)
+        if not size:
+            return {"unique_ratio": 0.0, "mean_hamming": 0.0}, []
+        sample = set(np.linspace(0, size - 1, min(size, DIVERSITY_SAMPLE)).round().astype(int).tolist())
+
+        base_rows = {}
+        seen = set()
+        duplicates = []
+        sampled_rows = []
+        for i, flow in enumerate(population):
+            self.cancel_token.check()
+            row = self._flow_row(flow, base_rows)
+            digest = hashlib.blake2b(row, digest_size=16).digest()
+            if digest in seen:
+                duplicates.append(i)
+            else:
+                seen.add(digest)
+            if i in sample:
+                sampled_rows.append(row)
+
+        # Trên mỗi cạnh (một hàng sau khi sắp xếp và chuyển vị), các cặp cá thể bằng nhau là
+        # các cặp trong cùng một đoạn giá trị liên tiếp
+        n = len(sampled_rows)
+        mean_hamming = 0.0
+        if n > 1:
+            values = np.sort(np.array(sampled_rows), axis=0).T
+            run_start = np.ones(values.shape, dtype=bool)
+            run_start[:, 1:] = values[:, 1:] != values[:, :-1]
+            run_lengths = np.bincount(np.cumsum(run_start.ravel()) - 1)
+            pairs = n * (n - 1) // 2
+            equal_pairs = int((run_lengths * (run_lengths - 1) // 2).sum())
+            mean_hamming = (values.shape[0] * pairs - equal_pairs) / pairs
+        return {"unique_ratio": len(seen) / size, "mean_hamming": mean_hamming}, duplicates
+
+    def _flow_row(self, flow, base_rows: Dict[int, np.ndarray]) -> np.ndarray:
+        """
+        Luồng của một cá thể dạng mảng theo thứ tự edge_keys (cá thể luôn có đủ các cạnh theo
+        thứ tự đó); base dùng chung của các DeltaFlow chỉ được chuyển một lần trong base_rows
+        """
+        if not isinstance(flow, DeltaFlow):
+            return np.fromiter(flow.values(), dtype=self.flow_dtype, count=len(self.edge_keys))
+        row = base_rows.get(id(flow.base))
+        if row is None:
+            row = base_rows[id(flow.base)] = np.fromiter(
+                flow.base.values(), dtype=self.flow_dtype, count=len(self.edge_keys))
+        if flow.delta:
+            row = row.copy()
+            row[[self.edge_index[edge] for edge in flow.delta]] = list(flow.delta.values())
+        return row
+
     def update_mutation_rate(self, current_best_fitness):
         """Cập nhật tỷ lệ đột biến dựa trên lịch sử cải thiện"""
         self.best_fitness_history.append(current_best_fitness)
@@ -346,24 +897,44 @@ class GASolver:
             # Nếu vừa cải thiện, từ từ giảm tỷ lệ đột biến để tinh chỉnh
             self.current_mutation_rate = max(0.001, self.current_mutation_rate * 0.95)
 
-    def run(self):
+    def run(self, progress_callback=None, should_stop=None, cancel_token: CancellationToken = None):
         """
-        Thực thi thuật toán di truyền:
+        Thực thi thuật toán di truyền.
+
+        Cá thể là bất biến: mọi toán tử tạo dict mới thay vì sửa cá thể đầu vào, nên cá thể
+        ưu tú, top 5 và lời giải tốt nhất chỉ giữ tham chiếu, không sao chép. Với copy_on_write,
+        cá thể trong quần thể là DeltaFlow; lời giải trả về luôn là dict thường.
+
+        Các bước:
         1. Khởi tạo quần thể
         2. Lặp qua các thế hệ
            - Đánh giá độ thích nghi
            - Chọn lọc cá thể ưu tú (top-k)
            - Lai ghép và đột biến để tạo quần thể mới
         3. Trả về cá thể tốt nhất và top 5 các cá thể
+
+        Args:
+            progress_callback: Hàm nhận một bản ghi thống kê sau mỗi thế hệ
+                {"generation", "best", "mean", "infeasible_fraction", "unique_ratio",
+                "mean_hamming"} (sau mỗi bước nếu steady_state, xem run_steady_state);
+                hai trường đa dạng đo quần thể trước khi thay cá thể trùng
+            should_stop: Hàm trả về True khi cần dừng sớm (được kiểm tra giữa các
+                thế hệ và giữa các cá thể con)
+            cancel_token: CancellationToken được kiểm tra cả bên trong các toán tử dài (cân bằng
+                luồng, tìm đường tăng luồng, đột biến, ...), nên dừng nhanh cả trên đồ thị lớn;
+                nếu chỉ có should_stop thì nó được bọc thành token. Khi bị hủy, metrics có
+                "cancelled" và "stop_latency" (giây từ lúc yêu cầu hủy đến lúc run() trả về).
+
+        Với time_limit/deadline, hạn chót được kiểm tra ở cùng các chỗ đó và trong lúc tìm
+        đường tăng luồng của lai ghép; xem metrics["budget_exhausted"] sau khi chạy.
         """
+        if self.steady_state:
+            return self.run_steady_state(progress_callback, should_stop, cancel_token)
+
         # Khởi tạo các biến cần thiết
-        self.graph_edges_keys_only = list(self.capacity_map.keys())
-        self.current_mutation_rate = self.mutation_rate
-        self.best_fitness_history = []
-        self.no_improvement_count = 0
+        self._reset_run_state(should_stop, cancel_token)
 
-        # Khởi tạo quần thể ban đầu
-        population = self.initialize_population()
+        population = []
         best_solution = None
         best_fitness = float('-inf')
         fitness_history = []
@@ -371,81 +942,460 @@ class GASolver:
         # Theo dõi top 5 cá thể tốt nhất
         top_solutions = []
 
-        # Lặp qua các thế hệ
-        for generation in range(self.generations):
-            # Tính độ thích nghi cho mỗi cá thể trong quần thể
-            fitness_scores = [self.compute_fitness(ind) for ind in population]
+        telemetry = self._open_telemetry()
+        profiler = self._start_memory_profile()
+        run_start = time.perf_counter()
+        # Chỉ đo đa dạng khi có nơi dùng: loại trùng, bản ghi tiến độ hoặc telemetry
+        track_diversity = self.deduplicate or progress_callback is not None or telemetry is not None
+
+        try:
+            # Khởi tạo quần thể ban đầu
+            population = self._as_individuals(self.initialize_population())
+
+            # Lặp qua các thế hệ
+            for generation in range(self.generations):
+                if self._stop_requested(should_stop):
+                    break
+
+                # Đo đa dạng trước khi đánh giá; cá thể trùng (giữ lại lần xuất hiện đầu tiên,
+                # nên cá thể ưu tú ở đầu quần thể không bị thay) được thay bằng cá thể mới
+                diversity, duplicates = (self.population_diversity(population)
+                                         if track_diversity else ({}, []))
+                if self.deduplicate and duplicates:
+                    for i, individual in zip(duplicates, self.fresh_individuals(len(duplicates))):
+                        population[i] = individual
+                    self.metrics["duplicates_replaced"] += len(duplicates)
+
+                # Tính độ thích nghi cho mỗi cá thể trong quần thể
+                phase_start = time.perf_counter()
+                fitness_scores = [self.compute_fitness(ind) for ind in population]
+                t_eval = time.perf_counter() - phase_start
+
+                t_local = 0.0
+                if self.local_search and fitness_scores:
+                    phase_start = time.perf_counter()
+                    best_before_search = max(fitness_scores)
+                    self.local_search_step(population, fitness_scores)
+                    # Phần cải thiện lời giải tốt nhất chỉ có được nhờ tìm kiếm cục bộ
+                    self.metrics["local_search_best_gain"] += max(
+                        0, max(fitness_scores) - max(best_fitness, best_before_search))
+                    t_local = time.perf_counter() - phase_start
             
-            # Tìm cá thể tốt nhất trong thế hệ hiện tại
-            current_max_fitness = float('-inf')
-            current_best_individual = None
-            if fitness_scores:
-                current_max_fitness = max(fitness_scores)
-                current_best_individual = population[fitness_scores.index(current_max_fitness)]
-
-            # Cập nhật lời giải tốt nhất
-            if current_max_fitness > best_fitness:
-                best_fitness = current_max_fitness
-                best_solution = current_best_individual.copy()
-                self.no_improvement_count = 0
-            else:
-                self.no_improvement_count += 1
+                # Tìm cá thể tốt nhất trong thế hệ hiện tại
+                current_max_fitness = float('-inf')
+                current_best_individual = None
+                if fitness_scores:
+                    current_max_fitness = max(fitness_scores)
+                    current_best_individual = population[fitness_scores.index(current_max_fitness)]
+
+                # Cập nhật lời giải tốt nhất (cá thể không bị sửa tại chỗ nên giữ tham chiếu là đủ)
+                if current_max_fitness > best_fitness:
+                    best_fitness = current_max_fitness
+                    best_solution = current_best_individual
+                    self.no_improvement_count = 0
+                    self.last_improvement_gen = generation
+                else:
+                    self.no_improvement_count += 1
 
-            # Ghi lại lịch sử độ thích nghi tốt nhất
-            fitness_history.append(best_fitness)
+                # Ghi lại lịch sử độ thích nghi tốt nhất
+                fitness_history.append(best_fitness)
+
+                infeasible = sum(1 for score in fitness_scores if score < 0)
+                if progress_callback is not None and fitness_scores:
+                    progress_callback(dict({
+                        "generation": generation,
+                        "best": best_fitness,
+                        "mean": sum(fitness_scores) / len(fitness_scores),
+                        "infeasible_fraction": infeasible / len(fitness_scores),
+                    }, **diversity))
             
-            # Cập nhật tỷ lệ đột biến nếu kích hoạt chế độ thích ứng
-            if self.adaptive_mutation:
-                self.update_mutation_rate(current_max_fitness)
+                # Cập nhật tỷ lệ đột biến nếu kích hoạt chế độ thích ứng
+                if self.adaptive_mutation:
+                    self.update_mutation_rate(current_max_fitness)
 
-            # Kiểm tra điều kiện dừng sớm
-            if not fitness_scores or not population:
-                break
+                # Kiểm tra điều kiện dừng sớm
+                if not fitness_scores or not population:
+                    break
 
-            # Sắp xếp quần thể theo độ thích nghi
-            sorted_population_with_scores = sorted(zip(fitness_scores, population), 
-                                                 key=lambda x: x[0], reverse=True)
+                # Chỉ lấy chỉ số của các cá thể tốt nhất thay vì sắp xếp cả quần thể
+                # (nlargest giữ thứ tự ổn định như sorted(..., reverse=True))
+                phase_start = time.perf_counter()
+                ranked = heapq.nlargest(max(self.top_k, 5), range(len(fitness_scores)),
+                                        key=fitness_scores.__getitem__)
             
-            # Cập nhật top 5 sau mỗi thế hệ
-            top_solutions = [(score, ind.copy()) for score, ind in sorted_population_with_scores[:5]]
+                # Cập nhật top 5 sau mỗi thế hệ
+                top_solutions = [(fitness_scores[i], population[i]) for i in ranked[:5]]
             
-            # Chọn lọc: giữ lại top_k cá thể tốt nhất (elitism)
-            new_population = [ind for _, ind in sorted_population_with_scores[:self.top_k]]
+                # Chọn lọc: giữ lại top_k cá thể tốt nhất (elitism)
+                new_population = [population[i] for i in ranked[:self.top_k]]
+                t_select = time.perf_counter() - phase_start
+                phase_start = time.perf_counter()
             
-            # Tạo phần còn lại của quần thể thông qua lai ghép và đột biến
-            while len(new_population) < self.pop_size:
-                # Chọn lọc: Tournament selection
-                if self.tournament_size > 0 and len(population) > self.tournament_size:
-                    parent1 = self.tournament_selection(population, fitness_scores, self.tournament_size)
-                    parent2 = self.tournament_selection(population, fitness_scores, self.tournament_size)
-                else:
-                    # Hoặc chọn ngẫu nhiên nếu không dùng tournament
-                    parent1 = random.choice(population)
-                    parent2 = random.choice(population)
+                # Chọn lọc: chọn cha mẹ cho mọi cá thể con của thế hệ trong một lần
+                parent_pairs = self.select_parents(fitness_scores, self.pop_size - len(new_population))
+
+                # Tạo phần còn lại của quần thể thông qua lai ghép và đột biến
+                for index1, index2 in parent_pairs.tolist():
+                    if self._stop_requested(should_stop):
+                        break
+                    parent1, parent2 = population[index1], population[index2]
                 
-                # Lai ghép: Path-based crossover
-                child = self.crossover_path_based(parent1, parent2)
+                    # Lai ghép: Path-based crossover
+                    child = self.crossover_path_based(parent1, parent2)
                 
-                # Đột biến
-                child = self.mutate(child)
+                    # Đột biến
+                    child = self.mutate(child)
                 
-                # Thêm vào quần thể mới
-                new_population.append(child)
+                    # Thêm vào quần thể mới
+                    new_population.append(child)
             
-            # Cập nhật quần thể
-            population = new_population[:self.pop_size]
+                # Cập nhật quần thể
+                population = new_population[:self.pop_size]
+
+                # Định kỳ thay một phần quần thể bằng cá thể mới để duy trì đa dạng
+                if self.diversity_injection and generation > 0 and generation % max(1, self.generations // 10) == 0:
+                    num_fresh = min(max(1, self.pop_size // 20), len(population))
+                    for i, individual in enumerate(self.fresh_individuals(num_fresh)):
+                        population[-(i + 1)] = individual
+
+                if profiler is not None and generation % self.memory_profile_every == 0:
+                    self._sample_memory(profiler, generation, population, best_solution, fitness_history,
+                                        top_solutions=top_solutions)
+
+                if telemetry is not None:
+                    telemetry.write(dict({
+                        "generation": generation,
+                        "best": best_fitness,
+                        "gen_best": current_max_fitness,
+                        "mean": sum(fitness_scores) / len(fitness_scores),
+                        "worst": min(fitness_scores),
+                        "infeasible": infeasible,
+                        "mutation_rate": self.current_mutation_rate,
+                        "t_eval": t_eval,
+                        "t_local": t_local,
+                        "t_select": t_select,
+                        "t_breed": time.perf_counter() - phase_start,
+                        "elapsed": time.perf_counter() - run_start,
+                    }, **diversity))
+        except OperationCancelled:
+            # Bị hủy giữa một toán tử: giữ lời giải tốt nhất đã được đánh giá
+            pass
+        finally:
+            if telemetry is not None:
+                telemetry.close()
+            if profiler is not None:
+                self.metrics["memory"] = profiler.stop()
+        self._record_cancellation()
+
+        # Trả về kết quả: cá thể tốt nhất, độ thích nghi, lịch sử, top 5 cá thể
+        return as_dict(best_solution), best_fitness, fitness_history, self._pad_top_solutions(
+            top_solutions, best_solution, best_fitness)
+
+    def run_steady_state(self, progress_callback=None, should_stop=None, cancel_token: CancellationToken = None):
+        """
+        Chế độ steady-state của run(): quần thể là một bộ đệm cố định pop_size phần tử được
+        thay tại chỗ, nên không cấp phát lại cả quần thể mỗi thế hệ. Fitness, tổng fitness và
+        số cá thể không khả thi được cập nhật dần sau mỗi lần thay; cá thể tốt nhất/tệ nhất lấy
+        từ hai heap (xóa lười bằng số phiên bản của từng ô).
+
+        progress_callback được gọi sau mỗi bước với "generation" là số thực (thế hệ + phần đã
+        xong của thế hệ đó) để đường chất lượng mượt hơn; fitness_history và telemetry vẫn theo thế hệ.
+        Đa dạng được đo (và cá thể trùng được thay) ở đầu mỗi thế hệ, nên các bước trong cùng
+        thế hệ báo cùng unique_ratio/mean_hamming.
+        Tham số và giá trị trả về giống run().
+        """
+        self._reset_run_state(should_stop, cancel_token)
 
+        try:
+            population = self._as_individuals(self.initialize_population())
+            fitness_scores = [self.compute_fitness(ind) for ind in population]
+        except OperationCancelled:
+            self._record_cancellation()
+            return None, float('-inf'), [], self._pad_top_solutions([], None, float('-inf'))
+        size = len(population)
+        fitness_sum = sum(fitness_scores)
+        infeasible = sum(1 for score in fitness_scores if score < 0)
+
+        # Heap (fitness, ô, phiên bản); một mục đã cũ khi phiên bản khác version[ô]
+        version = [0] * size
+        best_heap = [(-score, i, 0) for i, score in enumerate(fitness_scores)]
+        worst_heap = [(score, i, 0) for i, score in enumerate(fitness_scores)]
+        heapq.heapify(best_heap)
+        heapq.heapify(worst_heap)
+
+        def peek(heap):
+            while heap[0][2] != version[heap[0][1]]:
+                heapq.heappop(heap)
+            return heap[0][1]
+
+        def replace(target, individual, score):
+            """Đặt cá thể vào ô target và cập nhật các tổng, heap"""
+            nonlocal fitness_sum, infeasible
+            fitness_sum += score - fitness_scores[target]
+            infeasible += (score < 0) - (fitness_scores[target] < 0)
+            population[target] = individual
+            fitness_scores[target] = score
+            version[target] += 1
+            heapq.heappush(best_heap, (-score, target, version[target]))
+            heapq.heappush(worst_heap, (score, target, version[target]))
+
+        best_index = peek(best_heap) if size else None
+        best_fitness = fitness_scores[best_index] if size else float('-inf')
+        best_solution = population[best_index] if size else None
+        fitness_history = []
+
+        telemetry = self._open_telemetry()
+        profiler = self._start_memory_profile()
+        run_start = time.perf_counter()
+        # Chỉ đo đa dạng khi có nơi dùng: loại trùng, bản ghi tiến độ hoặc telemetry
+        track_diversity = self.deduplicate or progress_callback is not None or telemetry is not None
+        timings = dict(t_eval=0.0, t_local=0.0, t_select=0.0, t_breed=0.0)
+        steps_per_generation = max(1, -(-size // self.offspring_per_step))
+        step_offspring = self.offspring_per_step
+
+        stopped = False
+        try:
+            for generation in range(self.generations if size else 0):
+                gen_best = float('-inf')
+
+                diversity, duplicates = (self.population_diversity(population)
+                                         if track_diversity else ({}, []))
+                if self.deduplicate and duplicates:
+                    for target, individual in zip(duplicates, self.fresh_individuals(len(duplicates))):
+                        replace(target, individual, self.compute_fitness(individual))
+                    self.metrics["duplicates_replaced"] += len(duplicates)
+                    top = peek(best_heap)
+                    if fitness_scores[top] > best_fitness:
+                        best_fitness = fitness_scores[top]
+                        best_solution = population[top]
+                        self.last_improvement_gen = generation
+
+                for step in range(steps_per_generation):
+                    if self._stop_requested(should_stop):
+                        stopped = True
+                        break
+
+                    phase_start = time.perf_counter()
+                    parent_pairs = self.select_parents(fitness_scores, step_offspring)
+                    timings["t_select"] += time.perf_counter() - phase_start
+
+                    for index1, index2 in parent_pairs.tolist():
+                        phase_start = time.perf_counter()
+                        child = self.mutate(self.crossover_path_based(population[index1], population[index2]))
+                        timings["t_breed"] += time.perf_counter() - phase_start
+                        phase_start = time.perf_counter()
+                        child_fitness = self.compute_fitness(child)
+                        timings["t_eval"] += time.perf_counter() - phase_start
+                        gen_best = max(gen_best, child_fitness)
+
+                        # Chọn ô bị thay: tệ nhất, hoặc kẻ thua một vòng đấu ngẫu nhiên
+                        if self.replacement == "worst":
+                            target = peek(worst_heap)
+                        else:
+                            contestants = self.rng.sample(range(size), min(self.tournament_size, size))
+                            target = min(contestants, key=fitness_scores.__getitem__)
+                        # Chỉ thay khi con không tệ hơn, nên cá thể tốt nhất không bao giờ bị mất
+                        if child_fitness < fitness_scores[target]:
+                            continue
+
+                        replace(target, child, child_fitness)
+                        if child_fitness > best_fitness:
+                            best_fitness = child_fitness
+                            best_solution = child
+                            self.no_improvement_count = 0
+                            self.last_improvement_gen = generation
+
+                    # Dọn các mục cũ khi heap phình to để bộ nhớ không tăng theo số bước
+                    if len(best_heap) > 4 * size:
+                        best_heap = [(-score, i, version[i]) for i, score in enumerate(fitness_scores)]
+                        worst_heap = [(score, i, version[i]) for i, score in enumerate(fitness_scores)]
+                        heapq.heapify(best_heap)
+                        heapq.heapify(worst_heap)
+
+                    if progress_callback is not None:
+                        progress_callback(dict({
+                            "generation": generation + step / steps_per_generation,
+                            "best": best_fitness,
+                            "mean": fitness_sum / size,
+                            "infeasible_fraction": infeasible / size,
+                        }, **diversity))
+
+                if self.local_search:
+                    phase_start = time.perf_counter()
+                    before = list(fitness_scores)
+                    self.local_search_step(population, fitness_scores)
+                    for i, (old, new) in enumerate(zip(before, fitness_scores)):
+                        if new != old:
+                            fitness_sum += new - old
+                            version[i] += 1
+                            heapq.heappush(best_heap, (-new, i, version[i]))
+                            heapq.heappush(worst_heap, (new, i, version[i]))
+                    top = peek(best_heap)
+                    if fitness_scores[top] > best_fitness:
+                        self.metrics["local_search_best_gain"] += fitness_scores[top] - best_fitness
+                        best_fitness = fitness_scores[top]
+                        best_solution = population[top]
+                        self.last_improvement_gen = generation
+                    timings["t_local"] += time.perf_counter() - phase_start
+
+                # Thế hệ bị dừng giữa chừng vẫn được ghi nhận như run()
+                fitness_history.append(best_fitness)
+                if self.adaptive_mutation:
+                    self.update_mutation_rate(best_fitness)
+
+                # Định kỳ thay các cá thể tệ nhất bằng cá thể mới để duy trì đa dạng
+                if self.diversity_injection and generation > 0 and generation % max(1, self.generations // 10) == 0:
+                    num_fresh = min(max(1, self.pop_size // 20), size)
+                    for individual in self.fresh_individuals(num_fresh):
+                        target = peek(worst_heap)
+                        if target == peek(best_heap):
+                            break
+                        replace(target, individual, self.compute_fitness(individual))
+
+                if profiler is not None and generation % self.memory_profile_every == 0:
+                    self._sample_memory(profiler, generation, population, best_solution, fitness_history,
+                                        heaps=[fitness_scores, version, best_heap, worst_heap])
+
+                if telemetry is not None:
+                    telemetry.write(dict(
+                        timings,
+                        **diversity,
+                        generation=generation,
+                        best=best_fitness,
+                        gen_best=gen_best,
+                        mean=fitness_sum / size,
+                        worst=fitness_scores[peek(worst_heap)],
+                        infeasible=infeasible,
+                        mutation_rate=self.current_mutation_rate,
+                        elapsed=time.perf_counter() - run_start,
+                    ))
+                    timings = dict.fromkeys(timings, 0.0)
+
+                if stopped:
+                    break
+        except OperationCancelled:
+            # Mỗi lần thay cá thể là nguyên tử nên quần thể vẫn nhất quán
+            pass
+        finally:
+            if telemetry is not None:
+                telemetry.close()
+            if profiler is not None:
+                self.metrics["memory"] = profiler.stop()
+        self._record_cancellation()
+
+        ranked = heapq.nlargest(5, range(size), key=fitness_scores.__getitem__)
+        top_solutions = [(fitness_scores[i], population[i]) for i in ranked]
+        return as_dict(best_solution), best_fitness, fitness_history, self._pad_top_solutions(
+            top_solutions, best_solution, best_fitness)
+
+    def _reset_run_state(self, should_stop=None, cancel_token: CancellationToken = None):
+        """Đặt lại seed, token hủy và các biến theo dõi trước mỗi lần chạy"""
+        self.cancel_token = cancel_token or CancellationToken.from_should_stop(should_stop)
+        if self.seed is not None:
+            self.rng.seed(self.seed)
+            self.np_rng = np.random.default_rng(self.seed)
+        self.graph_edges_keys_only = list(self.capacity_map.keys())
+        self.current_mutation_rate = self.mutation_rate
+        self.best_fitness_history = []
+        self.no_improvement_count = 0
+        self.last_improvement_gen = 0
+        self.metrics = {"budget_exhausted": False}
+        self._cheap = False
+        self._deadline = self._cheap_after = None
+        budgets = []
+        if self.time_limit is not None:
+            budgets.append(self.time_limit)
+        if self.deadline is not None:
+            budgets.append(self.deadline - time.time())
+        if budgets:
+            budget = max(0.0, min(budgets))
+            self._deadline = time.perf_counter() + budget
+            if self.cheap_operators_fraction:
+                self._cheap_after = self._deadline - budget * self.cheap_operators_fraction
+        if self.local_search:
+            self.metrics.update(local_search_calls=0, local_search_improved=0, local_search_gain=0,
+                                local_search_best_gain=0, local_search_seconds=0.0)
+        if self.deduplicate:
+            self.metrics["duplicates_replaced"] = 0
+
+    def time_exhausted(self) -> bool:
+        """
+        True khi đã qua hạn chót của lần chạy (và ghi metrics["budget_exhausted"]); đồng thời
+        chuyển sang toán tử rẻ khi gần hết giờ
+        """
+        if self._deadline is None:
+            return False
+        now = time.perf_counter()
+        if now >= self._deadline:
+            self.metrics["budget_exhausted"] = True
+            return True
+        if not self._cheap and self._cheap_after is not None and now >= self._cheap_after:
+            self._cheap = True
+            self.metrics["cheap_operators"] = True
+        return False
+
+    def _stop_requested(self, should_stop) -> bool:
+        return (should_stop is not None and should_stop()) or self.cancel_token.cancelled or self.time_exhausted()
+
+    def _record_cancellation(self):
+        if self.cancel_token.cancelled:
+            self.metrics["cancelled"] = True
+            self.metrics["stop_latency"] = self.cancel_token.latency()
+        # Token chỉ có hiệu lực trong lần chạy; các toán tử gọi riêng sau đó không bị hủy
+        self.cancel_token = CancellationToken()
+
+    def _start_memory_profile(self):
+        if not self.memory_profile:
+            return None
+        from logic.memory_profile import MemoryProfiler
+        profiler = MemoryProfiler()
+        profiler.start()
+        return profiler
+
+    def _sample_memory(self, profiler, generation, population, best_solution, fitness_history, **extra):
+        """
+        Một mẫu bộ nhớ ở cuối thế hệ. Đồ thị phần dư là bản dựng từ lời giải tốt nhất, đại diện
+        cho mỗi đồ thị phần dư tạm mà lai ghép dựng (hai bản cho mỗi cá thể con); extra là các
+        cấu trúc riêng của từng chế độ (top 5, hoặc fitness và các heap của steady-state).
+        """
+        profiler.sample(generation, dict({
+            "population": population,
+            "residual_graph": self.build_residual_graph(best_solution) if best_solution else {},
+            "fitness_history": fitness_history,
+        }, **extra))
+
+    def _open_telemetry(self):
+        if not self.telemetry_path:
+            return None
+        from logic.telemetry import TelemetryWriter
+        return TelemetryWriter(self.telemetry_path, meta={
+            "n_edges": len(self.graph_edges), "source": self.source, "sink": self.sink,
+            "pop_size": self.pop_size, "generations": self.generations, "seed": self.seed,
+            "steady_state": self.steady_state,
+        })
+
+    def _as_individuals(self, flows):
+        """
+        Bọc các dict thành DeltaFlow gốc khi copy_on_write, để các tổng của mỗi cá thể chỉ
+        được tính một lần dù nó làm cha nhiều lần
+        """
+        if not self.copy_on_write:
+            return flows
+        return [DeltaFlow(flow) for flow in flows]
+
+    @staticmethod
+    def _pad_top_solutions(top_solutions, best_solution, best_fitness):
+        # Kết quả trả ra ngoài luôn là dict thường
+        top_solutions = [(score, as_dict(flow)) for score, flow in top_solutions]
         # Đảm bảo trả về ít nhất một cá thể khi top_solutions rỗng
         if not top_solutions and best_solution is not None:
-            top_solutions = [(best_fitness, best_solution)]
+            top_solutions = [(best_fitness, as_dict(best_solution))]
 
         # Đảm bảo có đúng 5 phần tử
         while len(top_solutions) < 5:
             # Điền các phần tử giả nếu thiếu
             top_solutions.append((0, {}))
-
-        # Trả về kết quả: cá thể tốt nhất, độ thích nghi, lịch sử, top 5 cá thể
-        return best_solution, best_fitness, fitness_history, top_solutions
+        return top_solutions
 
 # Example usage (outside class, for testing or integration)
 # graph_edges_example = [(0, 1, 10), (0, 2, 5), (1, 2, 15), (1, 3, 5), (2, 3, 10)]
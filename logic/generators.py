@@ -0,0 +1,238 @@
+"""
+Bộ sinh đồ thị mạng luồng không phụ thuộc Qt, dùng NumPy để sinh nhanh các đồ thị lớn.
+
+Mọi hàm sinh trả về (edges, source, sink), trong đó edges là danh sách (u, v, capacity)
+giống đầu vào của GASolver/FordFulkersonSolver, hoặc mảng NumPy (m, 3) khi as_array=True.
+Quy ước giống GraphEditor: source = 0, sink = 1, các đỉnh khác đánh số từ 2; không có cạnh
+đi vào source, đi ra từ sink, khuyên hay cạnh trùng lặp.
+
+Dòng lệnh:
+    python -m logic.generators rmat --scale 16 --edge-factor 16 -o graph.txt
+"""
+import argparse
+from typing import List, Tuple, Union
+
+import numpy as np
+
+SOURCE = 0
+SINK = 1
+FIRST_NODE = 2
+
+EdgeList = Union[List[Tuple[int, int, int]], np.ndarray]
+
+
+def _finalize(u, v, rng, capacity_range, as_array) -> Tuple[EdgeList, int, int]:
+    """Loại khuyên, cạnh trùng, cạnh vào source/ra khỏi sink rồi gán capacity ngẫu nhiên"""
+    u = np.asarray(u, dtype=np.int64)
+    v = np.asarray(v, dtype=np.int64)
+    keep = (u != v) & (v != SOURCE) & (u != SINK)
+    u, v = u[keep], v[keep]
+
+    if len(u):
+        n = int(max(u.max(), v.max())) + 1
+        _, unique_index = np.unique(u * n + v, return_index=True)
+        unique_index.sort()
+        u, v = u[unique_index], v[unique_index]
+
+    low, high = capacity_range
+    capacities = rng.integers(low, high + 1, size=len(u), dtype=np.int64)
+    edges = np.column_stack((u, v, capacities))
+    if as_array:
+        return edges, SOURCE, SINK
+    return list(map(tuple, edges.tolist())), SOURCE, SINK
+
+
+def _bernoulli_pairs(rng, rows, cols, prob):
+    """Chọn ngẫu nhiên các cặp (rows[i], cols[j]) với xác suất prob, không tạo ma trận dày khi prob nhỏ"""
+    n_pairs = len(rows) * len(cols)
+    if n_pairs == 0 or prob <= 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    if prob >= 1:
+        flat = np.arange(n_pairs, dtype=np.int64)
+    elif prob < 0.1:
+        # Xác suất nhỏ: lấy mẫu khoảng cách hình học giữa các cặp được chọn
+        gaps = rng.geometric(prob, size=int(n_pairs * prob * 1.2) + 16)
+        while gaps.sum() < n_pairs:
+            gaps = np.concatenate([gaps, rng.geometric(prob, size=len(gaps))])
+        flat = np.cumsum(gaps) - 1
+        flat = flat[flat < n_pairs]
+    else:
+        flat = np.flatnonzero(rng.random(n_pairs) < prob)
+    return np.asarray(rows)[flat // len(cols)], np.asarray(cols)[flat % len(cols)]
+
+
+def layered_graph(num_layers=3, nodes_per_layer=6, edge_prob=0.3, capacity_range=(10, 30),
+                  seed=None, as_array=False):
+    """
+    Đồ thị phân lớp giống GraphEditor.random_graph: source -> lớp 1 -> ... -> lớp cuối -> sink
+
+    Cạnh từ source và vào sink xuất hiện với xác suất edge_prob + 0.5,
+    cạnh giữa hai lớp liên tiếp với xác suất edge_prob.
+    """
+    rng = np.random.default_rng(seed)
+    layers = [FIRST_NODE + i * nodes_per_layer + np.arange(nodes_per_layer) for i in range(num_layers)]
+
+    us, vs = [], []
+    u, v = _bernoulli_pairs(rng, [SOURCE], layers[0], edge_prob + 0.5)
+    us.append(u)
+    vs.append(v)
+    for i in range(num_layers - 1):
+        u, v = _bernoulli_pairs(rng, layers[i], layers[i + 1], edge_prob)
+        us.append(u)
+        vs.append(v)
+    u, v = _bernoulli_pairs(rng, layers[-1], [SINK], edge_prob + 0.5)
+    us.append(u)
+    vs.append(v)
+
+    return _finalize(np.concatenate(us), np.concatenate(vs), rng, capacity_range, as_array)
+
+
+def grid_graph(rows=10, cols=10, capacity_range=(10, 30), seed=None, as_array=False):
+    """
+    Lưới rows x cols: cạnh sang phải và cạnh dọc hai chiều giữa các ô kề nhau;
+    source nối vào cột đầu tiên, cột cuối cùng nối vào sink
+    """
+    rng = np.random.default_rng(seed)
+    ids = FIRST_NODE + np.arange(rows * cols, dtype=np.int64).reshape(rows, cols)
+
+    right_u, right_v = ids[:, :-1].ravel(), ids[:, 1:].ravel()
+    down_u, down_v = ids[:-1, :].ravel(), ids[1:, :].ravel()
+    u = np.concatenate([np.full(rows, SOURCE), right_u, down_u, down_v, ids[:, -1]])
+    v = np.concatenate([ids[:, 0], right_v, down_v, down_u, np.full(rows, SINK)])
+    return _finalize(u, v, rng, capacity_range, as_array)
+
+
+def random_geometric_graph(n=1000, radius=0.05, capacity_range=(10, 30), seed=None, as_array=False):
+    """
+    Đồ thị hình học ngẫu nhiên: n điểm trong hình vuông đơn vị, nối hai điểm cách nhau
+    không quá radius theo hướng x tăng. Source nối các điểm có x < radius,
+    các điểm có x > 1 - radius nối vào sink.
+    Dùng lưới ô kích thước radius nên chi phí tỉ lệ với số cạnh, không phải n^2.
+    """
+    rng = np.random.default_rng(seed)
+    points = rng.random((n, 2))
+    n_cells = max(1, int(1 / radius))
+    cell = np.minimum((points * n_cells).astype(np.int64), n_cells - 1)
+    cell_id = cell[:, 0] * n_cells + cell[:, 1]
+
+    order = np.argsort(cell_id, kind="stable")
+    sorted_cells = cell_id[order]
+
+    us, vs = [], []
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            nx, ny = cell[:, 0] + dx, cell[:, 1] + dy
+            valid = (nx >= 0) & (nx < n_cells) & (ny >= 0) & (ny < n_cells)
+            sources = np.flatnonzero(valid)
+            target_cell = nx[valid] * n_cells + ny[valid]
+            starts = np.searchsorted(sorted_cells, target_cell, side="left")
+            counts = np.searchsorted(sorted_cells, target_cell, side="right") - starts
+            # Mở rộng mỗi điểm thành các cặp với mọi điểm trong ô lân cận
+            pair_u = np.repeat(sources, counts)
+            offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+            pair_v = order[np.repeat(starts, counts) + offsets]
+            close = np.sum((points[pair_u] - points[pair_v]) ** 2, axis=1) <= radius ** 2
+            forward = points[pair_u, 0] < points[pair_v, 0]
+            keep = close & forward
+            us.append(pair_u[keep])
+            vs.append(pair_v[keep])
+
+    u = np.concatenate(us) + FIRST_NODE
+    v = np.concatenate(vs) + FIRST_NODE
+    left = np.flatnonzero(points[:, 0] < radius) + FIRST_NODE
+    right = np.flatnonzero(points[:, 0] > 1 - radius) + FIRST_NODE
+    u = np.concatenate([np.full(len(left), SOURCE), u, right])
+    v = np.concatenate([left, v, np.full(len(right), SINK)])
+    return _finalize(u, v, rng, capacity_range, as_array)
+
+
+def rmat_graph(scale=10, edge_factor=8, probabilities=(0.57, 0.19, 0.19, 0.05), terminals=16,
+               capacity_range=(1, 100), seed=None, as_array=False):
+    """
+    Đồ thị luật lũy thừa R-MAT với 2^scale đỉnh và khoảng edge_factor * 2^scale cạnh.
+    Source nối vào `terminals` đỉnh có bậc ra lớn nhất, `terminals` đỉnh có bậc vào
+    lớn nhất nối vào sink.
+    """
+    rng = np.random.default_rng(seed)
+    n = 2 ** scale
+    m = edge_factor * n
+    a, b, c, _ = probabilities
+
+    u = np.zeros(m, dtype=np.int64)
+    v = np.zeros(m, dtype=np.int64)
+    for bit in range(scale):
+        r = rng.random(m)
+        # Chọn góc phần tư của ma trận kề cho từng cạnh ở mỗi mức
+        right = (r >= a) & (r < a + b) | (r >= a + b + c)
+        down = r >= a + b
+        u |= down.astype(np.int64) << bit
+        v |= right.astype(np.int64) << bit
+
+    # Hoán vị nhãn để các đỉnh bậc cao không dồn về chỉ số nhỏ
+    permutation = rng.permutation(n)
+    u, v = permutation[u] + FIRST_NODE, permutation[v] + FIRST_NODE
+
+    out_degree = np.bincount(u - FIRST_NODE, minlength=n)
+    in_degree = np.bincount(v - FIRST_NODE, minlength=n)
+    k = min(terminals, n)
+    hubs_out = np.argsort(out_degree)[-k:] + FIRST_NODE
+    hubs_in = np.argsort(in_degree)[-k:] + FIRST_NODE
+
+    u = np.concatenate([np.full(k, SOURCE), u, hubs_in])
+    v = np.concatenate([hubs_out, v, np.full(k, SINK)])
+    return _finalize(u, v, rng, capacity_range, as_array)
+
+
+def write_edge_list(path: str, edges: EdgeList, source: int = SOURCE, sink: int = SINK):
+    """Ghi đồ thị ra file văn bản: dòng đầu `source sink`, mỗi dòng sau `u v capacity`"""
+    np.savetxt(path, np.asarray(edges, dtype=np.int64).reshape(-1, 3), fmt="%d",
+               header=f"{source} {sink}", comments="")
+
+
+def read_edge_list(path: str, as_array=False) -> Tuple[EdgeList, int, int]:
+    """Đọc đồ thị đã ghi bởi write_edge_list"""
+    with open(path) as f:
+        source, sink = map(int, f.readline().split())
+        edges = np.loadtxt(f, dtype=np.int64, ndmin=2).reshape(-1, 3)
+    if as_array:
+        return edges, source, sink
+    return list(map(tuple, edges.tolist())), source, sink
+
+
+GENERATORS = {
+    "layered": layered_graph,
+    "grid": grid_graph,
+    "geometric": random_geometric_graph,
+    "rmat": rmat_graph,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sinh đồ thị mạng luồng cho kiểm thử tải")
+    parser.add_argument("kind", choices=GENERATORS)
+    parser.add_argument("-o", "--output", required=True, help="File đầu ra")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--layers", type=int, default=10)
+    parser.add_argument("--nodes-per-layer", type=int, default=100)
+    parser.add_argument("--edge-prob", type=float, default=0.3)
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--cols", type=int, default=100)
+    parser.add_argument("--nodes", type=int, default=10000)
+    parser.add_argument("--radius", type=float, default=0.02)
+    parser.add_argument("--scale", type=int, default=14)
+    parser.add_argument("--edge-factor", type=int, default=16)
+    args = parser.parse_args()
+
+    kwargs = {
+        "layered": dict(num_layers=args.layers, nodes_per_layer=args.nodes_per_layer, edge_prob=args.edge_prob),
+        "grid": dict(rows=args.rows, cols=args.cols),
+        "geometric": dict(n=args.nodes, radius=args.radius),
+        "rmat": dict(scale=args.scale, edge_factor=args.edge_factor),
+    }[args.kind]
+    edges, source, sink = GENERATORS[args.kind](seed=args.seed, as_array=True, **kwargs)
+    write_edge_list(args.output, edges, source, sink)
+    print(f"Đã ghi {len(edges)} cạnh vào {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Cây Gomory–Hu (thuật toán Gusfield) cho mạng vô hướng hoặc đối xứng.
+
+Chỉ cần n - 1 lần giải luồng cực đại để dựng cây; sau đó giá trị lát cắt nhỏ nhất (= luồng
+cực đại) giữa hai đỉnh bất kỳ là trọng số nhỏ nhất trên đường đi giữa chúng trong cây,
+trả lời trong O(n) mà không phải giải lại.
+
+    tree = GomoryHuTree(graph_edges)
+    tree.min_cut_value(3, 7)
+    tree.min_cut_values([(0, 1), (2, 5)])
+"""
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from logic.ford_fulkerson import FordFulkersonSolver
+
+
+def undirected_capacities(graph_edges: List[Tuple[int, int, int]], symmetric: bool = False) -> Dict[Tuple[int, int], int]:
+    """
+    Gộp danh sách cạnh thành capacity vô hướng {(min(u, v), max(u, v)): capacity}
+
+    Args:
+        symmetric: False = mỗi (u, v, c) là một cạnh vô hướng, các cạnh song song được cộng dồn;
+            True = mạng có hướng đối xứng, c(u, v) phải bằng c(v, u) và được dùng làm capacity vô hướng
+    """
+    capacities = {}
+    if not symmetric:
+        for u, v, capacity in graph_edges:
+            if u != v:
+                key = (min(u, v), max(u, v))
+                capacities[key] = capacities.get(key, 0) + capacity
+        return capacities
+
+    directed = {}
+    for u, v, capacity in graph_edges:
+        if u != v:
+            directed[(u, v)] = directed.get((u, v), 0) + capacity
+    for (u, v), capacity in directed.items():
+        if directed.get((v, u), 0) != capacity:
+            raise ValueError(f"Mạng không đối xứng: c({u}, {v}) = {capacity}, c({v}, {u}) = {directed.get((v, u), 0)}")
+        capacities[(min(u, v), max(u, v))] = capacity
+    return capacities
+
+
+class GomoryHuTree:
+    def __init__(
+        self,
+        graph_edges: List[Tuple[int, int, int]],
+        symmetric: bool = False,
+        nodes: Iterable[int] = None,
+        progress_callback: Callable[[int, int], None] = None
+    ):
+        """
+        Dựng cây bằng n - 1 lần giải Ford-Fulkerson
+
+        Args:
+            graph_edges: Danh sách cạnh dạng [(u, v, capacity)]
+            symmetric: Xem undirected_capacities
+            nodes: Tập đỉnh (mặc định là các đỉnh xuất hiện trong graph_edges); đỉnh cô lập
+                có lát cắt 0 với mọi đỉnh khác
+            progress_callback: Hàm nhận (số lần giải đã xong, tổng số lần giải)
+        """
+        capacities = undirected_capacities(graph_edges, symmetric)
+        # Mỗi cạnh vô hướng thành hai cạnh có hướng cùng capacity
+        self.directed_edges = [(u, v, c) for (u, v), c in capacities.items()] + \
+                              [(v, u, c) for (u, v), c in capacities.items()]
+
+        node_set = set(nodes) if nodes is not None else set()
+        for u, v in capacities:
+            node_set.update((u, v))
+        self.nodes = sorted(node_set)
+
+        # Gusfield: cây lưu dưới dạng parent[v] và weight[v] = trọng số cạnh (v, parent[v])
+        root = self.nodes[0] if self.nodes else None
+        self.root = root
+        self.parent = {node: root for node in self.nodes}
+        self.weight = {}
+        total = max(0, len(self.nodes) - 1)
+        for index, s in enumerate(self.nodes[1:], start=1):
+            t = self.parent[s]
+            solver = FordFulkersonSolver(self.directed_edges, s, t)
+            flow, value = solver.solve()
+            source_side, _ = solver.min_cut(flow)
+            self.weight[s] = value
+            for other in self.nodes[index + 1:]:
+                if other in source_side and self.parent[other] == t:
+                    self.parent[other] = s
+            if progress_callback is not None:
+                progress_callback(index, total)
+
+        # Độ sâu của mỗi đỉnh để tìm tổ tiên chung khi truy vấn
+        self.depth = {}
+        for node in self.nodes:
+            self._depth(node)
+
+    def _depth(self, node: int) -> int:
+        chain = []
+        while node not in self.depth and node != self.root:
+            chain.append(node)
+            node = self.parent[node]
+        depth = self.depth.setdefault(node, 0)
+        for child in reversed(chain):
+            depth += 1
+            self.depth[child] = depth
+        return self.depth[chain[0]] if chain else depth
+
+    def edges(self) -> List[Tuple[int, int, int]]:
+        """Các cạnh của cây dạng (đỉnh, cha, trọng số)"""
+        return [(node, self.parent[node], self.weight[node]) for node in self.nodes if node != self.root]
+
+    def min_cut_value(self, u: int, v: int) -> float:
+        """Giá trị lát cắt nhỏ nhất (luồng cực đại) giữa u và v: cạnh nhẹ nhất trên đường đi trong cây"""
+        if u not in self.parent or v not in self.parent:
+            raise KeyError(f"Đỉnh {u if u not in self.parent else v} không có trong đồ thị")
+        if u == v:
+            return float('inf')
+        best = float('inf')
+        # Đi lên từ đỉnh sâu hơn cho đến khi gặp tổ tiên chung
+        while u != v:
+            if self.depth[u] < self.depth[v]:
+                u, v = v, u
+            best = min(best, self.weight[u])
+            u = self.parent[u]
+        return best
+
+    def min_cut_values(self, pairs: Iterable[Tuple[int, int]]) -> List[float]:
+        """Truy vấn theo lô: giá trị lát cắt nhỏ nhất cho từng cặp (u, v)"""
+        return [self.min_cut_value(u, v) for u, v in pairs]
+
+    def all_pairs(self) -> Dict[Tuple[int, int], float]:
+        """
+        Giá trị lát cắt nhỏ nhất cho mọi cặp u < v trong O(n^2), bằng một lần duyệt cây từ mỗi đỉnh
+        """
+        adjacency = {node: [] for node in self.nodes}
+        for node, parent, weight in self.edges():
+            adjacency[node].append((parent, weight))
+            adjacency[parent].append((node, weight))
+
+        result = {}
+        for start in self.nodes:
+            stack = [(start, float('inf'))]
+            seen = {start}
+            while stack:
+                node, bottleneck = stack.pop()
+                if node > start:
+                    result[(start, node)] = bottleneck
+                for neighbor, weight in adjacency[node]:
+                    if neighbor not in seen:
+                        seen.add(neighbor)
+                        stack.append((neighbor, min(bottleneck, weight)))
+        return result
@@ -0,0 +1,589 @@
+"""
+Dịch vụ HTTP/JSON cục bộ để gọi GASolver/FordFulkersonSolver từ chương trình khác.
+
+Chỉ lắng nghe trên 127.0.0.1 và chỉ dùng thư viện chuẩn (asyncio). Các job chạy trên một
+process pool giới hạn; khi số job đang chờ/chạy đạt max_pending, POST /jobs trả 503 kèm
+Retry-After để client tự lùi lại.
+
+    POST   /jobs              {"engine": "ga" | "ford_fulkerson", "edges": [[u, v, cap], ...],
+                               "source": 0, "sink": 1, "params": {...}}  -> 202 {"id": ..., ...}
+    GET    /jobs/<id>         Trạng thái, tiến trình mới nhất và kết quả (khi xong)
+    GET    /jobs/<id>/events  Luồng NDJSON các bản ghi tiến trình cho đến khi job kết thúc
+    DELETE /jobs/<id>         Hủy job (job đang chạy trả về kết quả tốt nhất đến lúc dừng)
+    GET    /health            Số worker, số job đang chờ/chạy
+
+Kết quả có cùng các khóa với compare_ga_with_optimal, thêm "metrics" (metrics của solver, vd.
+thống kê tìm kiếm cục bộ, hoặc "memory" khi params có "memory_profile": true); luồng {(u, v): f} được đổi thành danh sách [[u, v, f], ...] để
+biểu diễn được bằng JSON. Job GA bị hủy không giải Ford-Fulkerson nên các trường so sánh
+với tối ưu (optimal_*, optimality_ratio, absolute_diff) là null; các giá trị không hữu hạn
+(vd. best = -inf khi chưa có lời giải khả thi) cũng được gửi thành null. params của GA không
+được chứa telemetry_path (server sẽ ghi file theo đường dẫn của client).
+
+Chạy:
+    python -m logic.job_server --port 8765 --workers 4
+"""
+import argparse
+import asyncio
+import http.client
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from logic.result_cache import flow_to_json
+
+HOST = "127.0.0.1"
+ENGINES = ("ga", "ford_fulkerson")
+# Khoảng thời gian tối thiểu giữa hai bản ghi tiến trình gửi từ worker (giây)
+PROGRESS_INTERVAL = 0.1
+# Khoảng thời gian tối thiểu giữa hai lần worker kiểm tra yêu cầu hủy (giây)
+CANCEL_POLL_INTERVAL = 0.05
+MAX_BODY_BYTES = 64 * 1024 * 1024
+# Tham số GA client không được đặt: telemetry_path ghi file tùy ý với quyền của server
+SERVER_ONLY_PARAMS = ("telemetry_path",)
+FINISHED_STATES = ("done", "cancelled", "failed")
+
+HTTP_REASONS = {200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+                405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large",
+                503: "Service Unavailable"}
+
+
+def _throttled(fn, interval):
+    """Bọc fn để chỉ thực sự gọi tối đa một lần mỗi interval giây; giữ lại kết quả lần gọi gần nhất"""
+    state = {"last": 0.0, "value": None}
+
+    def wrapper(*args):
+        now = time.monotonic()
+        if now - state["last"] >= interval:
+            state["last"] = now
+            state["value"] = fn(*args)
+        return state["value"]
+    return wrapper
+
+
+def execute_job(job_id, engine, graph_edges, source, sink, params, progress_queue, cancel_event) -> Dict:
+    """
+    Chạy một job trong tiến trình con (hàm cấp module để pickle được)
+
+    Tiến trình được gửi qua progress_queue dạng (job_id, bản ghi); cancel_event được kiểm tra
+    định kỳ để dừng sớm.
+    """
+    from logic.cancellation import CancellationToken
+    from logic.ford_fulkerson import FordFulkersonSolver, compare_ga_with_optimal
+
+    progress_queue.put((job_id, {"type": "started"}))
+    # Event của Manager đi qua IPC nên chỉ được hỏi tối đa một lần mỗi CANCEL_POLL_INTERVAL
+    cancel_token = CancellationToken(poll=_throttled(cancel_event.is_set, CANCEL_POLL_INTERVAL))
+    start_time = time.perf_counter()
+
+    if engine == "ga":
+        from logic.ga_solver import GASolver
+
+        last_record = {}
+
+        def send(record):
+            progress_queue.put((job_id, dict(record, type="progress")))
+        send_throttled = _throttled(send, PROGRESS_INTERVAL)
+
+        def on_generation(record):
+            last_record.update(record)
+            send_throttled(record)
+
+        solver = GASolver(graph_edges, source, sink, params)
+        best_solution, _, fitness_history, _ = solver.run(progress_callback=on_generation, cancel_token=cancel_token)
+        if last_record:
+            send(last_record)
+        cancelled = cancel_event.is_set()
+        ga_seconds = time.perf_counter() - start_time
+        # Lời giải chính xác để so sánh cũng dừng được bằng cancel_token, nên worker rảnh ngay
+        # sau khi hủy; job bị hủy trước thế hệ đầu tiên không có cá thể nào, coi như luồng 0
+        ga_flow = best_solution or {}
+        optimal_result = None
+        if not cancelled:
+            optimal_result = FordFulkersonSolver(graph_edges, source, sink).solve(cancel_token=cancel_token)
+            cancelled = cancel_event.is_set()
+        if cancelled:
+            # Luồng của Ford-Fulkerson bị dừng giữa chừng không phải tối ưu, không so sánh
+            result = {
+                "ga_max_flow": sum(f_val for (u, _), f_val in ga_flow.items() if u == source),
+                "optimal_max_flow": None,
+                "optimality_ratio": None,
+                "absolute_diff": None,
+                "ga_flow": ga_flow,
+                "optimal_flow": None,
+            }
+        else:
+            result = compare_ga_with_optimal(graph_edges, source, sink, ga_flow, optimal_result=optimal_result)
+        result["ga_flow"] = flow_to_json(result["ga_flow"])
+        result["fitness_history"] = fitness_history
+        result["ga_seconds"] = ga_seconds
+        result["metrics"] = solver.metrics
+    else:
+        def on_augment(num_paths, max_flow):
+            progress_queue.put((job_id, {"type": "progress", "paths": num_paths, "flow": max_flow}))
+
+        solver = FordFulkersonSolver(graph_edges, source, sink)
+        optimal_flow, optimal_max_flow = solver.solve(
+            progress_callback=_throttled(on_augment, PROGRESS_INTERVAL), cancel_token=cancel_token,
+            memory_profile=bool(params.get("memory_profile")))
+        cancelled = cancel_event.is_set()
+        result = {
+            "ga_max_flow": None,
+            "optimal_max_flow": optimal_max_flow,
+            "optimality_ratio": None,
+            "absolute_diff": None,
+            "ga_flow": None,
+            "optimal_flow": optimal_flow,
+            "metrics": solver.metrics,
+        }
+
+    if result["optimal_flow"] is not None:
+        result["optimal_flow"] = flow_to_json(result["optimal_flow"])
+    result["engine"] = engine
+    result["seconds"] = time.perf_counter() - start_time
+    result["cancelled"] = cancelled
+    return result
+
+
+def parse_job(payload) -> Tuple[str, List[Tuple[int, int, int]], int, int, Dict]:
+    """Kiểm tra body của POST /jobs; ném ValueError với thông báo cho client nếu không hợp lệ"""
+    if not isinstance(payload, dict):
+        raise ValueError("Body phải là một object JSON")
+    engine = payload.get("engine", "ga")
+    if engine not in ENGINES:
+        raise ValueError(f"engine phải là một trong {ENGINES}")
+    try:
+        graph_edges = [(int(u), int(v), int(cap)) for u, v, cap in payload["edges"]]
+        source = int(payload["source"])
+        sink = int(payload["sink"])
+    except KeyError as e:
+        raise ValueError(f"Thiếu trường {e.args[0]!r}")
+    except (TypeError, ValueError):
+        raise ValueError("edges phải là danh sách [u, v, capacity] số nguyên; source/sink là số nguyên")
+    if not graph_edges:
+        raise ValueError("Đồ thị không có cạnh")
+    if any(cap < 0 for _, _, cap in graph_edges):
+        raise ValueError("Capacity không được âm")
+    params = payload.get("params") or {}
+    if not isinstance(params, dict):
+        raise ValueError("params phải là một object JSON")
+    if engine == "ga":
+        _check_ga_params(params)
+    return engine, graph_edges, source, sink, params
+
+
+def _check_ga_params(params: Dict):
+    """Các lỗi tham số GASolver sẽ báo trong worker được báo ngay cho client (400)"""
+    from logic.ga_solver import REPLACEMENT_SCHEMES, SELECTION_SCHEMES
+
+    for name in SERVER_ONLY_PARAMS:
+        if name in params:
+            raise ValueError(f"params.{name} không được phép qua server")
+    for name, allowed in (("selection", SELECTION_SCHEMES), ("replacement", REPLACEMENT_SCHEMES)):
+        if name in params and params[name] not in allowed:
+            raise ValueError(f"params.{name} phải là một trong {allowed}")
+    for name in ("pop_size", "generations", "top_k", "tournament_size", "max_paths_crossover"):
+        value = params.get(name)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool) or value < 1):
+            raise ValueError(f"params.{name} phải là số nguyên dương")
+    for name in ("mutation_rate", "crossover_rate"):
+        value = params.get(name)
+        if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool)
+                                  or not 0 <= value <= 1):
+            raise ValueError(f"params.{name} phải là số trong [0, 1]")
+    seed = params.get("seed")
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+        raise ValueError("params.seed phải là số nguyên không âm")
+    for name in ("time_limit", "deadline"):
+        value = params.get(name)
+        if value is not None and (not isinstance(value, (int, float)) or isinstance(value, bool)
+                                  or not math.isfinite(value) or value <= 0):
+            raise ValueError(f"params.{name} phải là số dương")
+
+
+def _dumps(data) -> str:
+    """
+    json.dumps cho client: -inf/inf/nan (vd. best của job GA bị hủy trước khi có lời giải khả
+    thi) không phải JSON hợp lệ nên được gửi thành null
+    """
+    try:
+        return json.dumps(data, allow_nan=False)
+    except ValueError:
+        return json.dumps(_finite_or_none(data), allow_nan=False)
+
+
+def _finite_or_none(value):
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite_or_none(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite_or_none(item) for item in value]
+    return value
+
+
+class QueueFull(Exception):
+    """Số job đang chờ/chạy đã đạt giới hạn"""
+
+
+class Job:
+    def __init__(self, job_id: str, engine: str, cancel_event):
+        self.id = job_id
+        self.engine = engine
+        self.status = "queued"
+        self.progress = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = cancel_event
+        self.pool_future = None
+        self.future = None
+        # Các hàng đợi asyncio của client đang theo dõi /events
+        self.subscribers = set()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_json(self, include_result=True) -> Dict:
+        data = {
+            "id": self.id,
+            "engine": self.engine,
+            "status": self.status,
+            "progress": self.progress,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error is not None:
+            data["error"] = self.error
+        if include_result and self.result is not None:
+            data["result"] = self.result
+        return data
+
+
+class JobServer:
+    """
+    Quản lý job và phục vụ HTTP. Mọi trạng thái job chỉ được sửa trên event loop;
+    tiến trình từ worker đi qua một hàng đợi của multiprocessing.Manager và một luồng đọc.
+    """
+
+    def __init__(self, max_workers: int = None, max_pending: int = None, max_finished: int = 256):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self.max_finished = max_finished
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._loop = None
+        self._server = None
+        self._executor = None
+        self._manager = None
+        self._progress_queue = None
+        self._reader_thread = None
+
+    # ---- vòng đời ----
+
+    async def start(self, port: int = 8765):
+        self._loop = asyncio.get_running_loop()
+        self._manager = multiprocessing.Manager()
+        self._progress_queue = self._manager.Queue()
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        self._reader_thread = threading.Thread(target=self._read_progress, daemon=True)
+        self._reader_thread.start()
+        self._server = await asyncio.start_server(self.handle_connection, HOST, port)
+        return self._server
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for job in self.jobs.values():
+            if not job.finished:
+                job.cancel_event.set()
+        if self._executor is not None:
+            await self._loop.run_in_executor(None, lambda: self._executor.shutdown(wait=True, cancel_futures=True))
+        if self._progress_queue is not None:
+            self._progress_queue.put(None)
+            self._reader_thread.join()
+        if self._manager is not None:
+            self._manager.shutdown()
+
+    def _read_progress(self):
+        """Chạy trong luồng riêng: chuyển bản ghi tiến trình từ worker về event loop"""
+        while True:
+            try:
+                item = self._progress_queue.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            self._loop.call_soon_threadsafe(self._on_progress, *item)
+
+    # ---- quản lý job ----
+
+    def pending_count(self) -> int:
+        return sum(1 for job in self.jobs.values() if not job.finished)
+
+    def submit(self, payload) -> Job:
+        engine, graph_edges, source, sink, params = parse_job(payload)
+        if self.pending_count() >= self.max_pending:
+            raise QueueFull()
+
+        job = Job(str(next(self._ids)), engine, self._manager.Event())
+        self.jobs[job.id] = job
+        future = self._executor.submit(execute_job, job.id, engine, graph_edges, source, sink, params,
+                                       self._progress_queue, job.cancel_event)
+        job.pool_future = future
+        job.future = asyncio.wrap_future(future)
+        job.future.add_done_callback(lambda f, job=job: self._on_done(job, f))
+        self._evict_finished()
+        return job
+
+    def cancel(self, job: Job):
+        if job.finished:
+            return
+        # Job chưa bắt đầu được bỏ khỏi hàng đợi ngay; job đang chạy sẽ thấy cancel_event và dừng sớm
+        if not job.pool_future.cancel():
+            job.cancel_event.set()
+
+    def _evict_finished(self):
+        """Giữ lại tối đa max_finished job đã kết thúc (bỏ các job cũ nhất)"""
+        finished = [job for job in self.jobs.values() if job.finished]
+        for job in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job.id]
+
+    def _on_progress(self, job_id, record):
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return
+        if record.get("type") == "started":
+            job.status = "running"
+            job.started_at = time.time()
+            self._publish(job, {"type": "status", "status": job.status})
+            return
+        job.progress = {key: value for key, value in record.items() if key != "type"}
+        self._publish(job, record)
+
+    def _on_done(self, job: Job, future):
+        job.finished_at = time.time()
+        if future.cancelled():
+            job.status = "cancelled"
+        elif future.exception() is not None:
+            job.status = "failed"
+            job.error = f"{type(future.exception()).__name__}: {future.exception()}"
+        else:
+            job.result = future.result()
+            job.status = "cancelled" if job.result["cancelled"] else "done"
+        self._publish(job, {"type": "status", "status": job.status})
+        for queue in job.subscribers:
+            queue.put_nowait(None)
+
+    def _publish(self, job: Job, event: Dict):
+        for queue in job.subscribers:
+            if queue.full():
+                # Client đọc chậm: bỏ bản ghi cũ nhất thay vì tích lũy bộ nhớ
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    # ---- HTTP ----
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").strip()
+            if not request_line:
+                return
+            method, target, _ = request_line.split(" ", 2)
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+
+            length = int(headers.get("content-length", 0))
+            if length > MAX_BODY_BYTES:
+                await self._send_json(writer, 413, {"error": "Body quá lớn"})
+                return
+            body = await reader.readexactly(length) if length else b""
+            await self.route(method, target.split("?", 1)[0], body, writer)
+        except (ValueError, asyncio.IncompleteReadError):
+            await self._send_json(writer, 400, {"error": "Yêu cầu HTTP không hợp lệ"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter):
+        parts = [part for part in path.split("/") if part]
+
+        if parts == ["health"] and method == "GET":
+            await self._send_json(writer, 200, {"workers": self.max_workers, "pending": self.pending_count(),
+                                                "max_pending": self.max_pending})
+            return
+
+        if parts == ["jobs"]:
+            if method == "GET":
+                await self._send_json(writer, 200, [job.to_json(include_result=False) for job in self.jobs.values()])
+                return
+            if method != "POST":
+                await self._send_json(writer, 405, {"error": "Chỉ hỗ trợ GET/POST"})
+                return
+            try:
+                job = self.submit(json.loads(body or b"null"))
+            except json.JSONDecodeError:
+                await self._send_json(writer, 400, {"error": "Body không phải JSON hợp lệ"})
+            except ValueError as e:
+                await self._send_json(writer, 400, {"error": str(e)})
+            except QueueFull:
+                await self._send_json(writer, 503, {"error": "Hàng đợi đã đầy, hãy thử lại sau"},
+                                      extra_headers={"Retry-After": "1"})
+            else:
+                await self._send_json(writer, 202, job.to_json())
+            return
+
+        if len(parts) in (2, 3) and parts[0] == "jobs":
+            job = self.jobs.get(parts[1])
+            if job is None:
+                await self._send_json(writer, 404, {"error": "Không tìm thấy job"})
+            elif len(parts) == 3 and parts[2] == "events" and method == "GET":
+                await self._stream_events(job, writer)
+            elif len(parts) == 2 and method == "GET":
+                await self._send_json(writer, 200, job.to_json())
+            elif len(parts) == 2 and method == "DELETE":
+                self.cancel(job)
+                await self._send_json(writer, 202, job.to_json(include_result=False))
+            else:
+                await self._send_json(writer, 405, {"error": "Phương thức không được hỗ trợ"})
+            return
+
+        await self._send_json(writer, 404, {"error": "Không tìm thấy"})
+
+    async def _send_json(self, writer, status: int, data, extra_headers: Dict = None):
+        body = _dumps(data).encode("utf-8")
+        headers = {"Content-Type": "application/json", "Content-Length": str(len(body)), "Connection": "close"}
+        headers.update(extra_headers or {})
+        writer.write(self._status_line(status, headers) + body)
+        await writer.drain()
+
+    async def _stream_events(self, job: Job, writer):
+        """Gửi các sự kiện dạng NDJSON (chunked) cho đến khi job kết thúc"""
+        headers = {"Content-Type": "application/x-ndjson", "Transfer-Encoding": "chunked", "Connection": "close"}
+        writer.write(self._status_line(200, headers))
+
+        async def send(event):
+            data = _dumps(event).encode("utf-8") + b"\n"
+            writer.write(b"%x\r\n%s\r\n" % (len(data), data))
+            await writer.drain()
+
+        queue = asyncio.Queue(maxsize=100)
+        job.subscribers.add(queue)
+        try:
+            await send({"type": "status", "status": job.status})
+            if job.progress is not None:
+                await send(dict(job.progress, type="progress"))
+            while not job.finished:
+                event = await queue.get()
+                if event is None:
+                    break
+                await send(event)
+            # Sự kiện cuối cùng mang theo toàn bộ trạng thái và kết quả
+            await send(dict(job.to_json(), type="final"))
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        finally:
+            job.subscribers.discard(queue)
+
+    @staticmethod
+    def _status_line(status: int, headers: Dict) -> bytes:
+        lines = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+class JobClient:
+    """Client tối giản (http.client) cho JobServer, tiện cho kiểm thử và script"""
+
+    def __init__(self, port: int = 8765, timeout: float = 60):
+        self.port = port
+        self.timeout = timeout
+
+    def _request(self, method, path, payload=None):
+        connection = http.client.HTTPConnection(HOST, self.port, timeout=self.timeout)
+        try:
+            body = json.dumps(payload) if payload is not None else None
+            connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            response = connection.getresponse()
+            return response.status, json.loads(response.read() or b"null")
+        finally:
+            connection.close()
+
+    def submit(self, engine, graph_edges, source, sink, params=None):
+        """Trả về (mã HTTP, job); mã 503 nghĩa là hàng đợi đầy"""
+        return self._request("POST", "/jobs", {"engine": engine, "edges": [list(edge) for edge in graph_edges],
+                                               "source": source, "sink": sink, "params": params or {}})
+
+    def get(self, job_id):
+        return self._request("GET", f"/jobs/{job_id}")[1]
+
+    def cancel(self, job_id):
+        return self._request("DELETE", f"/jobs/{job_id}")[1]
+
+    def events(self, job_id):
+        """Sinh lần lượt các sự kiện của job cho đến sự kiện "final\""""
+        connection = http.client.HTTPConnection(HOST, self.port, timeout=self.timeout)
+        try:
+            connection.request("GET", f"/jobs/{job_id}/events")
+            response = connection.getresponse()
+            for line in response:
+                if line.strip():
+                    yield json.loads(line)
+        finally:
+            connection.close()
+
+    def wait(self, job_id, poll_interval=0.2):
+        """Hỏi vòng cho đến khi job kết thúc và trả về trạng thái cuối"""
+        while True:
+            job = self.get(job_id)
+            if job["status"] in FINISHED_STATES:
+                return job
+            time.sleep(poll_interval)
+
+
+async def serve(port: int, max_workers: int = None, max_pending: int = None):
+    server = JobServer(max_workers=max_workers, max_pending=max_pending)
+    await server.start(port)
+    print(f"Job server đang chạy tại http://{HOST}:{server.port} "
+          f"({server.max_workers} worker, tối đa {server.max_pending} job chờ/chạy)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dịch vụ giải luồng cực đại cục bộ (HTTP/JSON)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None, help="Số tiến trình (mặc định = số CPU)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="Số job chờ/chạy tối đa trước khi từ chối (mặc định = 4 x số worker)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.port, args.workers, args.max_pending))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
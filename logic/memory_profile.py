@@ -0,0 +1,155 @@
+"""
+Đo bộ nhớ của một lần giải: RSS đỉnh của tiến trình, bộ nhớ Python do tracemalloc theo dõi,
+và kích thước ước lượng của từng cấu trúc dữ liệu lớn (quần thể, đồ thị phần dư, ...).
+
+    profiler = MemoryProfiler()
+    profiler.start()
+    profiler.sample(generation, {"population": population, "fitness_history": history})
+    report = profiler.stop()   # {"peak_rss", "traced_peak", "structures_peak", "samples", "top_allocations"}
+
+tracemalloc làm chương trình chậm đi vài lần nên chỉ bật khi cần đo.
+"""
+import os
+import sys
+import tracemalloc
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Số vị trí cấp phát lớn nhất được giữ trong báo cáo
+TOP_ALLOCATIONS = 10
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """RSS đỉnh của tiến trình từ lúc khởi động (None nếu hệ điều hành không hỗ trợ)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux trả về KiB, macOS trả về byte
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes() -> Optional[int]:
+    """RSS hiện tại (chỉ trên Linux, qua /proc)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def deep_sizeof(obj, seen: set = None) -> int:
+    """
+    Kích thước ước lượng (byte) của obj và mọi thứ nó chứa: dict, list, tuple, set, mảng NumPy
+    và thuộc tính của đối tượng dùng __slots__.
+    Đối tượng dùng chung (vd. khóa cạnh của các cá thể, số nguyên nhỏ) chỉ được tính một lần
+    trong cùng một seen.
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        nbytes = getattr(item, "nbytes", None)
+        if nbytes is not None and not isinstance(item, (int, float)):
+            # Mảng NumPy: phần dữ liệu nằm ngoài header đối tượng
+            total += sys.getsizeof(item) + (0 if getattr(item, "base", None) is not None else nbytes)
+            continue
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(type(item), "__slots__"):
+            # Đối tượng dùng __slots__ (vd. DeltaFlow): base dùng chung chỉ được tính một lần
+            stack.extend(getattr(item, slot) for slot in type(item).__slots__ if hasattr(item, slot))
+    return total
+
+
+def format_bytes(size: Optional[float]) -> str:
+    if size is None:
+        return "-"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if abs(size) < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class MemoryProfiler:
+    def __init__(self, trace: bool = True):
+        """
+        Args:
+            trace: Bật tracemalloc để đo bộ nhớ Python và vị trí cấp phát (chậm hơn);
+                False chỉ đo RSS và kích thước cấu trúc
+        """
+        self.trace = trace
+        self.samples: List[Dict] = []
+        self.structures_peak: Dict[str, int] = {}
+        self._started_tracing = False
+        # Snapshot tracemalloc của mẫu có bộ nhớ theo dõi lớn nhất
+        self._peak_snapshot = None
+        self._peak_traced = -1
+
+    def start(self):
+        if self.trace and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        self.samples = []
+        self.structures_peak = {}
+        self._peak_snapshot = None
+        self._peak_traced = -1
+
+    def sample(self, step, structures: Dict[str, object] = None) -> Dict:
+        """
+        Ghi một mẫu tại step (vd. số thế hệ): RSS, bộ nhớ tracemalloc và kích thước từng cấu trúc.
+        Phần dùng chung giữa các cấu trúc chỉ được tính cho cấu trúc đứng trước trong structures
+        (vd. cá thể vừa nằm trong quần thể vừa trong top 5 được tính cho quần thể).
+        """
+        record = {"step": step, "rss": current_rss_bytes(), "peak_rss": peak_rss_bytes()}
+        if tracemalloc.is_tracing():
+            record["traced"], record["traced_peak"] = tracemalloc.get_traced_memory()
+            if record["traced"] > self._peak_traced:
+                self._peak_traced = record["traced"]
+                self._peak_snapshot = tracemalloc.take_snapshot()
+        seen = set()
+        sizes = {name: deep_sizeof(value, seen) for name, value in (structures or {}).items()}
+        record["structures"] = sizes
+        for name, size in sizes.items():
+            self.structures_peak[name] = max(size, self.structures_peak.get(name, 0))
+        self.samples.append(record)
+        return record
+
+    def stop(self) -> Dict:
+        """Dừng đo và trả về báo cáo tổng hợp"""
+        report = {
+            "peak_rss": peak_rss_bytes(),
+            "traced_peak": None,
+            "structures_peak": dict(self.structures_peak),
+            "samples": self.samples,
+            "top_allocations": [],
+        }
+        if tracemalloc.is_tracing():
+            report["traced_peak"] = tracemalloc.get_traced_memory()[1]
+        if self._peak_snapshot is not None:
+            # Các vị trí giữ nhiều bộ nhớ nhất tại mẫu có bộ nhớ theo dõi lớn nhất
+            snapshot = self._peak_snapshot.filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, __file__),
+            ))
+            report["top_allocations"] = [
+                {"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 "size": stat.size, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]
+            ]
+            self._peak_snapshot = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return report
@@ -0,0 +1,199 @@
+import csv
+import itertools
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Tuple
+
+from logic.ga_solver import GASolver
+from logic.ford_fulkerson import FordFulkersonSolver
+from logic.shared_graph import SharedGraph, SharedGraphHandle, attach_graph, compile_graph
+
+# Các tham số GA có thể quét và kiểu giá trị của chúng
+SWEEP_PARAMS = {
+    "pop_size": int,
+    "mutation_rate": float,
+    "crossover_rate": float,
+    "top_k": int,
+    "max_paths_crossover": int,
+    "tournament_size": int,
+}
+
+
+def grid_configs(grid: Dict[str, List]) -> List[Dict]:
+    """
+    Tạo tất cả tổ hợp tham số từ một lưới giá trị
+
+    Args:
+        grid: {tên tham số: danh sách giá trị}
+
+    Returns:
+        Danh sách dict tham số, mỗi dict là một cấu hình
+    """
+    names = list(grid.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def random_configs(ranges: Dict[str, Tuple], n_samples: int, seed: int = None) -> List[Dict]:
+    """
+    Lấy mẫu ngẫu nhiên các cấu hình trong khoảng [min, max] của từng tham số
+
+    Args:
+        ranges: {tên tham số: (min, max)}
+        n_samples: Số cấu hình cần tạo
+        seed: Seed cho bộ sinh số ngẫu nhiên
+
+    Returns:
+        Danh sách dict tham số
+    """
+    rng = random.Random(seed)
+    configs = []
+    for _ in range(n_samples):
+        config = {}
+        for name, (low, high) in ranges.items():
+            if SWEEP_PARAMS.get(name, float) is int:
+                config[name] = rng.randint(int(low), int(high))
+            else:
+                config[name] = round(rng.uniform(low, high), 4)
+        configs.append(config)
+    return configs
+
+
+def run_trial(graph_edges: List[Tuple[int, int, int]], source: int, sink: int, params: Dict, seed: int) -> Dict:
+    """
+    Chạy một lần GA với seed cố định (hàm cấp module để dùng được trong tiến trình con)
+
+    Returns:
+        Dict gồm fitness tốt nhất, thời gian/thế hệ đạt fitness tốt nhất và tổng thời gian
+    """
+    trial_params = dict(params, seed=seed)
+    solver = GASolver(graph_edges, source, sink, trial_params)
+
+    start_time = time.perf_counter()
+    best_seen = {"fitness": float('-inf'), "time": 0.0, "generation": 0}
+
+    def on_generation(record):
+        if record["best"] > best_seen["fitness"]:
+            best_seen["fitness"] = record["best"]
+            best_seen["time"] = time.perf_counter() - start_time
+            best_seen["generation"] = record["generation"]
+
+    _, best_fitness, fitness_history, _ = solver.run(progress_callback=on_generation)
+
+    return {
+        "params": params,
+        "seed": seed,
+        "best_fitness": best_fitness,
+        "time_to_best": best_seen["time"],
+        "generation_of_best": best_seen["generation"],
+        "total_time": time.perf_counter() - start_time,
+        "generations": len(fitness_history),
+    }
+
+
+def run_shared_trial(handle: SharedGraphHandle, params: Dict, seed: int) -> Dict:
+    """
+    Giống run_trial nhưng đọc đồ thị từ vùng shared memory thay vì nhận danh sách cạnh đã pickle
+    """
+    graph = attach_graph(handle)
+    return run_trial(graph.edge_list(), handle.source, handle.sink, params, seed)
+
+
+def run_sweep(
+    graph_edges: List[Tuple[int, int, int]],
+    source: int,
+    sink: int,
+    configs: List[Dict],
+    seeds: List[int],
+    base_params: Dict = None,
+    max_workers: int = None,
+    on_result: Callable[[Dict], None] = None,
+    should_stop: Callable[[], bool] = None
+) -> List[Dict]:
+    """
+    Chạy mọi cấu hình với mọi seed trên một process pool
+
+    Args:
+        graph_edges: Danh sách cạnh dạng [(u, v, capacity)]
+        source: Đỉnh nguồn
+        sink: Đỉnh đích
+        configs: Danh sách cấu hình tham số cần thử
+        seeds: Các seed lặp lại cho mỗi cấu hình
+        base_params: Tham số chung (vd. generations) được ghi đè bởi từng cấu hình
+        max_workers: Số tiến trình (mặc định = số CPU)
+        on_result: Hàm được gọi với mỗi kết quả lần chạy ngay khi hoàn thành
+        should_stop: Hàm trả về True để hủy các lần chạy chưa bắt đầu
+
+    Returns:
+        Danh sách kết quả từng lần chạy (kèm optimality_ratio so với Ford-Fulkerson)
+    """
+    base_params = base_params or {}
+    _, optimal_max_flow = FordFulkersonSolver(graph_edges, source, sink).solve()
+
+    results = []
+    # Đồ thị được đặt vào shared memory một lần; mỗi task chỉ mang theo handle nhỏ
+    with SharedGraph(compile_graph(graph_edges, source, sink)) as shared, \
+            ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        futures = [
+            executor.submit(run_shared_trial, shared.handle, dict(base_params, **config), seed)
+            for config in configs
+            for seed in seeds
+        ]
+        for future in as_completed(futures):
+            if should_stop is not None and should_stop():
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+            result = future.result()
+            result["optimal_max_flow"] = optimal_max_flow
+            result["optimality_ratio"] = (
+                result["best_fitness"] / optimal_max_flow * 100 if optimal_max_flow > 0 else 0
+            )
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+    return results
+
+
+def aggregate_results(results: List[Dict], param_names: List[str] = None) -> List[Dict]:
+    """
+    Gộp các lần chạy có cùng cấu hình (khác seed) thành một dòng thống kê
+
+    Returns:
+        Danh sách dòng {tham số..., runs, best_fitness_mean, best_fitness_std,
+        time_to_best_mean, optimality_ratio_mean}, sắp xếp theo optimality giảm dần
+    """
+    if param_names is None:
+        param_names = [name for name in SWEEP_PARAMS if any(name in result["params"] for result in results)]
+    groups = {}
+    for result in results:
+        key = tuple(result["params"].get(name) for name in param_names)
+        groups.setdefault(key, []).append(result)
+
+    rows = []
+    for key, runs in groups.items():
+        fitnesses = [run["best_fitness"] for run in runs]
+        row = dict(zip(param_names, key))
+        row.update({
+            "runs": len(runs),
+            "best_fitness_mean": statistics.fmean(fitnesses),
+            "best_fitness_std": statistics.pstdev(fitnesses),
+            "time_to_best_mean": statistics.fmean(run["time_to_best"] for run in runs),
+            "optimality_ratio_mean": statistics.fmean(run["optimality_ratio"] for run in runs),
+        })
+        rows.append(row)
+
+    rows.sort(key=lambda row: row["optimality_ratio_mean"], reverse=True)
+    return rows
+
+
+def write_csv(rows: List[Dict], path: str):
+    """Ghi các dòng kết quả ra file CSV"""
+    if not rows:
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
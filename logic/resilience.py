@@ -0,0 +1,323 @@
+"""
+Phân tích khả năng chịu lỗi: luồng cực đại còn lại khi một hoặc k cạnh bị hỏng.
+
+Luồng tối ưu và lát cắt của đồ thị gốc chỉ được giải một lần rồi dùng lại:
+- Cạnh không mang luồng hỏng thì luồng tối ưu vẫn hợp lệ, luồng cực đại không đổi.
+- Cạnh nằm trên một lát cắt nhỏ nhất (bão hòa) hỏng thì luồng cực đại giảm đúng bằng capacity
+  của nó: lát cắt đó giảm đi c, và rút luồng qua cạnh chỉ mất tối đa c.
+- Các trường hợp còn lại bắt đầu từ luồng tối ưu sau khi rút phần luồng đi qua cạnh hỏng
+  (warm start), nên Ford-Fulkerson chỉ cần vài đường tăng luồng; chúng chạy trên process pool.
+
+Dòng lệnh:
+    python -m logic.resilience graph.txt --top 10 --sample 3 200
+"""
+import argparse
+import collections
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from logic.ford_fulkerson import FordFulkersonSolver
+from logic.shared_graph import SharedGraph, attach_graph, compile_graph
+
+Edge = Tuple[int, int]
+
+
+def _find_flow_path(flow: Dict[Edge, int], out_edges, start: int, targets: Set[int], skip: Edge) -> Optional[List[Edge]]:
+    """BFS trên các cạnh đang mang luồng dương (bỏ qua skip) từ start đến một đỉnh trong targets"""
+    if start in targets:
+        return []
+    parent = {start: None}
+    queue = collections.deque([start])
+    while queue:
+        u = queue.popleft()
+        for v in out_edges[u]:
+            if v in parent or flow.get((u, v), 0) <= 0 or (u, v) == skip:
+                continue
+            parent[v] = u
+            if v in targets:
+                path = []
+                while parent[v] is not None:
+                    path.append((parent[v], v))
+                    v = parent[v]
+                return path[::-1]
+            queue.append(v)
+    return None
+
+
+def remove_edge_flow(flow: Dict[Edge, int], edge: Edge, source: int, sink: int, out_edges) -> int:
+    """
+    Rút toàn bộ luồng đi qua edge khỏi một luồng hợp lệ (sửa flow tại chỗ) mà vẫn giữ bảo toàn:
+    giảm luồng dọc các đường source -> u -> v -> sink hoặc các chu trình đi qua edge.
+
+    Returns:
+        Lượng luồng source -> sink bị mất
+    """
+    u, v = edge
+    lost = 0
+    while flow.get(edge, 0) > 0:
+        # Từ v đi theo luồng tới sink, hoặc quay về u (chu trình, không làm mất luồng)
+        forward = _find_flow_path(flow, out_edges, v, {sink, u}, edge)
+        if forward is None:
+            raise ValueError(f"Luồng không bảo toàn quanh cạnh {edge}")
+        cycle = (forward[-1][1] if forward else v) == u
+        backward = [] if cycle else _find_flow_path(flow, out_edges, source, {u}, edge)
+        if backward is None:
+            raise ValueError(f"Luồng không bảo toàn quanh cạnh {edge}")
+
+        path = backward + [edge] + forward
+        amount = min(flow[e] for e in path)
+        for e in path:
+            flow[e] -= amount
+        if not cycle:
+            lost += amount
+    return lost
+
+
+def solve_failure(graph_edges, source, sink, baseline_flow: Dict[Edge, int], failed: List[Edge]) -> int:
+    """Luồng cực đại khi các cạnh failed bị hỏng, bắt đầu từ baseline_flow đã rút phần qua các cạnh đó"""
+    out_edges = collections.defaultdict(list)
+    for u, v, _ in graph_edges:
+        out_edges[u].append(v)
+
+    flow = dict(baseline_flow)
+    for edge in failed:
+        remove_edge_flow(flow, edge, source, sink, out_edges)
+
+    failed_set = set(failed)
+    remaining = [(u, v, c) for u, v, c in graph_edges if (u, v) not in failed_set]
+    initial = {edge: f for edge, f in flow.items() if f > 0}
+    _, max_flow = FordFulkersonSolver(remaining, source, sink).solve(initial_flow=initial)
+    return max_flow
+
+
+# Trạng thái của mỗi tiến trình con, đặt một lần bởi _init_worker
+_worker = {}
+
+
+def _init_worker(handle, baseline_items):
+    graph = attach_graph(handle)
+    _worker["graph"] = (graph.edge_list(), handle.source, handle.sink)
+    _worker["baseline"] = {(u, v): f for u, v, f in baseline_items}
+
+
+def _solve_in_worker(failed):
+    graph_edges, source, sink = _worker["graph"]
+    return solve_failure(graph_edges, source, sink, _worker["baseline"], failed)
+
+
+def residual_components(graph_edges, flow: Dict[Edge, int]) -> Dict[int, int]:
+    """Thành phần liên thông mạnh (Kosaraju, không đệ quy) của đồ thị phần dư ứng với flow"""
+    arcs = collections.defaultdict(list)
+    reverse_arcs = collections.defaultdict(list)
+    nodes = set()
+    for u, v, capacity in graph_edges:
+        nodes.update((u, v))
+        f_val = flow.get((u, v), 0)
+        if capacity - f_val > 0:
+            arcs[u].append(v)
+            reverse_arcs[v].append(u)
+        if f_val > 0:
+            arcs[v].append(u)
+            reverse_arcs[u].append(v)
+
+    order, seen = [], set()
+    for start in nodes:
+        if start in seen:
+            continue
+        seen.add(start)
+        stack = [(start, iter(arcs[start]))]
+        while stack:
+            node, it = stack[-1]
+            for nxt in it:
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append((nxt, iter(arcs[nxt])))
+                    break
+            else:
+                stack.pop()
+                order.append(node)
+
+    component = {}
+    for start in reversed(order):
+        if start in component:
+            continue
+        component[start] = start
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for nxt in reverse_arcs[node]:
+                if nxt not in component:
+                    component[nxt] = start
+                    stack.append(nxt)
+    return component
+
+
+class ResilienceAnalyzer:
+    def __init__(self, graph_edges: List[Tuple[int, int, int]], source: int, sink: int):
+        """Giải luồng cực đại gốc một lần và xác định các cạnh có thể nằm trên lát cắt nhỏ nhất"""
+        self.graph_edges = graph_edges
+        self.source = source
+        self.sink = sink
+
+        solver = FordFulkersonSolver(graph_edges, source, sink)
+        self.baseline_flow, self.max_flow = solver.solve()
+        self.source_side, self.min_cut_edges = solver.min_cut(self.baseline_flow)
+
+        # Cạnh (u, v) nằm trên một lát cắt nhỏ nhất nào đó khi và chỉ khi nó bão hòa và
+        # u, v thuộc hai thành phần liên thông mạnh khác nhau của đồ thị phần dư
+        component = residual_components(graph_edges, self.baseline_flow)
+        self.cut_candidates = {
+            (u, v) for u, v, capacity in graph_edges
+            if capacity > 0 and self.baseline_flow.get((u, v), 0) == capacity and component[u] != component[v]
+        }
+
+    def _instant_value(self, failed: List[Edge]) -> Optional[int]:
+        """Giá trị luồng cực đại nếu suy ra được ngay không cần giải, ngược lại None"""
+        if all(self.baseline_flow.get(edge, 0) == 0 for edge in failed):
+            # Luồng tối ưu vẫn hợp lệ khi bỏ các cạnh không mang luồng
+            return self.max_flow
+        if len(failed) == 1 and failed[0] in self.cut_candidates:
+            # Lát cắt nhỏ nhất chứa cạnh giảm đi c = luồng trên cạnh, và rút luồng đó
+            # vẫn để lại một luồng hợp lệ giá trị F - c, nên cả hai cận trùng nhau
+            return self.max_flow - self.baseline_flow[failed[0]]
+        return None
+
+    def _method(self, failed: List[Edge]) -> str:
+        if all(self.baseline_flow.get(edge, 0) == 0 for edge in failed):
+            return "unused"
+        if len(failed) == 1 and failed[0] in self.cut_candidates:
+            return "min_cut"
+        return "solved"
+
+    def _solve_scenarios(self, scenarios: List[List[Edge]], max_workers: int = None,
+                         on_result: Callable[[int, int], None] = None,
+                         should_stop: Callable[[], bool] = None) -> List[Optional[int]]:
+        """Giá trị luồng cực đại cho từng tập cạnh hỏng (None nếu bị hủy trước khi giải)"""
+        values = [self._instant_value(failed) for failed in scenarios]
+        pending = [i for i, value in enumerate(values) if value is None]
+
+        def record(index, value):
+            values[index] = value
+            if on_result is not None:
+                on_result(index, value)
+
+        for index, value in enumerate(values):
+            if value is not None and on_result is not None:
+                on_result(index, value)
+
+        if max_workers == 1 or len(pending) <= 1:
+            for index in pending:
+                if should_stop is not None and should_stop():
+                    break
+                record(index, solve_failure(self.graph_edges, self.source, self.sink,
+                                            self.baseline_flow, scenarios[index]))
+            return values
+
+        baseline_items = [(u, v, f) for (u, v), f in self.baseline_flow.items()]
+        with SharedGraph(compile_graph(self.graph_edges, self.source, self.sink)) as shared, \
+                ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), initializer=_init_worker,
+                                    initargs=(shared.handle, baseline_items)) as executor:
+            futures = {index: executor.submit(_solve_in_worker, scenarios[index]) for index in pending}
+            for index, future in futures.items():
+                if should_stop is not None and should_stop():
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    break
+                record(index, future.result())
+        return values
+
+    def _report_row(self, edge: Edge, capacity: int, value: Optional[int]) -> Dict:
+        loss = None if value is None else self.max_flow - value
+        return {
+            "edge": edge,
+            "capacity": capacity,
+            "baseline_flow": self.baseline_flow.get(edge, 0),
+            "in_min_cut": edge in self.cut_candidates,
+            "max_flow_after": value,
+            "loss": loss,
+            "loss_ratio": (loss / self.max_flow if self.max_flow > 0 else 0.0) if loss is not None else None,
+            "method": self._method([edge]),
+        }
+
+    def single_edge_failures(self, max_workers: int = None, on_result: Callable[[int, int], None] = None,
+                             should_stop: Callable[[], bool] = None) -> List[Dict]:
+        """
+        Luồng cực đại sau khi từng cạnh hỏng riêng lẻ
+
+        Returns:
+            Danh sách mỗi cạnh một dòng {edge, capacity, baseline_flow, in_min_cut, max_flow_after,
+            loss, loss_ratio, method}, trong đó method là "unused" / "min_cut" (suy ra ngay) hoặc
+            "solved" (giải lại từ luồng gốc); xếp theo mức mất luồng giảm dần (cạnh quan trọng nhất trước)
+        """
+        edges = [(u, v) for u, v, _ in self.graph_edges]
+        values = self._solve_scenarios([[edge] for edge in edges], max_workers, on_result, should_stop)
+        rows = [self._report_row(edge, capacity, value)
+                for (edge, value), (_, _, capacity) in zip(zip(edges, values), self.graph_edges)]
+        rows.sort(key=lambda row: (row["loss"] is None, -(row["loss"] or 0), -row["baseline_flow"]))
+        return rows
+
+    def sampled_failures(self, k: int, n_samples: int, seed: int = None, max_workers: int = None,
+                         should_stop: Callable[[], bool] = None) -> Dict:
+        """
+        Luồng cực đại sau n_samples lần hỏng ngẫu nhiên k cạnh cùng lúc
+
+        Returns:
+            {"scenarios": [{edges, max_flow_after, loss}], "edges": [{edge, scenarios, mean_loss,
+            max_loss}] xếp theo mean_loss giảm dần}
+        """
+        rng = random.Random(seed)
+        edges = [(u, v) for u, v, _ in self.graph_edges]
+        k = min(k, len(edges))
+        scenarios = [rng.sample(edges, k) for _ in range(n_samples)]
+        values = self._solve_scenarios(scenarios, max_workers, should_stop=should_stop)
+
+        scenario_rows = []
+        per_edge = collections.defaultdict(list)
+        for failed, value in zip(scenarios, values):
+            if value is None:
+                continue
+            loss = self.max_flow - value
+            scenario_rows.append({"edges": failed, "max_flow_after": value, "loss": loss})
+            for edge in failed:
+                per_edge[edge].append(loss)
+        scenario_rows.sort(key=lambda row: -row["loss"])
+
+        edge_rows = [{"edge": edge, "scenarios": len(losses), "mean_loss": sum(losses) / len(losses),
+                      "max_loss": max(losses)} for edge, losses in per_edge.items()]
+        edge_rows.sort(key=lambda row: (-row["mean_loss"], -row["max_loss"]))
+        return {"scenarios": scenario_rows, "edges": edge_rows}
+
+
+def main():
+    from logic.generators import read_edge_list
+
+    parser = argparse.ArgumentParser(description="Phân tích luồng cực đại khi cạnh bị hỏng")
+    parser.add_argument("graph", help="File đồ thị (định dạng logic.generators.write_edge_list)")
+    parser.add_argument("--top", type=int, default=10, help="Số cạnh quan trọng nhất cần in")
+    parser.add_argument("--sample", type=int, nargs=2, metavar=("K", "N"), help="Thêm N lần hỏng ngẫu nhiên K cạnh")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    graph_edges, source, sink = read_edge_list(args.graph)
+    analyzer = ResilienceAnalyzer(graph_edges, source, sink)
+    rows = analyzer.single_edge_failures(max_workers=args.workers)
+    solved = sum(1 for row in rows if row["method"] == "solved")
+    print(f"Luồng cực đại gốc: {analyzer.max_flow}; {len(rows)} cạnh, {solved} trường hợp phải giải lại")
+    print(f"{'cạnh':>16} {'cap':>6} {'luồng':>6} {'sau hỏng':>9} {'mất':>6}")
+    for row in rows[:args.top]:
+        print(f"{str(row['edge']):>16} {row['capacity']:>6} {row['baseline_flow']:>6} "
+              f"{row['max_flow_after']:>9} {row['loss_ratio']:>6.1%}")
+
+    if args.sample:
+        k, n = args.sample
+        report = analyzer.sampled_failures(k, n, seed=args.seed, max_workers=args.workers)
+        print(f"\n{n} lần hỏng ngẫu nhiên {k} cạnh; các cạnh có mức mất trung bình cao nhất:")
+        for row in report["edges"][:args.top]:
+            print(f"{str(row['edge']):>16} {row['scenarios']:>4} lần  trung bình {row['mean_loss']:.1f}  "
+                  f"tối đa {row['max_loss']}")
+
+
+if __name__ == "__main__":
+    main()
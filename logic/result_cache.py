@@ -0,0 +1,194 @@
+"""
+Cache kết quả giải trên đĩa, định danh theo nội dung đầu vào.
+
+Khóa là SHA-256 của dạng chuẩn hóa (edges, source, sink, engine và với GA là toàn bộ tham số
+kể cả seed). Lời giải chính xác luôn cache được; kết quả GA chỉ cache khi có seed vì chỉ khi
+đó cùng đầu vào mới cho cùng kết quả. Mỗi mục là một file JSON; khi tổng dung lượng vượt
+max_bytes, các mục ít được dùng gần đây nhất (theo mtime) bị xóa.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import warnings
+from typing import Dict, List, Optional, Tuple
+
+# Tăng khi thay đổi solver làm kết quả cũ không còn đúng để bỏ qua các mục đã lưu
+# 2: chọn cha mẹ theo lô và khởi tạo quần thể bằng ma trận NumPy đổi kết quả GA có seed
+# 3: khởi tạo theo lô cân bằng cạnh lặp giống balance_flow (đổi kết quả trên đồ thị có cạnh lặp)
+CACHE_VERSION = 3
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Tham số GA không ảnh hưởng đến kết quả nên không đưa vào khóa
+NON_RESULT_PARAMS = ("telemetry_path",)
+# Tham số GA làm kết quả phụ thuộc tốc độ máy: có chúng thì không cache
+TIMING_PARAMS = ("time_limit", "deadline")
+
+
+def default_cache_dir() -> str:
+    return os.environ.get("MAXFLOW_CACHE_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "maxflow-ga")
+
+
+def flow_to_json(flow: Dict[Tuple[int, int], int]) -> List[List[int]]:
+    """{(u, v): f} -> [[u, v, f], ...] sắp xếp theo cạnh"""
+    return [[u, v, f] for (u, v), f in sorted(flow.items())]
+
+
+def flow_from_json(items: List[List[int]]) -> Dict[Tuple[int, int], int]:
+    return {(u, v): f for u, v, f in items}
+
+
+def cache_key(engine: str, graph_edges: List[Tuple[int, int, int]], source: int, sink: int,
+              params: Dict = None) -> Optional[str]:
+    """
+    Khóa cache cho một lần giải, hoặc None nếu kết quả không tất định (GA không có seed
+    hoặc bị giới hạn thời gian)
+
+    Lời giải chính xác không phụ thuộc thứ tự cạnh nên cạnh được sắp xếp; GA duyệt cạnh theo
+    thứ tự đầu vào nên thứ tự được giữ nguyên.
+    """
+    if engine == "ga":
+        if not params or params.get("seed") is None:
+            return None
+        if any(params.get(name) is not None for name in TIMING_PARAMS):
+            return None
+        edges = [list(edge) for edge in graph_edges]
+        params = {name: value for name, value in params.items() if name not in NON_RESULT_PARAMS}
+    else:
+        edges = sorted(list(edge) for edge in graph_edges)
+        params = None
+
+    canonical = json.dumps({
+        "version": CACHE_VERSION,
+        "engine": engine,
+        "edges": edges,
+        "source": source,
+        "sink": sink,
+        "params": params,
+    }, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Cache trên đĩa với khóa từ cache_key và giới hạn dung lượng theo LRU"""
+
+    def __init__(self, directory: str = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or default_cache_dir()
+        self.max_bytes = max_bytes
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: Optional[str]) -> Optional[Dict]:
+        """Đọc một mục và đánh dấu là vừa dùng; trả về None nếu không có"""
+        if key is None:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # File hỏng (vd. ghi dở khi hết dung lượng): bỏ đi
+            self._remove(path)
+            return None
+        return value
+
+    def put(self, key: Optional[str], value: Dict):
+        """Ghi một mục (ghi nguyên tử qua file tạm) rồi dọn bớt nếu vượt dung lượng"""
+        if key is None:
+            return
+        tmp_path = None
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, separators=(",", ":"))
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            # Cache chỉ để tăng tốc; lỗi ghi không được làm hỏng lần giải. Cảnh báo thay vì
+            # print vì cache còn chạy trong worker của job server, không có console
+            warnings.warn(f"Không ghi được cache: {e}", RuntimeWarning, stacklevel=2)
+            if tmp_path is not None:
+                self._remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self, max_bytes: int = None):
+        """Xóa các mục dùng lâu nhất cho đến khi tổng dung lượng không vượt max_bytes"""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith(".json"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        self.evict(max_bytes=0)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    # ---- định dạng kết quả của từng solver ----
+
+    def get_exact(self, graph_edges, source, sink) -> Optional[Tuple[Dict[Tuple[int, int], int], int]]:
+        """(luồng, giá trị luồng cực đại) của Ford-Fulkerson đã lưu, hoặc None"""
+        value = self.get(cache_key("ford_fulkerson", graph_edges, source, sink))
+        if value is None:
+            return None
+        return flow_from_json(value["flow"]), value["max_flow"]
+
+    def put_exact(self, graph_edges, source, sink, flow, max_flow, seconds: float = None):
+        self.put(cache_key("ford_fulkerson", graph_edges, source, sink),
+                 {"flow": flow_to_json(flow), "max_flow": max_flow, "seconds": seconds})
+
+    def get_ga(self, graph_edges, source, sink, params) -> Optional[Dict]:
+        """
+        Kết quả GA đã lưu dạng {"best_solution", "best_fitness", "fitness_history",
+        "top_solutions", "last_improvement_gen", "execution_time"}, hoặc None
+        """
+        value = self.get(cache_key("ga", graph_edges, source, sink, params))
+        if value is None:
+            return None
+        value["best_solution"] = flow_from_json(value["best_solution"])
+        value["top_solutions"] = [(fitness, flow_from_json(flow)) for fitness, flow in value["top_solutions"]]
+        return value
+
+    def put_ga(self, graph_edges, source, sink, params, best_solution, best_fitness, fitness_history,
+               top_solutions, last_improvement_gen, execution_time):
+        """Lưu kết quả GA; không làm gì nếu params không có seed"""
+        self.put(cache_key("ga", graph_edges, source, sink, params), {
+            "best_solution": flow_to_json(best_solution),
+            "best_fitness": best_fitness,
+            "fitness_history": fitness_history,
+            "top_solutions": [(fitness, flow_to_json(flow)) for fitness, flow in top_solutions],
+            "last_improvement_gen": last_improvement_gen,
+            "execution_time": execution_time,
+        })
+
+
+_default_cache = None
+
+
+def default_cache() -> ResultCache:
+    """ResultCache dùng chung trong tiến trình, tại default_cache_dir()"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
@@ -0,0 +1,226 @@
+"""
+Biểu diễn đồ thị dạng mảng (CSR) và chia sẻ nó giữa các tiến trình qua shared memory.
+
+Thay vì pickle danh sách cạnh vào từng task của process pool, tiến trình cha đặt các mảng
+đã biên dịch vào một vùng `multiprocessing.shared_memory` và chỉ gửi một handle nhỏ.
+Tiến trình con gắn vào vùng nhớ đó mà không sao chép (xem attach_graph).
+
+    with SharedGraph(compile_graph(graph_edges, source, sink)) as shared:
+        executor.submit(worker, shared.handle, ...)
+"""
+import weakref
+from multiprocessing import shared_memory
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+# Thứ tự các mảng được đặt trong vùng nhớ chung
+ARRAY_FIELDS = ("node_ids", "edge_u", "edge_v", "capacity", "out_offsets", "out_edges", "in_offsets", "in_edges")
+# Các kiểu không dấu, từ hẹp đến rộng, dùng để lưu capacity và luồng
+UINT_DTYPES = (np.uint8, np.uint16, np.uint32, np.uint64)
+
+
+def narrowest_uint(max_value: int) -> np.dtype:
+    """Kiểu không dấu hẹp nhất chứa được mọi giá trị trong [0, max_value]"""
+    for dtype in UINT_DTYPES:
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    raise OverflowError(f"{max_value} vượt quá uint64")
+
+
+def capacity_dtype(capacities) -> np.dtype:
+    """
+    Kiểu hẹp nhất để lưu capacity và luồng trên cạnh (0 <= luồng <= capacity),
+    vd. uint8 khi mọi capacity <= 255; int64 nếu có capacity âm
+    """
+    values = np.asarray(capacities)
+    if values.size == 0:
+        return np.dtype(np.uint8)
+    if values.min() < 0:
+        return np.dtype(np.int64)
+    return narrowest_uint(int(values.max()))
+
+
+def accumulator_dtype(bound: int) -> np.dtype:
+    """
+    Kiểu có dấu để cộng dồn và lấy hiệu các tổng luồng có trị tuyệt đối không quá bound
+    (vd. tổng mọi capacity): int64, hoặc object (số nguyên Python) khi vượt int64
+    """
+    return np.dtype(np.int64) if bound <= np.iinfo(np.int64).max else np.dtype(object)
+
+
+class CompiledGraph:
+    """
+    Đồ thị đã biên dịch thành mảng NumPy:
+    - node_ids: id các đỉnh (đã sắp xếp); các mảng khác dùng vị trí trong node_ids
+    - edge_u, edge_v, capacity: đầu mút (theo vị trí đỉnh) và capacity của từng cạnh;
+      capacity lưu ở kiểu không dấu hẹp nhất đủ chứa (xem capacity_dtype)
+    - out_offsets/out_edges, in_offsets/in_edges: danh sách kề dạng CSR chứa chỉ số cạnh
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], source: int, sink: int):
+        for field in ARRAY_FIELDS:
+            setattr(self, field, arrays[field])
+        self.source = source
+        self.sink = sink
+        self._edge_list = None
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def n_edges(self) -> int:
+        return len(self.edge_u)
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {field: getattr(self, field) for field in ARRAY_FIELDS}
+
+    def outgoing(self, node_index: int) -> np.ndarray:
+        """Chỉ số các cạnh đi ra từ đỉnh ở vị trí node_index"""
+        return self.out_edges[self.out_offsets[node_index]:self.out_offsets[node_index + 1]]
+
+    def incoming(self, node_index: int) -> np.ndarray:
+        """Chỉ số các cạnh đi vào đỉnh ở vị trí node_index"""
+        return self.in_edges[self.in_offsets[node_index]:self.in_offsets[node_index + 1]]
+
+    def edge_list(self) -> List[Tuple[int, int, int]]:
+        """
+        Danh sách cạnh (u, v, capacity) theo id đỉnh gốc, đúng định dạng đầu vào của các solver.
+        Được tạo một lần rồi dùng lại cho mọi task trong cùng tiến trình.
+        """
+        if self._edge_list is None:
+            u = self.node_ids[self.edge_u]
+            v = self.node_ids[self.edge_v]
+            self._edge_list = list(zip(u.tolist(), v.tolist(), self.capacity.tolist()))
+        return self._edge_list
+
+
+def compile_graph(graph_edges, source: int, sink: int) -> CompiledGraph:
+    """
+    Biên dịch danh sách cạnh (list (u, v, capacity) hoặc mảng (m, 3)) thành CompiledGraph
+    """
+    edges = np.asarray(graph_edges, dtype=np.int64).reshape(-1, 3)
+    node_ids = np.unique(np.concatenate([edges[:, 0], edges[:, 1], [source, sink]]))
+    edge_u = np.searchsorted(node_ids, edges[:, 0])
+    edge_v = np.searchsorted(node_ids, edges[:, 1])
+    n_nodes = len(node_ids)
+
+    out_edges = np.argsort(edge_u, kind="stable")
+    out_offsets = np.concatenate([[0], np.cumsum(np.bincount(edge_u, minlength=n_nodes))])
+    in_edges = np.argsort(edge_v, kind="stable")
+    in_offsets = np.concatenate([[0], np.cumsum(np.bincount(edge_v, minlength=n_nodes))])
+
+    return CompiledGraph({
+        "node_ids": node_ids,
+        "edge_u": edge_u,
+        "edge_v": edge_v,
+        "capacity": edges[:, 2].astype(capacity_dtype(edges[:, 2])),
+        "out_offsets": out_offsets,
+        "out_edges": out_edges,
+        "in_offsets": in_offsets,
+        "in_edges": in_edges,
+    }, source, sink)
+
+
+class SharedGraphHandle(NamedTuple):
+    """Thông tin nhỏ, pickle được, đủ để tiến trình con gắn vào vùng nhớ chung"""
+    name: str
+    source: int
+    sink: int
+    # (tên mảng, offset byte, dtype, số phần tử)
+    layout: Tuple[Tuple[str, int, str, int], ...]
+
+
+def _release(shm: shared_memory.SharedMemory, unlink: bool):
+    try:
+        shm.close()
+        if unlink:
+            shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class SharedGraph:
+    """
+    Sở hữu một vùng shared memory chứa CompiledGraph.
+
+    Vùng nhớ được giải phóng khi gọi close() hoặc khi thoát khối `with` (kể cả khi có
+    ngoại lệ hay bị hủy giữa chừng), khi đối tượng bị thu gom, và khi trình thông dịch
+    kết thúc. Nếu tiến trình sở hữu bị kill, resource tracker của multiprocessing sẽ dọn.
+    """
+
+    def __init__(self, graph: CompiledGraph):
+        layout = []
+        offset = 0
+        for field, array in graph.arrays().items():
+            offset = (offset + 7) // 8 * 8  # căn lề 8 byte
+            layout.append((field, offset, array.dtype.str, int(array.size)))
+            offset += array.nbytes
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for (field, start, dtype, size), array in zip(layout, graph.arrays().values()):
+            np.ndarray(size, dtype=dtype, buffer=self._shm.buf, offset=start)[:] = array
+
+        self.handle = SharedGraphHandle(self._shm.name, graph.source, graph.sink, tuple(layout))
+        self._finalizer = weakref.finalize(self, _release, self._shm, True)
+
+    def close(self):
+        """Đóng và xóa vùng nhớ chung (gọi nhiều lần vẫn an toàn)"""
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# Cache trong mỗi tiến trình con: tên vùng nhớ -> (SharedMemory, CompiledGraph), theo thứ tự gắn
+_attached = {}
+# Số vùng nhớ tối đa giữ gắn trong một tiến trình con (vd. tuner dùng nhiều đồ thị huấn luyện)
+MAX_ATTACHED = 8
+
+
+def attach_graph(handle: SharedGraphHandle) -> CompiledGraph:
+    """
+    Gắn vào vùng nhớ chung từ tiến trình con và trả về CompiledGraph dùng chung bộ nhớ
+    (không sao chép). Mỗi tiến trình chỉ gắn một lần cho mỗi vùng nhớ.
+    """
+    cached = _attached.get(handle.name)
+    if cached is not None:
+        return cached[1]
+
+    try:
+        # Python 3.13+: tiến trình con không đăng ký với resource tracker, tránh xóa nhầm
+        shm = shared_memory.SharedMemory(name=handle.name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=handle.name)
+
+    arrays = {}
+    for field, start, dtype, size in handle.layout:
+        array = np.ndarray(size, dtype=dtype, buffer=shm.buf, offset=start)
+        array.flags.writeable = False
+        arrays[field] = array
+
+    graph = CompiledGraph(arrays, handle.source, handle.sink)
+    # Bỏ gắn các vùng cũ nhất để tiến trình con sống lâu không tích lũy vùng nhớ đã bị xóa
+    while len(_attached) >= MAX_ATTACHED:
+        detach_graph(next(iter(_attached)))
+    _attached[handle.name] = (shm, graph)
+    return graph
+
+
+def detach_graph(name: str):
+    """Bỏ gắn vùng nhớ chung trong tiến trình hiện tại"""
+    cached = _attached.pop(name, None)
+    if cached is not None:
+        shm, graph = cached
+        # Các mảng NumPy phải được giải phóng trước khi đóng buffer
+        for field in ARRAY_FIELDS:
+            setattr(graph, field, None)
+        del graph
+        try:
+            shm.close()
+        except BufferError:
+            pass
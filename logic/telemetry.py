@@ -0,0 +1,100 @@
+"""
+Ghi và đọc telemetry theo từng thế hệ của GASolver dưới dạng JSONL.
+
+Dòng đầu là bản ghi {"type": "meta", ...} mô tả lần chạy; mỗi dòng sau là một thế hệ:
+    {"generation", "best", "gen_best", "mean", "worst", "infeasible", "mutation_rate",
+     "unique_ratio", "mean_hamming", "t_eval", "t_local", "t_select", "t_breed", "elapsed"}
+(các t_* là thời gian của từng pha trong thế hệ đó, tính bằng giây; unique_ratio và mean_hamming
+là độ đa dạng của quần thể, xem GASolver.population_diversity). File có đuôi .gz được nén.
+
+Bộ ghi chỉ giữ tối đa buffer_records dòng trong bộ nhớ nên chạy hàng trăm nghìn thế hệ
+không làm tăng bộ nhớ, và file có thể được đọc trong khi GA còn đang chạy.
+"""
+import gzip
+import json
+from typing import Dict, Iterator, List
+
+# Các trường theo thế hệ, theo thứ tự ghi
+FIELDS = ("generation", "best", "gen_best", "mean", "worst", "infeasible", "mutation_rate",
+          "unique_ratio", "mean_hamming", "t_eval", "t_local", "t_select", "t_breed", "elapsed")
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class TelemetryWriter:
+    def __init__(self, path: str, meta: Dict = None, buffer_records: int = 256):
+        self.path = path
+        self.buffer_records = buffer_records
+        self._buffer = []
+        self._file = _open(path, "w")
+        self._file.write(json.dumps(dict(meta or {}, type="meta"), separators=(",", ":"), default=str) + "\n")
+
+    def write(self, record: Dict):
+        self._buffer.append(json.dumps(record, separators=(",", ":")))
+        if len(self._buffer) >= self.buffer_records:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._file.write("\n".join(self._buffer) + "\n")
+            self._buffer = []
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def iter_telemetry(path: str) -> Iterator[Dict]:
+    """Lần lượt các bản ghi thế hệ (bỏ qua dòng meta và dòng cuối ghi dở)"""
+    with _open(path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("type") != "meta":
+                yield record
+
+
+def read_meta(path: str) -> Dict:
+    with _open(path, "r") as f:
+        record = json.loads(f.readline() or "{}")
+    return record if record.get("type") == "meta" else {}
+
+
+def read_telemetry(path: str, max_points: int = None) -> Dict[str, List]:
+    """
+    Đọc file telemetry thành dạng cột {trường: danh sách giá trị} để vẽ biểu đồ
+
+    Args:
+        max_points: Nếu có, chỉ lấy đều khoảng max_points thế hệ (luôn giữ thế hệ cuối)
+    """
+    stride = 1
+    if max_points:
+        total = sum(1 for _ in iter_telemetry(path))
+        stride = max(1, -(-total // max_points))
+
+    columns = {field: [] for field in FIELDS}
+    last = None
+    for index, record in enumerate(iter_telemetry(path)):
+        last = (index, record)
+        if index % stride == 0:
+            for field in FIELDS:
+                columns[field].append(record.get(field))
+    if last is not None and last[0] % stride != 0:
+        for field in FIELDS:
+            columns[field].append(last[1].get(field))
+    return columns
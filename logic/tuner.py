@@ -0,0 +1,104 @@
+import os
+import statistics
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import Callable, Dict, List, Tuple
+
+from logic.ford_fulkerson import FordFulkersonSolver
+from logic.param_sweep import run_shared_trial
+from logic.shared_graph import SharedGraph, compile_graph
+
+
+def successive_halving(
+    training_graphs: List[Tuple[List[Tuple[int, int, int]], int, int]],
+    configs: List[Dict],
+    seeds: List[int] = (0,),
+    base_params: Dict = None,
+    min_generations: int = 10,
+    max_generations: int = 1000,
+    eta: int = 3,
+    max_workers: int = None,
+    on_rung: Callable[[int, List[Tuple[float, Dict]]], None] = None,
+    should_stop: Callable[[], bool] = None
+) -> Tuple[Dict, float]:
+    """
+    Tinh chỉnh tham số GASolver bằng successive halving:
+    mọi cấu hình chạy với ngân sách thế hệ nhỏ, chỉ 1/eta cấu hình tốt nhất
+    được chạy tiếp với ngân sách gấp eta lần; khi chỉ còn một cấu hình thì nó
+    được chạy lần cuối với đủ max_generations.
+
+    Args:
+        training_graphs: Danh sách đồ thị huấn luyện dạng (graph_edges, source, sink)
+        configs: Các cấu hình ứng viên (vd. từ param_sweep.random_configs)
+        seeds: Các seed dùng cho mỗi đồ thị
+        base_params: Tham số chung được ghi đè bởi từng cấu hình
+        min_generations: Ngân sách thế hệ của vòng đầu tiên
+        max_generations: Ngân sách thế hệ tối đa
+        eta: Hệ số loại bỏ/tăng ngân sách mỗi vòng
+        max_workers: Số tiến trình (mặc định = số CPU)
+        on_rung: Hàm nhận (ngân sách thế hệ, [(điểm, cấu hình)] đã xếp hạng) sau mỗi vòng
+        should_stop: Hàm trả về True để dừng sau vòng hiện tại
+
+    Returns:
+        Tuple gồm dict tham số tốt nhất theo định dạng GASolver.__init__ nhận ("generations" là
+        của base_params, mặc định max_generations, không phải ngân sách của vòng cuối) và điểm
+        của nó ở vòng cuối (tỷ lệ trung bình so với tối ưu; với đủ max_generations trừ khi bị dừng)
+    """
+    if not configs:
+        raise ValueError("Cần ít nhất một cấu hình để tinh chỉnh")
+    base_params = base_params or {}
+
+    # Giải tối ưu một lần cho mỗi đồ thị để chuẩn hóa điểm giữa các đồ thị
+    optima = [FordFulkersonSolver(edges, source, sink).solve()[1] for edges, source, sink in training_graphs]
+
+    candidates = list(configs)
+    generations = min(min_generations, max_generations)
+    with ExitStack() as stack:
+        # Mỗi đồ thị huấn luyện được đặt vào shared memory một lần cho mọi vòng
+        handles = [
+            stack.enter_context(SharedGraph(compile_graph(edges, source, sink))).handle
+            for edges, source, sink in training_graphs
+        ]
+        executor = stack.enter_context(ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()))
+        while True:
+            futures = []
+            for index, config in enumerate(candidates):
+                params = {**base_params, **config, "generations": generations}
+                for graph_index, handle in enumerate(handles):
+                    for seed in seeds:
+                        futures.append((index, graph_index,
+                                        executor.submit(run_shared_trial, handle, params, seed)))
+
+            ratios = {index: [] for index in range(len(candidates))}
+            for index, graph_index, future in futures:
+                result = future.result()
+                optimum = optima[graph_index]
+                ratios[index].append(result["best_fitness"] / optimum if optimum > 0 else 1.0)
+
+            ranked = sorted(
+                ((statistics.fmean(ratios[index]), candidates[index]) for index in ratios),
+                key=lambda item: item[0], reverse=True
+            )
+            if on_rung is not None:
+                on_rung(generations, ranked)
+
+            if generations >= max_generations or (should_stop is not None and should_stop()):
+                break
+            keep = max(1, len(ranked) // eta)
+            candidates = [config for _, config in ranked[:keep]]
+            # Cấu hình cuối cùng được chạy với đủ ngân sách trước khi trả về
+            generations = max_generations if keep == 1 else min(max_generations, generations * eta)
+
+    best_score, best_config = ranked[0]
+    best_params = {**base_params, **best_config, "generations": base_params.get("generations", max_generations)}
+    return best_params, best_score
+
+
+def num_rungs(n_configs: int, eta: int = 3, min_generations: int = 10, max_generations: int = 1000) -> int:
+    """Số vòng mà successive_halving sẽ chạy với cùng các đối số"""
+    rungs, remaining, generations = 1, n_configs, min(min_generations, max_generations)
+    while generations < max_generations:
+        remaining = max(1, remaining // eta)
+        generations = max_generations if remaining == 1 else min(max_generations, generations * eta)
+        rungs += 1
+    return rungs
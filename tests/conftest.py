@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Chạy được bằng `pytest` từ bất kỳ thư mục nào: các module được import theo đường dẫn từ gốc repo
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
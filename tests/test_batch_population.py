@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+from logic.ga_solver import GASolver
+from logic.generators import grid_graph, layered_graph, rmat_graph
+
+
+def with_repeats(graph):
+    """Thêm cạnh lặp và một khuyên: tổng luồng của một đỉnh tính trên danh sách cạnh có lặp"""
+    graph_edges, source, sink = graph
+    loop_node = graph_edges[3][1]
+    return graph_edges + graph_edges[:5] + [(loop_node, loop_node, 4)], source, sink
+
+
+GRAPHS = [
+    layered_graph(num_layers=4, nodes_per_layer=8, edge_prob=0.3, seed=0),
+    grid_graph(rows=4, cols=5, seed=1),
+    rmat_graph(scale=5, edge_factor=4, terminals=4, seed=2),
+    with_repeats(layered_graph(num_layers=3, nodes_per_layer=6, seed=3)),
+]
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_balance_flow_batch_matches_balance_flow(graph):
+    solver = GASolver(*graph, {"seed": 0, "pop_size": 40})
+    over_capacity = np.random.default_rng(0).integers(
+        0, 2 * solver.capacity_array.astype(np.int64) + 1, size=(20, len(solver.edge_keys)))
+    for flows in (solver.initialize_batch([None] * 20 + [0.6] * 20), over_capacity):
+        balanced = solver.balance_flow_batch(flows)
+        expected = [solver.balance_flow(dict(zip(solver.edge_keys, row))) for row in flows.tolist()]
+        assert solver.to_individuals(balanced) == expected
+        assert solver.compute_fitness_batch(balanced).tolist() == [solver.compute_fitness(f) for f in expected]
+        assert solver.compute_fitness_batch(flows).tolist() == \
+            [solver.compute_fitness(dict(zip(solver.edge_keys, row))) for row in flows.tolist()]
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_initialize_population_is_seeded_and_within_capacity(graph):
+    population = GASolver(*graph, {"seed": 5, "pop_size": 30}).initialize_population()
+    assert population == GASolver(*graph, {"seed": 5, "pop_size": 30}).initialize_population()
+    assert len(population) == 30
+    capacities = {(u, v): c for u, v, c in graph[0]}
+    for individual in population:
+        assert set(individual) == set(capacities)
+        assert all(0 <= individual[edge] <= capacities[edge] for edge in individual)
@@ -0,0 +1,85 @@
+import random
+
+import pytest
+
+from logic.delta_flow import DeltaFlow, as_dict, derive
+from logic.ga_solver import GASolver
+from logic.generators import grid_graph, layered_graph, rmat_graph
+
+
+def with_repeats(graph):
+    graph_edges, source, sink = graph
+    loop_node = graph_edges[3][1]
+    return graph_edges + graph_edges[:5] + [(loop_node, loop_node, 4)], source, sink
+
+
+GRAPHS = [
+    with_repeats(layered_graph(num_layers=5, nodes_per_layer=10, seed=0)),
+    with_repeats(grid_graph(5, 6, seed=1)),
+    with_repeats(rmat_graph(scale=6, edge_factor=4, terminals=6, seed=2)),
+]
+
+# Các chế độ chạy GA phải cho cùng kết quả với copy-on-write bật và tắt
+RUN_VARIANTS = [
+    {},
+    {"steady_state": True},
+    {"local_search": True, "local_search_budget": None},
+    {"adaptive_mutation": True, "diversity_injection": True, "deduplicate": True},
+]
+
+
+def test_delta_flow_reads_through_to_base():
+    base = {(0, 1): 3, (1, 2): 4, (2, 3): 5}
+    flow = DeltaFlow(base, {(1, 2): 0})
+    assert dict(flow) == {(0, 1): 3, (1, 2): 0, (2, 3): 5}
+    assert list(flow.items()) == [((0, 1), 3), ((1, 2), 0), ((2, 3), 5)]
+    assert flow.get((9, 9), -1) == -1 and (1, 2) in flow and len(flow) == 3
+    copy = flow.copy()
+    copy[(0, 1)] = 7
+    assert base[(0, 1)] == 3 and as_dict(flow) == {(0, 1): 3, (1, 2): 0, (2, 3): 5}
+
+
+def test_derive_compacts_large_deltas():
+    base = {(i, i + 1): 1 for i in range(8)}
+    small = derive(base, {(0, 1): 2}, None, compact_fraction=0.25)
+    assert small.base is base and small.delta == {(0, 1): 2}
+    large = derive(base, {(i, i + 1): 2 for i in range(3)}, None, compact_fraction=0.25)
+    assert large.base is not base and not large.delta and large[(2, 3)] == 2
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_apply_delta_matches_balance_flow(graph):
+    solver = GASolver(*graph, {"seed": 3, "pop_size": 20, "delta_compact_fraction": 0.02})
+    rng = random.Random(0)
+    edges = list(solver.capacity_map)
+    # Cha khả thi lẫn không khả thi, và các con của chúng (delta trên base dùng chung)
+    parents = [DeltaFlow(flow) for flow in solver.initialize_population()]
+    parents += [DeltaFlow({edge: rng.randint(0, cap) for edge, cap in solver.capacity_map.items()})
+                for _ in range(10)]
+    for _ in range(200):
+        parent = rng.choice(parents)
+        changes = {edge: rng.randint(0, solver.capacity_map[edge])
+                   for edge in rng.sample(edges, rng.randint(0, 8))}
+        child = solver.apply_delta(parent, changes)
+        full = parent.copy()
+        full.update(changes)
+        expected = solver.balance_flow(full)
+        assert child.copy() == expected and list(child) == list(expected)
+        assert solver.compute_fitness(child) == solver.compute_fitness(expected)
+
+        state, child.state = child.state, None
+        recomputed = solver.flow_state(child)
+        assert (state.source_outflow, state.sink_inflow, state.imbalance) == \
+            (recomputed.source_outflow, recomputed.sink_inflow, recomputed.imbalance)
+        parents.append(child)
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+@pytest.mark.parametrize("variant", RUN_VARIANTS)
+def test_runs_match_with_and_without_copy_on_write(graph, variant):
+    params = dict({"seed": 5, "pop_size": 20, "generations": 15, "crossover_rate": 0.5}, **variant)
+    delta_run = GASolver(*graph, dict(params, copy_on_write=True)).run()
+    dict_run = GASolver(*graph, dict(params, copy_on_write=False)).run()
+    assert delta_run == dict_run
+    best_solution, _, _, top_solutions = delta_run
+    assert type(best_solution) is dict and all(type(flow) is dict for _, flow in top_solutions)
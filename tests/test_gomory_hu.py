@@ -0,0 +1,55 @@
+import itertools
+
+import pytest
+
+from logic.ford_fulkerson import FordFulkersonSolver
+from logic.generators import grid_graph, layered_graph, rmat_graph
+from logic.gomory_hu import GomoryHuTree, undirected_capacities
+
+GRAPHS = [
+    layered_graph(num_layers=4, nodes_per_layer=6, edge_prob=0.3, seed=0)[0],
+    # Lưới có cạnh dọc hai chiều: hai cạnh có hướng nối cùng cặp đỉnh được cộng thành một
+    grid_graph(rows=4, cols=4, seed=1)[0],
+    rmat_graph(scale=5, edge_factor=4, terminals=4, seed=2)[0],
+]
+
+
+def brute_force(graph_edges, u, v):
+    """Ford-Fulkerson trên mạng vô hướng; cạnh song song được cộng trước vì solver chỉ giữ cạnh cuối"""
+    capacities = {}
+    for a, b, capacity in graph_edges:
+        if a != b:
+            capacities[frozenset((a, b))] = capacities.get(frozenset((a, b)), 0) + capacity
+    directed = []
+    for pair, capacity in capacities.items():
+        a, b = tuple(pair)
+        directed += [(a, b, capacity), (b, a, capacity)]
+    return FordFulkersonSolver(directed, u, v).solve()[1]
+
+
+@pytest.mark.parametrize("graph_edges", GRAPHS)
+def test_min_cut_values_match_ford_fulkerson(graph_edges):
+    tree = GomoryHuTree(graph_edges)
+    assert len(tree.edges()) == len(tree.nodes) - 1
+    all_pairs = tree.all_pairs()
+    for u, v in itertools.combinations(tree.nodes, 2):
+        expected = brute_force(graph_edges, u, v)
+        assert tree.min_cut_value(u, v) == expected, (u, v)
+        assert tree.min_cut_value(v, u) == expected
+        assert all_pairs[(u, v)] == expected
+
+
+def test_isolated_nodes_and_queries():
+    tree = GomoryHuTree([(0, 1, 3), (1, 2, 4)], nodes=[0, 1, 2, 3])
+    assert tree.min_cut_values([(0, 2), (1, 2), (0, 3)]) == [3, 4, 0]
+    assert tree.min_cut_value(2, 2) == float('inf')
+    with pytest.raises(KeyError):
+        tree.min_cut_value(0, 9)
+
+
+def test_symmetric_capacities():
+    assert undirected_capacities([(0, 1, 3), (1, 0, 3), (1, 2, 2), (2, 1, 2)], symmetric=True) == \
+        {(0, 1): 3, (1, 2): 2}
+    assert undirected_capacities([(0, 1, 3), (1, 0, 4)]) == {(0, 1): 7}
+    with pytest.raises(ValueError):
+        undirected_capacities([(0, 1, 3), (1, 0, 4)], symmetric=True)
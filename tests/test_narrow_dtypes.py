@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from logic.ga_solver import GASolver
+from logic.generators import layered_graph
+from logic.shared_graph import accumulator_dtype, capacity_dtype, compile_graph, narrowest_uint
+
+
+@pytest.mark.parametrize("max_value, dtype", [
+    (0, np.uint8), (255, np.uint8), (256, np.uint16), (65535, np.uint16), (65536, np.uint32),
+    (2 ** 32 - 1, np.uint32), (2 ** 32, np.uint64), (2 ** 64 - 1, np.uint64),
+])
+def test_narrowest_uint_limits(max_value, dtype):
+    assert narrowest_uint(max_value) == np.dtype(dtype)
+
+
+def test_narrowest_uint_rejects_values_beyond_uint64():
+    with pytest.raises(OverflowError):
+        narrowest_uint(2 ** 64)
+
+
+def test_capacity_and_accumulator_dtypes():
+    assert capacity_dtype([]) == np.dtype(np.uint8)
+    assert capacity_dtype([3, 255]) == np.dtype(np.uint8)
+    assert capacity_dtype([3, -1]) == np.dtype(np.int64)
+    assert accumulator_dtype(2 ** 63 - 1) == np.dtype(np.int64)
+    assert accumulator_dtype(2 ** 63) == np.dtype(object)
+    edges, source, sink = layered_graph(seed=0, capacity_range=(10, 300))
+    assert compile_graph(edges, source, sink).capacity.dtype == np.dtype(np.uint16)
+
+
+def graph_at(capacity):
+    """Đồ thị có mọi capacity sát giới hạn (capacity, capacity - 1, capacity - 2)"""
+    edges, source, sink = layered_graph(num_layers=3, nodes_per_layer=5, seed=0)
+    return [(u, v, capacity - i % 3) for i, (u, v, _) in enumerate(edges)], source, sink
+
+
+def batch_and_rows(solver):
+    flows = solver.initialize_batch([None] * 10 + [0.6] * 10)
+    return flows, solver.balance_flow_batch(flows)
+
+
+@pytest.mark.parametrize("capacity, dtype", [
+    (255, np.uint8), (65535, np.uint16), (2 ** 32 - 1, np.uint32), (2 ** 40, np.uint64),
+])
+def test_batch_matches_scalar_at_dtype_limits(capacity, dtype):
+    solver = GASolver(*graph_at(capacity), {"seed": 0, "pop_size": 20})
+    assert solver.flow_dtype == np.dtype(dtype)
+    flows, balanced = batch_and_rows(solver)
+    assert flows.dtype == balanced.dtype == np.dtype(dtype)
+    # Không quay vòng: luồng sinh ra trong [0, capacity] dù capacity + 1 tràn kiểu hẹp
+    assert int(flows.max()) <= capacity and flows.max() > 0
+    expected = [solver.balance_flow(dict(zip(solver.edge_keys, row))) for row in flows.tolist()]
+    assert solver.to_individuals(balanced) == expected
+    assert solver.compute_fitness_batch(balanced).tolist() == [solver.compute_fitness(f) for f in expected]
+
+
+@pytest.mark.parametrize("capacity", [2 ** 63 - 1, 2 ** 64 - 1])
+def test_capacities_beyond_int64(capacity):
+    solver = GASolver(*graph_at(capacity), {"seed": 0, "pop_size": 20, "generations": 5})
+    assert solver.flow_dtype == np.dtype(np.uint64) and solver.sum_dtype == np.dtype(object)
+    flows, balanced = batch_and_rows(solver)
+    capacities = solver.capacity_array.astype(object)
+    assert (flows.astype(object) <= capacities).all() and (balanced.astype(object) <= capacities).all()
+    individuals = solver.to_individuals(balanced)
+    assert solver.compute_fitness_batch(balanced).tolist() == [solver.compute_fitness(f) for f in individuals]
+    # Bản vô hướng không vượt capacity dù tích float64 làm tròn lên
+    for row in flows.tolist():
+        balanced_row = solver.balance_flow(dict(zip(solver.edge_keys, row)))
+        assert all(balanced_row[edge] <= solver.capacity_map[edge] for edge in balanced_row)
+    assert solver.run()[1] >= 0
@@ -0,0 +1,51 @@
+import pytest
+
+from logic.ford_fulkerson import FordFulkersonSolver
+from logic.generators import grid_graph, layered_graph, rmat_graph
+from logic.resilience import ResilienceAnalyzer
+
+GRAPHS = [
+    layered_graph(num_layers=4, nodes_per_layer=8, edge_prob=0.3, seed=0),
+    grid_graph(rows=4, cols=5, seed=1),
+    rmat_graph(scale=5, edge_factor=4, terminals=4, seed=2),
+]
+
+
+def cold_solve(graph_edges, source, sink, failed):
+    failed = set(failed)
+    remaining = [(u, v, c) for u, v, c in graph_edges if (u, v) not in failed]
+    return FordFulkersonSolver(remaining, source, sink).solve()[1]
+
+
+def test_warm_start_counts_parallel_source_edges_once():
+    graph_edges = [(0, 2, 5), (0, 2, 5), (2, 1, 10)]
+    flow, max_flow = FordFulkersonSolver(graph_edges, 0, 1).solve()
+    assert FordFulkersonSolver(graph_edges, 0, 1).solve(initial_flow=flow)[1] == max_flow
+    assert FordFulkersonSolver(graph_edges, 0, 1).solve(initial_flow={(0, 2): 3, (2, 1): 3})[1] == max_flow
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_warm_start_from_optimum_keeps_max_flow(graph):
+    graph_edges, source, sink = graph
+    # Thêm cạnh song song ra khỏi nguồn để luồng ban đầu đi qua đỉnh kề xuất hiện hai lần
+    graph_edges = graph_edges + [edge for edge in graph_edges if edge[0] == source]
+    flow, max_flow = FordFulkersonSolver(graph_edges, source, sink).solve()
+    assert FordFulkersonSolver(graph_edges, source, sink).solve(initial_flow=flow) == (flow, max_flow)
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_single_edge_failures_match_cold_solve(graph):
+    graph_edges, source, sink = graph
+    analyzer = ResilienceAnalyzer(graph_edges + graph_edges[:3], source, sink)
+    for row in analyzer.single_edge_failures(max_workers=1):
+        assert row["max_flow_after"] == cold_solve(analyzer.graph_edges, source, sink, [row["edge"]]), row
+
+
+@pytest.mark.parametrize("graph", GRAPHS)
+def test_sampled_failures_match_cold_solve(graph):
+    graph_edges, source, sink = graph
+    analyzer = ResilienceAnalyzer(graph_edges, source, sink)
+    report = analyzer.sampled_failures(2, 30, seed=0, max_workers=1)
+    assert len(report["scenarios"]) == 30
+    for row in report["scenarios"]:
+        assert row["max_flow_after"] == cold_solve(graph_edges, source, sink, row["edges"]), row
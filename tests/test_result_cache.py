@@ -0,0 +1,67 @@
+import pytest
+
+from logic import result_cache
+from logic.result_cache import ResultCache, cache_key
+
+EDGES = [(0, 2, 5), (2, 1, 3)]
+
+# Khóa của các đầu vào cố định: chỉ được đổi cùng lúc với CACHE_VERSION, nếu không các mục
+# đã lưu sẽ bị bỏ (khóa đổi) hoặc bị dùng sai (kết quả đổi mà khóa giữ nguyên)
+PINNED_KEYS = {
+    ("ford_fulkerson", None): "f66b6827fee8ee9197f5a5207a4c27ff6982bc878d4d026653daf8673c866a0a",
+    ("ga", (("pop_size", 10), ("seed", 1))): "4b9aa64f2e3404f473e3befce3ee272003f25aab8703b16e757817d2757a425a",
+}
+
+
+@pytest.mark.parametrize("engine, params", list(PINNED_KEYS))
+def test_cache_key_is_stable(engine, params):
+    key = cache_key(engine, EDGES, 0, 1, dict(params) if params else None)
+    assert key == PINNED_KEYS[(engine, params)], \
+        "Định dạng khóa đổi: tăng CACHE_VERSION rồi cập nhật PINNED_KEYS"
+
+
+def test_cache_key_depends_on_version(monkeypatch):
+    key = cache_key("ford_fulkerson", EDGES, 0, 1)
+    monkeypatch.setattr(result_cache, "CACHE_VERSION", result_cache.CACHE_VERSION + 1)
+    assert cache_key("ford_fulkerson", EDGES, 0, 1) != key
+
+
+def test_exact_key_ignores_edge_order_but_ga_key_does_not():
+    reversed_edges = EDGES[::-1]
+    assert cache_key("ford_fulkerson", EDGES, 0, 1) == cache_key("ford_fulkerson", reversed_edges, 0, 1)
+    params = {"seed": 1}
+    assert cache_key("ga", EDGES, 0, 1, params) != cache_key("ga", reversed_edges, 0, 1, params)
+
+
+@pytest.mark.parametrize("params", [None, {"pop_size": 10}, {"seed": 1, "time_limit": 2.0},
+                                    {"seed": 1, "deadline": 1e12}])
+def test_nondeterministic_ga_runs_are_not_cached(params):
+    assert cache_key("ga", EDGES, 0, 1, params) is None
+
+
+def test_non_result_params_are_not_in_the_key():
+    assert cache_key("ga", EDGES, 0, 1, {"seed": 1}) == \
+        cache_key("ga", EDGES, 0, 1, {"seed": 1, "telemetry_path": "run.jsonl"})
+
+
+def test_round_trip_and_eviction(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    cache.put_exact(EDGES, 0, 1, {(0, 2): 3, (2, 1): 3}, 3, seconds=0.1)
+    assert cache.get_exact(EDGES[::-1], 0, 1) == ({(0, 2): 3, (2, 1): 3}, 3)
+
+    params = {"seed": 1}
+    cache.put_ga(EDGES, 0, 1, params, {(0, 2): 3, (2, 1): 3}, 3, [1, 3], [(3, {(0, 2): 3, (2, 1): 3})], 1, 0.5)
+    value = cache.get_ga(EDGES, 0, 1, params)
+    assert value["best_solution"] == {(0, 2): 3, (2, 1): 3}
+    assert value["top_solutions"] == [(3, {(0, 2): 3, (2, 1): 3})]
+
+    cache.clear()
+    assert cache.get_exact(EDGES, 0, 1) is None
+
+
+def test_write_failure_warns_instead_of_raising(tmp_path):
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("")
+    cache = ResultCache(str(blocker))
+    with pytest.warns(RuntimeWarning, match="Không ghi được cache"):
+        cache.put_exact(EDGES, 0, 1, {(0, 2): 3}, 3)
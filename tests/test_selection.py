@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from logic.ga_solver import RANK_PRESSURE, GASolver
+
+EDGES = [(0, 2, 10), (0, 3, 8), (2, 3, 5), (2, 4, 7), (3, 4, 9), (3, 1, 6), (4, 1, 12)]
+# Fitness khác nhau từng đôi (kể cả cá thể không khả thi -1), xáo trộn so với thứ tự hạng
+FITNESS = [7, -1, 15, 3, 11, 0, 9, 4]
+DRAWS = 200000
+
+
+def make_solver(**params):
+    return GASolver(EDGES, 0, 1, dict({"seed": 0, "pop_size": len(FITNESS)}, **params))
+
+
+def frequencies(selected, size):
+    return np.bincount(selected.ravel(), minlength=size) / selected.size
+
+
+@pytest.mark.parametrize("selection", ["tournament", "sus", "rank"])
+def test_select_parents_shape_and_reproducibility(selection):
+    first = make_solver(selection=selection).select_parents(FITNESS, 13)
+    second = make_solver(selection=selection).select_parents(FITNESS, 13)
+    assert first.shape == (13, 2)
+    assert first.min() >= 0 and first.max() < len(FITNESS)
+    assert np.array_equal(first, second)
+    assert make_solver(selection=selection).select_parents(FITNESS, 0).shape == (0, 2)
+    assert make_solver(selection=selection).select_parents([], 5).shape == (0, 2)
+
+
+def test_tournament_matches_order_statistics():
+    k = 3
+    solver = make_solver(selection="tournament", tournament_size=k)
+    observed = frequencies(solver.select_parents(FITNESS, DRAWS // 2), len(FITNESS))
+    n = len(FITNESS)
+    # Cá thể hạng r (0 = tệ nhất) thắng khi mọi đối thủ có hạng <= r và ít nhất một là nó
+    ranks = np.argsort(np.argsort(FITNESS))
+    expected = ((ranks + 1) / n) ** k - (ranks / n) ** k
+    assert np.allclose(observed, expected, atol=0.005)
+
+
+def test_tournament_larger_than_population_is_uniform():
+    solver = make_solver(selection="tournament", tournament_size=len(FITNESS))
+    observed = frequencies(solver.select_parents(FITNESS, DRAWS // 2), len(FITNESS))
+    assert np.allclose(observed, 1 / len(FITNESS), atol=0.005)
+
+
+def test_sus_counts_are_floor_or_ceil_of_expected():
+    solver = make_solver(selection="sus")
+    weights = np.array(FITNESS, dtype=np.float64) - min(FITNESS) + 1e-9
+    for n_pairs in (1, 4, 7, 50):
+        for _ in range(20):
+            counts = np.bincount(solver.select_parents(FITNESS, n_pairs).ravel(), minlength=len(FITNESS))
+            expected = 2 * n_pairs * weights / weights.sum()
+            assert counts.sum() == 2 * n_pairs
+            assert np.all(counts >= np.floor(expected) - 1e-9) and np.all(counts <= np.ceil(expected) + 1e-9)
+
+
+def test_rank_matches_linear_ranking():
+    solver = make_solver(selection="rank")
+    observed = frequencies(solver.select_parents(FITNESS, DRAWS // 2), len(FITNESS))
+    n = len(FITNESS)
+    ranks = np.argsort(np.argsort(FITNESS))
+    expected = ((2 - RANK_PRESSURE) + 2 * (RANK_PRESSURE - 1) * ranks / (n - 1)) / n
+    assert np.isclose(expected.sum(), 1)
+    assert np.allclose(observed, expected, atol=0.005)
@@ -2,24 +2,42 @@
 
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QPushButton, QFormLayout,
-    QSpinBox, QDoubleSpinBox, QMessageBox, QCheckBox, QHBoxLayout
+    QSpinBox, QDoubleSpinBox, QMessageBox, QCheckBox, QHBoxLayout, QComboBox
 )
 from PyQt5.QtCore import QThread, pyqtSignal, Qt
-from logic.ga_solver import GASolver
 import time
-import random
+
+# GASolver (NumPy) và hộp thoại quét tham số được nạp khi dùng lần đầu để giảm thời gian khởi động
+
+# Khoảng thời gian tối thiểu (giây) giữa hai lần phát tín hiệu tiến độ
+PROGRESS_INTERVAL = 0.1
+
+# Các cách chọn lọc của GASolver (giá trị tham số "selection") và nhãn hiển thị
+SELECTION_LABELS = {
+    "tournament": "Đấu chọn (Tournament)",
+    "sus": "Lấy mẫu đều (SUS)",
+    "rank": "Theo hạng (Rank)",
+}
 
 # Thread riêng để chạy thuật toán GA
 class GAThread(QThread):
     # Tín hiệu để trả về kết quả từ thread
     finished = pyqtSignal(object, object, object, object, float, int)
-    progress = pyqtSignal(int)  # Tín hiệu báo tiến độ (generation hiện tại)
+    # Tín hiệu báo tiến độ: một lô bản ghi {generation, best, mean, infeasible_fraction, unique_ratio, mean_hamming}
+    progress = pyqtSignal(object)
+    # Tín hiệu khi GA gặp lỗi (thông báo lỗi)
+    failed = pyqtSignal(str)
     
     def __init__(self, solver, params):
         super().__init__()
         self.solver = solver
         self.params = params
         self.running = True
+        # Token được kiểm tra cả bên trong các toán tử của GA nên Stop có hiệu lực nhanh
+        from logic.cancellation import CancellationToken
+        self.cancel_token = CancellationToken()
+        self._pending_progress = []
+        self._last_emit = 0.0
         
     def run(self):
         try:
@@ -27,112 +45,38 @@ class GAThread(QThread):
             start_time = time.time()
             
             # Chạy thuật toán với khả năng dừng
-            best_solution, best_fitness, fitness_history, top_solutions, last_improvement_gen = self.solve_with_stop()
+            best_solution, best_fitness, fitness_history, top_solutions = self.solver.run(
+                progress_callback=self.on_generation,
+                cancel_token=self.cancel_token
+            )
+            self.flush_progress()
             
             # Tính thời gian thực thi
             execution_time = time.time() - start_time
             
             # Phát tín hiệu khi hoàn thành
-            self.finished.emit(best_solution, best_fitness, fitness_history, top_solutions, execution_time, last_improvement_gen)
+            self.finished.emit(best_solution, best_fitness, fitness_history, top_solutions,
+                               execution_time, self.solver.last_improvement_gen)
         except Exception as e:
-            print(f"Error in GA thread: {e}")
-            
-    def solve_with_stop(self):
-        """Phiên bản có thể dừng của thuật toán GA"""
-        solver = self.solver
-        
-        # Khởi tạo các biến cần thiết từ thuật toán gốc
-        solver.graph_edges_keys_only = list(solver.capacity_map.keys())
-        solver.current_mutation_rate = solver.mutation_rate
-        solver.best_fitness_history = []
-        solver.no_improvement_count = 0
-
-        # Khởi tạo quần thể ban đầu
-        population = solver.initialize_population()
-        best_solution = None
-        best_fitness = float('-inf')
-        fitness_history = []
-        last_improvement_gen = 0  # Lưu thế hệ cuối cùng có cải thiện
-        
-        # Theo dõi top 5 cá thể tốt nhất
-        top_solutions = []
-
-        # Lặp qua các thế hệ
-        for generation in range(solver.generations):
-            # Kiểm tra nếu thread đã bị yêu cầu dừng
-            if not self.running:
-                break
-                
-            # Phát tín hiệu tiến độ
-            self.progress.emit(generation)
-                
-            # Tính độ thích nghi cho mỗi cá thể trong quần thể
-            fitness_scores = [solver.compute_fitness(ind) for ind in population]
-            
-            # Phần còn lại của thuật toán giống như trong GA gốc
-            current_max_fitness = float('-inf')
-            current_best_individual = None
-            if fitness_scores:
-                current_max_fitness = max(fitness_scores)
-                current_best_individual = population[fitness_scores.index(current_max_fitness)]
-
-            if current_max_fitness > best_fitness:
-                best_fitness = current_max_fitness
-                best_solution = current_best_individual.copy()
-                solver.no_improvement_count = 0
-                last_improvement_gen = generation  # Cập nhật thế hệ cuối có cải thiện
-            else:
-                solver.no_improvement_count += 1
-
-            fitness_history.append(best_fitness)
-            
-            if solver.adaptive_mutation:
-                solver.update_mutation_rate(current_max_fitness)
+            self.failed.emit(str(e))
 
-            if not fitness_scores or not population:
-                break
+    def on_generation(self, record):
+        """Gom các bản ghi tiến độ và chỉ phát tín hiệu tối đa một lần mỗi PROGRESS_INTERVAL"""
+        self._pending_progress.append(record)
+        now = time.monotonic()
+        if now - self._last_emit >= PROGRESS_INTERVAL:
+            self.flush_progress(now)
 
-            sorted_population_with_scores = sorted(zip(fitness_scores, population), 
-                                                 key=lambda x: x[0], reverse=True)
-            
-            top_solutions = [(score, ind.copy()) for score, ind in sorted_population_with_scores[:5]]
-            
-            new_population = [ind for _, ind in sorted_population_with_scores[:solver.top_k]]
-            
-            while len(new_population) < solver.pop_size and self.running:
-                if solver.tournament_size > 0 and len(population) > solver.tournament_size:
-                    parent1 = solver.tournament_selection(population, fitness_scores, solver.tournament_size)
-                    parent2 = solver.tournament_selection(population, fitness_scores, solver.tournament_size)
-                else:
-                    parent1 = random.choice(population)
-                    parent2 = random.choice(population)
-                
-                child = solver.crossover_path_based(parent1, parent2)
-                child = solver.mutate(child)
-                new_population.append(child)
-            
-            population = new_population[:solver.pop_size]
-            
-            if generation % max(1, solver.generations // 10) == 0 and generation > 0:
-                num_fresh = max(1, solver.pop_size // 20)
-                for i in range(num_fresh):
-                    if len(population) > i:
-                        population[-(i+1)] = solver.initialize_diverse_individual(0.7)
-                        
-            # Nhỏ độ trễ để không chiếm hoàn toàn CPU
-            time.sleep(0.001)
-
-        if not top_solutions and best_solution is not None:
-            top_solutions = [(best_fitness, best_solution)]
-
-        while len(top_solutions) < 5:
-            top_solutions.append((0, {}))
-
-        return best_solution, best_fitness, fitness_history, top_solutions, last_improvement_gen
+    def flush_progress(self, now=None):
+        if self._pending_progress:
+            self.progress.emit(self._pending_progress)
+            self._pending_progress = []
+        self._last_emit = time.monotonic() if now is None else now
             
     def stop(self):
-        """Dừng thread chạy thuật toán"""
+        """Yêu cầu dừng; thread kết thúc (và phát finished) sau tối đa một bước kiểm tra của token"""
         self.running = False
+        self.cancel_token.cancel()
 
 class ControlPanel(QWidget):
     def __init__(self, graph_editor, result_panel):
@@ -187,10 +131,43 @@ class ControlPanel(QWidget):
         self.tournament_size_spin.setValue(3)
         form_layout.addRow("Kích thước đấu chọn (Tournament Size):", self.tournament_size_spin)
         
+        self.selection_combo = QComboBox()
+        for scheme, label in SELECTION_LABELS.items():
+            self.selection_combo.addItem(label, scheme)
+        form_layout.addRow("Cách chọn lọc (Selection):", self.selection_combo)
+
+        self.seed_spin = QSpinBox()
+        self.seed_spin.setRange(0, 2**31 - 1)
+        self.seed_spin.setValue(0)
+        # Seed 0 = ngẫu nhiên; có seed thì kết quả tái lập được và được lưu vào cache
+        self.seed_spin.setSpecialValueText("Ngẫu nhiên")
+        form_layout.addRow("Seed:", self.seed_spin)
+
+        self.time_limit_spin = QDoubleSpinBox()
+        self.time_limit_spin.setDecimals(1)
+        self.time_limit_spin.setRange(0, 3600)
+        self.time_limit_spin.setSingleStep(1)
+        self.time_limit_spin.setValue(0)
+        # 0 = chỉ giới hạn theo số thế hệ
+        self.time_limit_spin.setSpecialValueText("Không giới hạn")
+        form_layout.addRow("Giới hạn thời gian (giây):", self.time_limit_spin)
+
         self.adaptive_mutation_check = QCheckBox()
         self.adaptive_mutation_check.setChecked(True)
         form_layout.addRow("Đột biến thích nghi (Adaptive Mutation):", self.adaptive_mutation_check)
 
+        self.local_search_check = QCheckBox()
+        self.local_search_check.setChecked(False)
+        form_layout.addRow("Tìm kiếm cục bộ (Memetic):", self.local_search_check)
+
+        self.steady_state_check = QCheckBox()
+        self.steady_state_check.setChecked(False)
+        form_layout.addRow("Thay thế từng cá thể (Steady-State):", self.steady_state_check)
+
+        self.deduplicate_check = QCheckBox()
+        self.deduplicate_check.setChecked(False)
+        form_layout.addRow("Loại bỏ cá thể trùng lặp:", self.deduplicate_check)
+
         layout.addLayout(form_layout)
 
         # Thêm label trạng thái
@@ -215,9 +192,74 @@ class ControlPanel(QWidget):
         
         layout.addLayout(buttons_layout)
 
+        self.sweep_btn = QPushButton("Quét tham số (Sweep)")
+        self.sweep_btn.clicked.connect(self.open_sweep)
+        self.sweep_btn.setStyleSheet("background-color: #3498db; color: white; font-weight: bold;")
+        layout.addWidget(self.sweep_btn)
+
         layout.addStretch()
         self.setLayout(layout)
 
+    def get_params(self):
+        """Đọc tham số GA hiện tại từ các ô nhập"""
+        return {
+            "pop_size": self.pop_size_spin.value(),
+            "generations": self.max_gen_spin.value(),
+            "mutation_rate": self.mutation_rate_spin.value(),
+            "crossover_rate": self.crossover_rate_spin.value(),
+            "top_k": self.top_k_spin.value(),
+            "max_paths_crossover": self.paths_crossover_spin.value(),
+            "adaptive_mutation": self.adaptive_mutation_check.isChecked(),
+            "tournament_size": self.tournament_size_spin.value(),
+            "selection": self.selection_combo.currentData(),
+            "local_search": self.local_search_check.isChecked(),
+            "steady_state": self.steady_state_check.isChecked(),
+            "deduplicate": self.deduplicate_check.isChecked(),
+            "diversity_injection": True,
+            "seed": self.seed_spin.value() or None,
+            "time_limit": self.time_limit_spin.value() or None
+        }
+
+    def apply_params(self, params):
+        """Đặt giá trị các ô nhập từ một dict tham số (vd. kết quả quét tham số)"""
+        spins = {
+            "pop_size": self.pop_size_spin,
+            "generations": self.max_gen_spin,
+            "mutation_rate": self.mutation_rate_spin,
+            "crossover_rate": self.crossover_rate_spin,
+            "top_k": self.top_k_spin,
+            "max_paths_crossover": self.paths_crossover_spin,
+            "tournament_size": self.tournament_size_spin,
+        }
+        for name, value in params.items():
+            if name in spins:
+                spins[name].setValue(value)
+        if "adaptive_mutation" in params:
+            self.adaptive_mutation_check.setChecked(params["adaptive_mutation"])
+        if "local_search" in params:
+            self.local_search_check.setChecked(params["local_search"])
+        if "steady_state" in params:
+            self.steady_state_check.setChecked(params["steady_state"])
+        if "deduplicate" in params:
+            self.deduplicate_check.setChecked(params["deduplicate"])
+        if "selection" in params:
+            index = self.selection_combo.findData(params["selection"])
+            if index >= 0:
+                self.selection_combo.setCurrentIndex(index)
+        if "seed" in params:
+            self.seed_spin.setValue(params["seed"] or 0)
+        if "time_limit" in params:
+            self.time_limit_spin.setValue(params["time_limit"] or 0)
+
+    def open_sweep(self):
+        graph_edges = self.graph_editor.get_graph_edges()
+        if not graph_edges:
+            QMessageBox.warning(self, "Lỗi", "Không có đồ thị để quét tham số.")
+            return
+        from ui.sweep_dialog import SweepDialog
+        dialog = SweepDialog(self, graph_edges, self.graph_editor.source_node, self.graph_editor.sink_node, self)
+        dialog.exec_()
+
     def run_ga(self):
         # Lấy danh sách cạnh từ graph_editor
         graph_edges = self.graph_editor.get_graph_edges()
@@ -228,18 +270,19 @@ class ControlPanel(QWidget):
             QMessageBox.warning(self, "Lỗi", "Không có đồ thị để chạy thuật toán.")
             return
         
-        params = {
-            "pop_size": self.pop_size_spin.value(),
-            "generations": self.max_gen_spin.value(),
-            "mutation_rate": self.mutation_rate_spin.value(),
-            "crossover_rate": self.crossover_rate_spin.value(),
-            "top_k": self.top_k_spin.value(),
-            "max_paths_crossover": self.paths_crossover_spin.value(),
-            "adaptive_mutation": self.adaptive_mutation_check.isChecked(),
-            "tournament_size": self.tournament_size_spin.value()
-        }
+        params = self.get_params()
+
+        # GA có seed cho kết quả tất định: dùng lại kết quả đã lưu nếu có
+        from logic.result_cache import default_cache
+        cached = default_cache().get_ga(graph_edges, source_node, sink_node, params)
+        if cached is not None:
+            self.on_ga_finished(cached["best_solution"], cached["best_fitness"], cached["fitness_history"],
+                                cached["top_solutions"], cached["execution_time"], cached["last_improvement_gen"])
+            self.status_label.setText(f"Dùng kết quả đã lưu (seed {params['seed']})")
+            return
 
         # Khởi tạo solver
+        from logic.ga_solver import GASolver
         solver = GASolver(graph_edges, source_node, sink_node, params)
         
         # Cập nhật trạng thái và nút
@@ -247,20 +290,56 @@ class ControlPanel(QWidget):
         self.status_label.setStyleSheet("font-weight: bold; color: blue;")
         self.run_btn.setEnabled(False)
         self.stop_btn.setEnabled(True)
+        self.result_panel.start_live_chart(params["generations"])
         
         # Chạy thuật toán trong thread riêng
         self.ga_thread = GAThread(solver, params)
-        self.ga_thread.finished.connect(self.on_ga_finished)
+        self.ga_thread.graph = (graph_edges, source_node, sink_node)
+        self.ga_thread.progress.connect(self.on_ga_progress)
+        self.ga_thread.finished.connect(self.on_ga_thread_finished)
+        self.ga_thread.failed.connect(self.on_ga_failed)
         self.ga_thread.start()
 
     def stop_ga(self):
         if self.ga_thread and self.ga_thread.isRunning():
             self.ga_thread.stop()
-            self.status_label.setText("Đã dừng thuật toán")
+            # Chỉ cho chạy lại khi thread đã thực sự kết thúc (on_ga_thread_finished / on_ga_failed)
+            self.status_label.setText("Đang dừng thuật toán...")
             self.status_label.setStyleSheet("font-weight: bold; color: #e74c3c;")
-            self.run_btn.setEnabled(True)
             self.stop_btn.setEnabled(False)
 
+    def on_ga_failed(self, message):
+        self.status_label.setText(f"Lỗi khi chạy thuật toán: {message}")
+        self.status_label.setStyleSheet("font-weight: bold; color: #e74c3c;")
+        self.run_btn.setEnabled(True)
+        self.stop_btn.setEnabled(False)
+
+    def on_ga_progress(self, records):
+        if self.ga_thread and self.ga_thread.running:
+            last = records[-1]
+            self.status_label.setText(
+                f"Đang chạy thuật toán... thế hệ {int(last['generation']) + 1}/{self.ga_thread.solver.generations}"
+                f" (cá thể khác nhau: {last['unique_ratio']:.0%})")
+        self.result_panel.append_progress(records)
+
+    def on_ga_thread_finished(self, best_solution, best_fitness, fitness_history, top_solutions,
+                              execution_time, last_improvement_gen):
+        thread = self.sender()
+        # Chỉ lưu lần chạy hoàn tất (không bị dừng giữa chừng); put_ga bỏ qua nếu không có seed
+        if thread.running:
+            from logic.result_cache import default_cache
+            default_cache().put_ga(*thread.graph, thread.params, best_solution, best_fitness, fitness_history,
+                                   top_solutions, last_improvement_gen, execution_time)
+        self.on_ga_finished(best_solution, best_fitness, fitness_history, top_solutions,
+                            execution_time, last_improvement_gen)
+        if not thread.running:
+            latency = thread.solver.metrics.get("stop_latency")
+            self.status_label.setText("Đã dừng thuật toán" if latency is None
+                                      else f"Đã dừng thuật toán (sau {latency * 1000:.0f} ms)")
+            self.status_label.setStyleSheet("font-weight: bold; color: #e74c3c;")
+        elif thread.solver.metrics.get("budget_exhausted"):
+            self.status_label.setText("Hết thời gian: hiển thị lời giải tốt nhất tìm được")
+
     def on_ga_finished(self, best_solution, best_fitness, fitness_history, top_solutions, execution_time, last_improvement_gen):
         # Cập nhật trạng thái và nút khi hoàn thành
         self.status_label.setText("Thuật toán đã hoàn thành")
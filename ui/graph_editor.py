@@ -2,7 +2,6 @@ from PyQt5.QtWidgets import QWidget, QMenu, QAction, QInputDialog
 from PyQt5.QtGui import QPainter, QPen, QBrush, QColor, QFont, QContextMenuEvent
 from PyQt5.QtCore import Qt, QPoint, QRectF
 import random
-import numpy as np
 
 DEFAULT_NODE_RADIUS = 20
 
@@ -327,38 +326,21 @@ class GraphEditor(QWidget):
         self.node_labels[sink_id] = "Sink"
         self.node_id_counter = 2
 
-        layers = []
-
         # Tạo các lớp node
         for i in range(num_layers):
-            layer = []
             x = int(100 + (self.width() - 200) * (i + 1) / (num_layers + 1))
             for j in range(nodes_per_layer):
                 y = int(self.height() / (nodes_per_layer + 1) * (j + 1))
                 new_id = self._get_new_node_id()
                 self.nodes[new_id] = QPoint(x, y)
-                layer.append(new_id)
-            layers.append(layer)
-
-        # Tạo cạnh từ source đến lớp đầu tiên
-        for node in layers[0]:
-            if random.random() < edge_prob + 0.5:
-                self.edges[(source_id, node)] = random.randint(10, 30)
-                self.edge_flows[(source_id, node)] = 0
-
-        # Tạo cạnh giữa các lớp
-        for i in range(num_layers - 1):
-            for u in layers[i]:
-                for v in layers[i + 1]:
-                    if random.random() < edge_prob:
-                        self.edges[(u, v)] = random.randint(10, 30)
-                        self.edge_flows[(u, v)] = 0
-
-        # Tạo cạnh từ lớp cuối đến sink
-        for node in layers[-1]:
-            if random.random() < edge_prob + 0.5:
-                self.edges[(node, sink_id)] = random.randint(10, 30)
-                self.edge_flows[(node, sink_id)] = 0
+
+        # Sinh cạnh bằng bộ sinh không phụ thuộc Qt (cùng cách đánh số đỉnh theo lớp)
+        from logic.generators import layered_graph
+        graph_edges, _, _ = layered_graph(num_layers=num_layers, nodes_per_layer=nodes_per_layer,
+                                          edge_prob=edge_prob, seed=random.randrange(2 ** 32))
+        for u, v, capacity in graph_edges:
+            self.edges[(u, v)] = capacity
+            self.edge_flows[(u, v)] = 0
 
         self.update()
 
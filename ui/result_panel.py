@@ -1,11 +1,71 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem,
-    QHeaderView, QHBoxLayout, QFrame, QPushButton, QGridLayout
+    QHeaderView, QHBoxLayout, QFrame, QPushButton, QGridLayout, QFileDialog, QMessageBox
 )
 from PyQt5.QtGui import QFont, QColor
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from logic.ford_fulkerson import compare_ga_with_optimal
+from PyQt5.QtCore import QThread, pyqtSignal, Qt
+import time
+
+# matplotlib và các module solver được nạp khi dùng lần đầu để giảm thời gian khởi động
+
+# Khoảng thời gian tối thiểu (giây) giữa hai lần báo tiến độ Ford-Fulkerson
+FF_PROGRESS_INTERVAL = 0.1
+
+
+def graph_key(graph_edges, source, sink):
+    """Khóa nhận diện một đồ thị (không phụ thuộc thứ tự cạnh) dùng cho cache"""
+    return (tuple(sorted(graph_edges)), source, sink)
+
+
+# Thread riêng để chạy Ford-Fulkerson mà không khóa giao diện
+class FordFulkersonThread(QThread):
+    # Tín hiệu trả về (luồng tối ưu, giá trị luồng cực đại, thời gian chạy)
+    finished = pyqtSignal(object, object, float)
+    # Tín hiệu báo tiến độ (số đường tăng luồng, luồng hiện tại, thời gian đã chạy)
+    progress = pyqtSignal(int, object, float)
+    cancelled = pyqtSignal()
+    # Tín hiệu báo lỗi (thông báo lỗi) để giao diện trả nút so sánh về trạng thái ban đầu
+    failed = pyqtSignal(str)
+
+    def __init__(self, graph_edges, source, sink):
+        super().__init__()
+        self.graph_edges = graph_edges
+        self.source = source
+        self.sink = sink
+        self.key = graph_key(graph_edges, source, sink)
+        self.running = True
+        self._start_time = 0.0
+        self._last_emit = 0.0
+        from logic.cancellation import CancellationToken
+        self.cancel_token = CancellationToken()
+
+    def run(self):
+        try:
+            self._start_time = time.time()
+            from logic.ford_fulkerson import FordFulkersonSolver
+            solver = FordFulkersonSolver(self.graph_edges, self.source, self.sink)
+            ff_flow, max_flow = solver.solve(
+                progress_callback=self.on_augment,
+                cancel_token=self.cancel_token
+            )
+            if not self.running:
+                # Kết quả dở dang không phải luồng cực đại nên bỏ qua
+                self.cancelled.emit()
+                return
+            self.finished.emit(ff_flow, max_flow, time.time() - self._start_time)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def on_augment(self, num_paths, current_flow):
+        now = time.time()
+        if now - self._last_emit >= FF_PROGRESS_INTERVAL:
+            self._last_emit = now
+            self.progress.emit(num_paths, current_flow, now - self._start_time)
+
+    def stop(self):
+        """Yêu cầu dừng việc giải"""
+        self.running = False
+        self.cancel_token.cancel()
 
 
 class ResultPanel(QWidget):
@@ -18,6 +78,11 @@ class ResultPanel(QWidget):
         self.ga_solution = None
         self.ff_solution = None
         self.graph_editor = None  # Sẽ được set bởi main_window
+        # Cache kết quả Ford-Fulkerson theo đồ thị: graph_key -> (luồng, giá trị)
+        self.ff_cache = {}
+        self.ff_thread = None
+        # Trạng thái biểu đồ trực tiếp trong khi GA đang chạy
+        self._live = None
 
     def set_graph_editor(self, graph_editor):
         """Cài đặt tham chiếu đến graph_editor để hiển thị luồng"""
@@ -160,6 +225,11 @@ class ResultPanel(QWidget):
         self.compare_button.clicked.connect(self.run_comparison)
         self.compare_button.setEnabled(False)
         buttons_layout.addWidget(self.compare_button)
+
+        # Trạng thái của lần giải Ford-Fulkerson đang chạy
+        self.comparison_status_label = QLabel("")
+        self.comparison_status_label.setStyleSheet("font-style: italic; color: #555;")
+        buttons_layout.addWidget(self.comparison_status_label)
         
         # Buttons in horizontal layout
         solution_buttons = QHBoxLayout()
@@ -210,6 +280,11 @@ class ResultPanel(QWidget):
         solution_buttons.addWidget(self.show_ga_button)
         
         buttons_layout.addLayout(solution_buttons)
+
+        # Mở file telemetry (JSONL) của một lần chạy GA để vẽ lại biểu đồ
+        self.telemetry_button = QPushButton("Mở telemetry...")
+        self.telemetry_button.clicked.connect(self.open_telemetry)
+        buttons_layout.addWidget(self.telemetry_button)
         metrics_panel.addLayout(buttons_layout)
         
         # Add a label to show the current displayed solution
@@ -223,10 +298,16 @@ class ResultPanel(QWidget):
         # ===== PHẦN 2: RESULTS PANEL (bên phải) =====
         results_panel = QVBoxLayout()
         
-        # Biểu đồ fitness
-        self.figure = Figure(figsize=(4, 2.5))
-        self.canvas = FigureCanvas(self.figure)
-        results_panel.addWidget(self.canvas)
+        # Biểu đồ fitness (canvas matplotlib được tạo ở lần vẽ đầu tiên, xem ensure_chart)
+        self.figure = None
+        self.canvas = None
+        self.chart_placeholder = QLabel("Biểu đồ fitness sẽ hiển thị khi chạy GA")
+        self.chart_placeholder.setAlignment(Qt.AlignCenter)
+        self.chart_placeholder.setMinimumHeight(250)
+        self.chart_placeholder.setStyleSheet("color: #7f8c8d; font-style: italic;")
+        self.chart_layout = QVBoxLayout()
+        self.chart_layout.addWidget(self.chart_placeholder)
+        results_panel.addLayout(self.chart_layout)
 
         # Bảng top 5 lời giải
         table_label = QLabel("Top 5 lời giải tốt nhất:")
@@ -269,6 +350,96 @@ class ResultPanel(QWidget):
         
         self.setLayout(layout)
 
+    def ensure_chart(self):
+        """Nạp matplotlib và tạo canvas ở lần đầu cần vẽ biểu đồ"""
+        if self.canvas is not None:
+            return
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=(4, 2.5))
+        self.canvas = FigureCanvas(self.figure)
+        self.canvas.mpl_connect("draw_event", self._on_canvas_draw)
+        self.chart_layout.replaceWidget(self.chart_placeholder, self.canvas)
+        self.chart_placeholder.deleteLater()
+
+    def start_live_chart(self, total_generations):
+        """Chuẩn bị biểu đồ để cập nhật tăng dần trong khi GA đang chạy"""
+        self.ensure_chart()
+        self.figure.clear()
+        ax = self.figure.add_subplot(111)
+        ax_infeasible = ax.twinx()
+
+        # Các đường được đánh dấu animated để chỉ vẽ lại bằng blitting
+        best_line, = ax.plot([], [], label="Fitness tốt nhất", color="#3498db", linewidth=2, animated=True)
+        mean_line, = ax.plot([], [], label="Fitness trung bình", color="#2ecc71", linewidth=1, animated=True)
+        infeasible_line, = ax_infeasible.plot([], [], label="Tỷ lệ không khả thi", color="#e74c3c",
+                                              linestyle=':', linewidth=1, animated=True)
+
+        ax.set_xlim(0, max(1, total_generations - 1))
+        ax.set_ylim(-1, 1)
+        ax_infeasible.set_ylim(0, 1.05)
+        ax.set_xlabel("Thế hệ")
+        ax.set_ylabel("Fitness")
+        ax_infeasible.set_ylabel("Không khả thi")
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.legend(handles=[best_line, mean_line, infeasible_line], loc='lower right')
+        ax.set_facecolor('#f8f9fa')
+        self.figure.tight_layout()
+
+        self._live = {
+            "ax": ax,
+            "lines": [(ax, best_line), (ax, mean_line), (ax_infeasible, infeasible_line)],
+            "generations": [],
+            "best": [],
+            "mean": [],
+            "infeasible": [],
+            "background": None,
+        }
+        self.canvas.draw()
+
+    def append_progress(self, records):
+        """Thêm một lô bản ghi tiến độ vào biểu đồ trực tiếp"""
+        live = self._live
+        if live is None or not records:
+            return
+
+        for record in records:
+            live["generations"].append(record["generation"])
+            live["best"].append(record["best"])
+            live["mean"].append(record["mean"])
+            live["infeasible"].append(record["infeasible_fraction"])
+
+        (_, best_line), (_, mean_line), (_, infeasible_line) = live["lines"]
+        best_line.set_data(live["generations"], live["best"])
+        mean_line.set_data(live["generations"], live["mean"])
+        infeasible_line.set_data(live["generations"], live["infeasible"])
+
+        # Chỉ vẽ lại toàn bộ khi dữ liệu vượt khỏi giới hạn trục hiện tại
+        ax = live["ax"]
+        low, high = ax.get_ylim()
+        batch_values = [r["best"] for r in records] + [r["mean"] for r in records]
+        batch_low, batch_high = min(batch_values), max(batch_values)
+        if batch_low < low or batch_high > high or live["background"] is None:
+            ax.set_ylim(min(low, batch_low - 1), max(high, batch_high * 1.2 + 1))
+            self.canvas.draw()
+            return
+
+        self.canvas.restore_region(live["background"])
+        self._draw_live_lines()
+        self.canvas.blit(self.figure.bbox)
+
+    def _draw_live_lines(self):
+        for axis, line in self._live["lines"]:
+            axis.draw_artist(line)
+
+    def _on_canvas_draw(self, event):
+        """Lưu lại nền sau mỗi lần vẽ toàn bộ để dùng cho blitting"""
+        if self._live is None:
+            return
+        self._live["background"] = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_live_lines()
+
     def update_results(self, fitness_history, top_5, best_solution, graph_edges=None, source=None, sink=None, metrics=None):
         # Store current graph and solution for later comparison
         if graph_edges is not None:
@@ -305,6 +476,8 @@ class ResultPanel(QWidget):
             self.convergence_speed_label.setText(conv_text)
             
         # Cập nhật biểu đồ fitness
+        self._live = None
+        self.ensure_chart()
         self.figure.clear()
         ax = self.figure.add_subplot(111)
         ax.plot(fitness_history, label="Fitness theo thế hệ", color="#3498db", linewidth=2)
@@ -350,16 +523,117 @@ class ResultPanel(QWidget):
         self.ga_label.setText(f"Kết quả thuật toán di truyền: Max Flow = {source_flow}")
         self.ga_flow_label.setText(f"Max Flow: {source_flow}")
 
+    def open_telemetry(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Mở telemetry", "", "Telemetry (*.jsonl *.jsonl.gz);;Tất cả (*)")
+        if not path:
+            return
+        try:
+            self.plot_telemetry(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.warning(self, "Lỗi", f"Không đọc được file telemetry:\n{e}")
+
+    def plot_telemetry(self, path, max_points=2000):
+        """Vẽ best/mean/worst và số cá thể không khả thi theo thế hệ từ file telemetry"""
+        from logic.telemetry import read_telemetry
+        columns = read_telemetry(path, max_points=max_points)
+        if not columns["generation"]:
+            raise ValueError("File không có bản ghi thế hệ nào")
+
+        self._live = None
+        self.ensure_chart()
+        self.figure.clear()
+        ax = self.figure.add_subplot(111)
+        generations = columns["generation"]
+        ax.plot(generations, columns["best"], label="Fitness tốt nhất", color="#3498db", linewidth=2)
+        ax.plot(generations, columns["mean"], label="Fitness trung bình", color="#2ecc71", linewidth=1)
+        ax.plot(generations, columns["worst"], label="Fitness kém nhất", color="#95a5a6", linewidth=1)
+        ax_infeasible = ax.twinx()
+        ax_infeasible.plot(generations, columns["infeasible"], label="Số cá thể không khả thi",
+                           color="#e74c3c", linestyle=':', linewidth=1)
+        ax_infeasible.set_ylabel("Không khả thi")
+        ax.set_xlabel("Thế hệ")
+        ax.set_ylabel("Fitness")
+        ax.grid(True, linestyle='--', alpha=0.7)
+        ax.legend(handles=ax.get_lines() + ax_infeasible.get_lines(), loc='lower right')
+        ax.set_facecolor('#f8f9fa')
+        self.figure.tight_layout()
+        self.canvas.draw()
+
+        self.total_generations_label.setText(f"{generations[-1] + 1}")
+        elapsed = columns["elapsed"][-1]
+        if elapsed is not None:
+            self.execution_time_label.setText(f"{elapsed:.3f} giây")
+
     def run_comparison(self):
-        """Run Ford-Fulkerson and compare with GA results"""
+        """Run Ford-Fulkerson (in a background thread) and compare with GA results"""
+        if self.ff_thread is not None and self.ff_thread.isRunning():
+            # Nút đang ở chế độ hủy
+            self.ff_thread.stop()
+            self.compare_button.setEnabled(False)
+            self.comparison_status_label.setText("Đang hủy...")
+            return
+
         if not self.current_graph_edges or not self.ga_solution:
             return
-            
+
+        key = graph_key(self.current_graph_edges, self.source_node, self.sink_node)
+        if key not in self.ff_cache:
+            # Lời giải chính xác không đổi với cùng đồ thị nên có thể lấy từ cache trên đĩa
+            from logic.result_cache import default_cache
+            cached = default_cache().get_exact(self.current_graph_edges, self.source_node, self.sink_node)
+            if cached is not None:
+                self.ff_cache[key] = cached
+        if key in self.ff_cache:
+            self.show_comparison(self.ff_cache[key])
+            self.comparison_status_label.setText("Dùng kết quả đã lưu")
+            return
+
+        self.ff_thread = FordFulkersonThread(self.current_graph_edges, self.source_node, self.sink_node)
+        self.ff_thread.progress.connect(self.on_ff_progress)
+        self.ff_thread.finished.connect(self.on_ff_finished)
+        self.ff_thread.cancelled.connect(self.on_ff_cancelled)
+        self.ff_thread.failed.connect(self.on_ff_failed)
+        self.compare_button.setText("Hủy Ford-Fulkerson")
+        self.comparison_status_label.setText("Đang giải Ford-Fulkerson...")
+        self.ff_thread.start()
+
+    def on_ff_progress(self, num_paths, current_flow, elapsed):
+        self.comparison_status_label.setText(
+            f"Đang giải: {num_paths} đường tăng luồng, luồng = {current_flow} ({elapsed:.1f} giây)")
+
+    def on_ff_finished(self, ff_flow, max_flow, elapsed):
+        thread = self.sender()
+        self.ff_cache[thread.key] = (ff_flow, max_flow)
+        from logic.result_cache import default_cache
+        default_cache().put_exact(thread.graph_edges, thread.source, thread.sink, ff_flow, max_flow, elapsed)
+        self.reset_compare_button()
+        self.comparison_status_label.setText(f"Ford-Fulkerson hoàn thành sau {elapsed:.3f} giây")
+        # Chỉ hiển thị nếu đồ thị hiện tại vẫn là đồ thị đã giải
+        if self.current_graph_edges and thread.key == graph_key(
+                self.current_graph_edges, self.source_node, self.sink_node):
+            self.show_comparison(self.ff_cache[thread.key])
+
+    def on_ff_cancelled(self):
+        self.reset_compare_button()
+        self.comparison_status_label.setText("Đã hủy Ford-Fulkerson")
+
+    def on_ff_failed(self, message):
+        self.reset_compare_button()
+        self.comparison_status_label.setText(f"Lỗi khi chạy Ford-Fulkerson: {message}")
+
+    def reset_compare_button(self):
+        self.compare_button.setText("Chạy giải thuật Ford-Fulkerson")
+        self.compare_button.setEnabled(self.current_graph_edges is not None)
+
+    def show_comparison(self, optimal_result):
+        """Cập nhật các ô so sánh từ kết quả Ford-Fulkerson (không giải lại)"""
+        from logic.ford_fulkerson import compare_ga_with_optimal
         comparison_results = compare_ga_with_optimal(
             self.current_graph_edges,
             self.source_node,
             self.sink_node,
-            self.ga_solution
+            self.ga_solution,
+            optimal_result
         )
         
         # Update comparison labels
@@ -0,0 +1,324 @@
+# ui/sweep_dialog.py
+
+from PyQt5.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QLineEdit, QPushButton,
+    QSpinBox, QComboBox, QTableWidget, QTableWidgetItem, QHeaderView, QProgressBar,
+    QFileDialog, QMessageBox
+)
+from PyQt5.QtCore import QThread, pyqtSignal, Qt
+from logic.param_sweep import (
+    SWEEP_PARAMS, grid_configs, random_configs, run_sweep, aggregate_results, write_csv
+)
+from logic.tuner import successive_halving, num_rungs
+
+# Các cột của bảng kết quả: (khóa trong dòng kết quả, tiêu đề)
+RESULT_COLUMNS = [(name, name) for name in SWEEP_PARAMS] + [
+    ("runs", "Số lần chạy"),
+    ("best_fitness_mean", "Fitness TB"),
+    ("best_fitness_std", "Độ lệch"),
+    ("time_to_best_mean", "Thời gian đến tốt nhất (s)"),
+    ("optimality_ratio_mean", "Tỷ lệ tối ưu (%)"),
+]
+
+
+# Thread điều phối process pool để giao diện không bị khóa
+class SweepThread(QThread):
+    # Tín hiệu trả về danh sách kết quả từng lần chạy
+    finished = pyqtSignal(object)
+    # Tín hiệu báo tiến độ (số lần chạy đã xong)
+    progress = pyqtSignal(int)
+    failed = pyqtSignal(str)
+
+    def __init__(self, graph_edges, source, sink, configs, seeds, base_params, max_workers):
+        super().__init__()
+        self.graph_edges = graph_edges
+        self.source = source
+        self.sink = sink
+        self.configs = configs
+        self.seeds = seeds
+        self.base_params = base_params
+        self.max_workers = max_workers
+        self.running = True
+        self.completed = 0
+
+    def run(self):
+        try:
+            results = run_sweep(
+                self.graph_edges, self.source, self.sink, self.configs, self.seeds,
+                base_params=self.base_params,
+                max_workers=self.max_workers,
+                on_result=self.on_result,
+                should_stop=lambda: not self.running
+            )
+            self.finished.emit(results)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def on_result(self, result):
+        self.completed += 1
+        self.progress.emit(self.completed)
+
+    def stop(self):
+        """Hủy các lần chạy chưa bắt đầu"""
+        self.running = False
+
+
+# Thread chạy successive halving để tìm tham số tốt nhất
+class TuneThread(QThread):
+    # Tín hiệu trả về (dict tham số tốt nhất, điểm của nó ở vòng cuối)
+    finished = pyqtSignal(object, float)
+    # Tín hiệu báo tiến độ sau mỗi vòng (ngân sách thế hệ, số cấu hình, điểm tốt nhất)
+    progress = pyqtSignal(int, int, float)
+    failed = pyqtSignal(str)
+
+    def __init__(self, graph_edges, source, sink, configs, seeds, base_params, max_workers):
+        super().__init__()
+        self.training_graphs = [(graph_edges, source, sink)]
+        self.configs = configs
+        self.seeds = seeds
+        self.base_params = base_params
+        self.max_workers = max_workers
+        self.running = True
+
+    def run(self):
+        try:
+            best_params, best_score = successive_halving(
+                self.training_graphs, self.configs,
+                seeds=self.seeds,
+                base_params=self.base_params,
+                max_generations=self.base_params["generations"],
+                max_workers=self.max_workers,
+                on_rung=self.on_rung,
+                should_stop=lambda: not self.running
+            )
+            self.finished.emit(best_params, best_score)
+        except Exception as e:
+            self.failed.emit(str(e))
+
+    def on_rung(self, generations, ranked):
+        self.progress.emit(generations, len(ranked), ranked[0][0])
+
+    def stop(self):
+        """Dừng sau vòng hiện tại"""
+        self.running = False
+
+
+class SweepDialog(QDialog):
+    """Hộp thoại quét tham số GA song song và so sánh kết quả"""
+
+    def __init__(self, control_panel, graph_edges, source, sink, parent=None):
+        super().__init__(parent)
+        self.control_panel = control_panel
+        self.graph_edges = graph_edges
+        self.source = source
+        self.sink = sink
+        self.sweep_thread = None
+        self.tune_thread = None
+        self.rows = []
+        self.setWindowTitle("Quét tham số GA (Parameter Sweep)")
+        self.resize(900, 600)
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+        form_layout = QFormLayout()
+
+        self.mode_combo = QComboBox()
+        self.mode_combo.addItems(["Lưới (Grid)", "Ngẫu nhiên (Random)"])
+        form_layout.addRow("Chế độ:", self.mode_combo)
+
+        # Mỗi tham số: danh sách giá trị cách nhau bởi dấu phẩy.
+        # Ở chế độ ngẫu nhiên, min/max của danh sách là khoảng lấy mẫu.
+        current = self.control_panel.get_params()
+        self.param_inputs = {}
+        for name in SWEEP_PARAMS:
+            line_edit = QLineEdit(str(current[name]))
+            self.param_inputs[name] = line_edit
+            form_layout.addRow(f"{name}:", line_edit)
+
+        self.samples_spin = QSpinBox()
+        self.samples_spin.setRange(1, 1000)
+        self.samples_spin.setValue(20)
+        form_layout.addRow("Số cấu hình ngẫu nhiên:", self.samples_spin)
+
+        self.seeds_spin = QSpinBox()
+        self.seeds_spin.setRange(1, 100)
+        self.seeds_spin.setValue(3)
+        form_layout.addRow("Số seed lặp lại:", self.seeds_spin)
+
+        self.workers_spin = QSpinBox()
+        self.workers_spin.setRange(1, 256)
+        self.workers_spin.setValue(max(1, QThread.idealThreadCount()))
+        form_layout.addRow("Số tiến trình:", self.workers_spin)
+
+        layout.addLayout(form_layout)
+
+        buttons_layout = QHBoxLayout()
+        self.run_btn = QPushButton("Chạy quét")
+        self.run_btn.setStyleSheet("background-color: #2ecc71; color: white; font-weight: bold;")
+        self.run_btn.clicked.connect(self.run_sweep)
+        buttons_layout.addWidget(self.run_btn)
+
+        self.tune_btn = QPushButton("Tự động tinh chỉnh")
+        self.tune_btn.setStyleSheet("background-color: #9b59b6; color: white; font-weight: bold;")
+        self.tune_btn.setToolTip("Successive halving: lấy mẫu ngẫu nhiên trong khoảng min/max của mỗi tham số")
+        self.tune_btn.clicked.connect(self.run_tuning)
+        buttons_layout.addWidget(self.tune_btn)
+
+        self.stop_btn = QPushButton("Dừng")
+        self.stop_btn.setStyleSheet("background-color: #e74c3c; color: white; font-weight: bold;")
+        self.stop_btn.clicked.connect(self.stop_sweep)
+        self.stop_btn.setEnabled(False)
+        buttons_layout.addWidget(self.stop_btn)
+
+        self.export_btn = QPushButton("Xuất CSV")
+        self.export_btn.clicked.connect(self.export_csv)
+        self.export_btn.setEnabled(False)
+        buttons_layout.addWidget(self.export_btn)
+        layout.addLayout(buttons_layout)
+
+        self.progress_bar = QProgressBar()
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("Nhấp đúp một dòng để áp dụng tham số vào bảng điều khiển")
+        self.status_label.setStyleSheet("font-style: italic; color: #555;")
+        layout.addWidget(self.status_label)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(len(RESULT_COLUMNS))
+        self.table.setHorizontalHeaderLabels([title for _, title in RESULT_COLUMNS])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setSortingEnabled(True)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.table.cellDoubleClicked.connect(self.apply_row)
+        layout.addWidget(self.table)
+
+        self.setLayout(layout)
+
+    def parse_values(self, name):
+        cast = SWEEP_PARAMS[name]
+        text = self.param_inputs[name].text()
+        return [cast(value.strip()) for value in text.split(",") if value.strip()]
+
+    def build_configs(self):
+        values = {name: self.parse_values(name) for name in SWEEP_PARAMS}
+        if self.mode_combo.currentIndex() == 0:
+            return grid_configs(values)
+        ranges = {name: (min(vals), max(vals)) for name, vals in values.items()}
+        return random_configs(ranges, self.samples_spin.value())
+
+    def run_sweep(self):
+        try:
+            configs = self.build_configs()
+        except ValueError:
+            QMessageBox.warning(self, "Lỗi", "Giá trị tham số không hợp lệ.")
+            return
+
+        seeds = list(range(self.seeds_spin.value()))
+        base_params = self.control_panel.get_params()
+        total = len(configs) * len(seeds)
+
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(0)
+        self.status_label.setText(f"Đang chạy {total} lần ({len(configs)} cấu hình x {len(seeds)} seed)...")
+        self.set_running(True)
+
+        self.sweep_thread = SweepThread(
+            self.graph_edges, self.source, self.sink, configs, seeds,
+            base_params, self.workers_spin.value()
+        )
+        self.sweep_thread.progress.connect(self.progress_bar.setValue)
+        self.sweep_thread.finished.connect(self.on_sweep_finished)
+        self.sweep_thread.failed.connect(self.on_sweep_failed)
+        self.sweep_thread.start()
+
+    def stop_sweep(self):
+        for thread in (self.sweep_thread, self.tune_thread):
+            if thread and thread.isRunning():
+                thread.stop()
+                self.stop_btn.setEnabled(False)
+                self.status_label.setText("Đang dừng, chờ các lần chạy dở hoàn thành...")
+
+    def set_running(self, running):
+        self.run_btn.setEnabled(not running)
+        self.tune_btn.setEnabled(not running)
+        self.stop_btn.setEnabled(running)
+
+    def run_tuning(self):
+        try:
+            values = {name: self.parse_values(name) for name in SWEEP_PARAMS}
+        except ValueError:
+            QMessageBox.warning(self, "Lỗi", "Giá trị tham số không hợp lệ.")
+            return
+
+        ranges = {name: (min(vals), max(vals)) for name, vals in values.items()}
+        configs = random_configs(ranges, self.samples_spin.value())
+        base_params = self.control_panel.get_params()
+
+        self.progress_bar.setRange(0, num_rungs(len(configs), max_generations=base_params["generations"]))
+        self.progress_bar.setValue(0)
+        self.status_label.setText(f"Đang tinh chỉnh {len(configs)} cấu hình bằng successive halving...")
+        self.set_running(True)
+
+        self.tune_thread = TuneThread(
+            self.graph_edges, self.source, self.sink, configs,
+            list(range(self.seeds_spin.value())), base_params, self.workers_spin.value()
+        )
+        self.tune_thread.progress.connect(self.on_tuning_progress)
+        self.tune_thread.finished.connect(self.on_tuning_finished)
+        self.tune_thread.failed.connect(self.on_sweep_failed)
+        self.tune_thread.start()
+
+    def on_tuning_progress(self, generations, n_configs, best_score):
+        self.progress_bar.setValue(self.progress_bar.value() + 1)
+        self.status_label.setText(
+            f"Vòng {generations} thế hệ: {n_configs} cấu hình, tốt nhất đạt {best_score * 100:.2f}% tối ưu")
+
+    def on_tuning_finished(self, best_params, best_score):
+        self.set_running(False)
+        self.progress_bar.setValue(self.progress_bar.maximum())
+        self.control_panel.apply_params(best_params)
+        summary = ", ".join(f"{name}={best_params[name]}" for name in SWEEP_PARAMS)
+        self.status_label.setText(
+            f"Đã áp dụng tham số tốt nhất ({best_score * 100:.2f}% tối ưu với "
+            f"{best_params['generations']} thế hệ): {summary}")
+
+    def on_sweep_finished(self, results):
+        self.set_running(False)
+        self.rows = aggregate_results(results)
+        self.export_btn.setEnabled(bool(self.rows))
+        self.status_label.setText(
+            f"Hoàn thành {len(results)} lần chạy. Nhấp đúp một dòng để áp dụng tham số.")
+        self.fill_table()
+
+    def on_sweep_failed(self, message):
+        self.set_running(False)
+        QMessageBox.critical(self, "Lỗi", f"Quét tham số thất bại: {message}")
+
+    def fill_table(self):
+        self.table.setSortingEnabled(False)
+        self.table.setRowCount(len(self.rows))
+        for i, row in enumerate(self.rows):
+            for j, (key, _) in enumerate(RESULT_COLUMNS):
+                item = QTableWidgetItem()
+                value = row[key]
+                # Lưu giá trị số để sắp xếp đúng theo số, không theo chuỗi
+                item.setData(Qt.DisplayRole, round(value, 4) if isinstance(value, float) else value)
+                item.setData(Qt.UserRole, i)
+                self.table.setItem(i, j, item)
+        self.table.setSortingEnabled(True)
+
+    def apply_row(self, table_row, _column):
+        row = self.rows[self.table.item(table_row, 0).data(Qt.UserRole)]
+        self.control_panel.apply_params({name: row[name] for name in SWEEP_PARAMS})
+        self.status_label.setText("Đã áp dụng tham số vào bảng điều khiển")
+
+    def export_csv(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Xuất CSV", "sweep_results.csv", "CSV (*.csv)")
+        if path:
+            write_csv(self.rows, path)
+
+    def closeEvent(self, event):
+        self.stop_sweep()
+        super().closeEvent(event)